@@ -1,8 +1,6 @@
 import subprocess
 import sys
 import os
-import signal
-import time
 
 # Ensure minimal runtime dependencies are available so `python app.py` just works
 def _ensure_min_deps():
@@ -40,9 +38,20 @@ def _ensure_min_deps():
 # Bootstrap deps before importing third-party modules
 _ensure_min_deps()
 
-from flask import Flask, jsonify, request, make_response
+from flask import Flask, Response, jsonify, request, make_response
 from flask_cors import CORS
 
+from camera_service import CameraService
+from capabilities import CapabilityRegistry
+from face.detectors import DETECTORS, GAMES, resolve
+from event_stream import MIMETYPE as EVENTS_MIMETYPE, parse_cursor, sse_events
+from game_control import ControlServer
+from game_logs import LogManager
+from game_sessions import HEADLESS_ENV, GameSupervisor
+from inference_service import InferenceService
+from stream_hub import MIMETYPE as STREAM_MIMETYPE
+from worker_pool import WorkerPool, pool_sizes_from_env
+
 app = Flask(__name__)
 CORS(app, origins=["http://localhost:5173", "http://127.0.0.1:5173"])
 
@@ -62,8 +71,11 @@ def _add_cors_headers(resp):
     resp.headers['Access-Control-Allow-Methods'] = 'GET,POST,OPTIONS'
     return resp
 
-# Store running processes
-running_processes = {}
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FACE_DIR = os.path.join(BASE_DIR, "face")
+LOG_DIR = os.path.join(BASE_DIR, "logs")
+MAX_PROFILE_LENGTH = 64
+log_manager = LogManager(LOG_DIR)
 
 # ---------------------- Helpers: per-game deps ----------------------
 
@@ -76,25 +88,18 @@ _PKG_MODULE_MAP = {
     "fer": "fer",
 }
 
-_GAME_DEPS = {
-    # Color & Shape rely on OpenCV + NumPy only
-    "color": ["opencv-python", "numpy"],
-    "shape": ["opencv-python", "numpy"],
-    # Gesture requires MediaPipe in addition
-    "gesture": ["opencv-python", "numpy", "mediapipe"],
-    # Emotion game here uses only OpenCV Haar cascades
-    "emotion": ["opencv-python"],
-}
+_MODULE_PKG_MAP = {module: pkg for pkg, module in _PKG_MODULE_MAP.items()}
 
-def _missing_modules(packages):
-    missing = []
-    for pkg in packages:
-        mod = _PKG_MODULE_MAP.get(pkg, pkg)
-        try:
-            __import__(mod)
-        except ImportError:
-            missing.append(pkg)
-    return missing
+# Probed once at boot with find_spec; nothing heavy is imported into this process
+capabilities = CapabilityRegistry(_PKG_MODULE_MAP.values())
+capabilities.probe()
+
+def _game_spec(game_name):
+    """Detector spec to run for a game (falls back when e.g. MediaPipe is missing)."""
+    return resolve(game_name, capabilities.available)
+
+def _missing_packages(spec):
+    return [_MODULE_PKG_MAP.get(module, module) for module in capabilities.missing(spec.requires)]
 
 def _pip_install(packages):
     if not packages:
@@ -104,25 +109,27 @@ def _pip_install(packages):
     except Exception:
         pass
     print(f"Installing required packages for game: {', '.join(packages)} ...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", *packages])
+    try:
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *packages])
+    finally:
+        capabilities.refresh()
     print("Package installation completed.")
 
 def _ensure_game_deps(game_name: str):
-    pkgs = _GAME_DEPS.get(game_name, [])
-    if not pkgs:
+    spec = _game_spec(game_name)
+    if spec is None:
         return
-    missing = _missing_modules(pkgs)
+
+    # For gesture game, if MediaPipe is missing, just warn and use the fallback's (lighter) deps
+    requested = DETECTORS[game_name]
+    if spec is not requested:
+        unavailable = ', '.join(_missing_packages(requested))
+        print(f"⚠️  Warning: {unavailable} not available for {game_name}. Using fallback mode.")
+
+    missing = _missing_packages(spec)
     if not missing:
         return
     
-    # For gesture game, if MediaPipe is missing, just warn but don't fail
-    if game_name == "gesture" and "mediapipe" in missing:
-        print(f"⚠️  Warning: MediaPipe not available for gesture recognition. Using fallback mode.")
-        # Remove mediapipe from missing list so we don't try to install it
-        missing = [pkg for pkg in missing if pkg != "mediapipe"]
-        if not missing:
-            return
-    
     try:
         _pip_install(missing)
     except subprocess.CalledProcessError:
@@ -141,15 +148,23 @@ def home():
 
 @app.route('/health')
 def health():
-    return jsonify({"status": "healthy", "running_processes": list(running_processes.keys())})
+    return jsonify({"status": "healthy", "running_processes": supervisor.running_games()})
+
+@app.route('/capabilities', methods=['GET'])
+def get_capabilities():
+    return jsonify(capabilities.snapshot())
+
+@app.route('/capabilities/refresh', methods=['POST', 'OPTIONS'])
+def refresh_capabilities():
+    if request.method == 'OPTIONS':
+        return _cors_preflight_ok()
+    # ?measure=1 also times real imports in throwaway interpreters (slow: seconds for tensorflow)
+    measure = request.args.get('measure', '').lower() in ('1', 'true', 'yes')
+    return jsonify(capabilities.refresh(measure=measure))
 
 @app.route('/test-env')
 def test_environment():
-    try:
-        import cv2
-        opencv_version = cv2.__version__
-    except ImportError:
-        opencv_version = "Not installed"
+    opencv_version = capabilities.version("cv2") if capabilities.available("cv2") else "Not installed"
     
     base_dir = os.path.dirname(os.path.abspath(__file__))
     face_dir = os.path.join(base_dir, "face")
@@ -171,32 +186,57 @@ def test_environment():
         "face_scripts": face_scripts,
         "python_path": sys.path[:3],  # First 3 entries
         "platform": sys.platform,
-        "running_processes": list(running_processes.keys())
+        "capabilities": capabilities.snapshot()["modules"],
+        "running_processes": supervisor.running_games()
     })
 
-GAME_SCRIPTS = {
-    "color": "color_identifier.py",
-    "shape": "shape.py",
-    "emotion": "emotion_game.py",
-    # gesture handled dynamically below for mediapipe fallback
-}
+def _pool_script_for_game(game_name):
+    # Only pre-warm games that can run without installing anything first
+    spec = _game_spec(game_name)
+    missing = _missing_packages(spec)
+    if missing:
+        print(f"[Pool] Not warming {game_name}: missing {', '.join(missing)}")
+        return None
+    return spec.script
+
+@app.route('/games', methods=['GET'])
+def list_games():
+    games = {}
+    for game_name in GAMES:
+        spec = _game_spec(game_name)
+        games[game_name] = {**spec.as_dict(), "missing": _missing_packages(spec)}
+    return jsonify({"games": games})
 
 @app.route('/game/<game_name>/start', methods=['POST', 'OPTIONS'])
 def unified_start(game_name):
     if request.method == 'OPTIONS':
         return _cors_preflight_ok()
-    if game_name == 'gesture':
-        try:
-            import mediapipe  # noqa: F401
-            script = 'gesture_recognition.py'
-        except ImportError:
-            print("MediaPipe not available, using fallback gesture recognition")
-            script = 'gesture_recognition_fallback.py'
-        return start_game_process('gesture', script)
-    script = GAME_SCRIPTS.get(game_name)
-    if not script:
+    spec = _game_spec(game_name) if game_name in GAMES else None
+    if spec is None:
         return jsonify({"error": f"Unknown game '{game_name}'"}), 404
-    return start_game_process(game_name, script)
+    if spec.key != game_name:
+        print(f"{game_name}: using {spec.key} ({spec.script})")
+    return start_game_process(game_name, spec.script, headless=_wants_headless(), profile=_wants_profile())
+
+def _is_true(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _wants_headless():
+    """``headless`` from the query string or JSON body; defaults to the backend's GAME_HEADLESS."""
+    body = request.get_json(silent=True) or {}
+    value = request.args.get('headless', body.get('headless') if isinstance(body, dict) else None)
+    if value is None:
+        return _is_true(os.environ.get(HEADLESS_ENV, ''))
+    return value is True or _is_true(value)
+
+def _wants_profile():
+    """``profile`` (the user's calibration profile) from the query string or JSON body, if any."""
+    body = request.get_json(silent=True) or {}
+    value = request.args.get('profile', body.get('profile') if isinstance(body, dict) else None)
+    if value is None or not str(value).strip():
+        return None
+    # Games turn it into a file name; keep it short
+    return str(value).strip()[:MAX_PROFILE_LENGTH]
 
 @app.route('/game/<game_name>/stop', methods=['POST', 'OPTIONS'])
 def unified_stop(game_name):
@@ -217,27 +257,102 @@ def _cors_preflight_ok():
     return resp
 
 
-def start_game_process(game_name, script_name):
+def _log_paths(game_name):
+    return (
+        os.path.join(LOG_DIR, f"{game_name}.out.log"),
+        os.path.join(LOG_DIR, f"{game_name}.err.log"),
+    )
+
+
+def _launch_script(game_name, script_name, args=None, extra_env=None):
+    """Start a script from the face folder with output copied into the rotating logs/<game>.*.log."""
+    script_path = os.path.join(FACE_DIR, script_name)
+    env = os.environ.copy()
+    env.update(camera_service.env())
+    env.update(inference_service.env())
+    if extra_env:
+        env.update(extra_env)
+
+    stdout_path, stderr_path = _log_paths(game_name)
+    if sys.platform == "win32":
+        env.setdefault("OPENCV_VIDEOIO_PRIORITY_MSMF", "0")
+    # Force UTF-8 so emoji / unicode logs won't crash in child process redirected to file (Windows default cp1252)
+    env.setdefault("PYTHONIOENCODING", "utf-8")
+    env.setdefault("PYTHONUTF8", "1")
+
+    command = [sys.executable, script_path, *(args or [])]
+    popen_kwargs = {}
+    if sys.platform == "win32":
+        popen_kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP  # no extra console window
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=FACE_DIR,
+        env=env,
+        **popen_kwargs,
+    )
+    # Pipes rather than file handles, so the backend can rotate the logs while the game runs
+    log_manager.attach(process, stdout_path, stderr_path)
+    return process, stdout_path, stderr_path
+
+
+def _spawn_detached(game_name, script_name, args, extra_env):
+    process, _, _ = _launch_script(game_name, script_name, args, extra_env)
+    return process
+
+
+def _launch_game(game_name, script_name, extra_env):
+    return _launch_script(game_name, script_name, extra_env=extra_env)
+
+
+def _prepare_game(game_name):
+    camera_service.ensure_running()
+    if game_name == "emotion":
+        inference_service.ensure_running()
+    _ensure_game_deps(game_name)
+
+
+control_server = ControlServer()
+camera_service = CameraService(control=control_server, spawn=_spawn_detached)
+inference_service = InferenceService(control=control_server, spawn=_spawn_detached)
+worker_pool = WorkerPool(
+    control=control_server,
+    spawn=_spawn_detached,
+    resolve_script=_pool_script_for_game,
+    sizes=pool_sizes_from_env(GAMES),
+)
+supervisor = GameSupervisor(
+    control=control_server,
+    pool=worker_pool,
+    launch=_launch_game,
+    prepare=_prepare_game,
+    log_paths=_log_paths,
+)
+
+@app.route('/pool', methods=['GET'])
+def pool_status():
+    return jsonify({"games": worker_pool.status()})
+
+
+@app.route('/capture', methods=['GET'])
+def capture_status():
+    return jsonify(camera_service.status())
+
+
+@app.route('/inference', methods=['GET'])
+def inference_status():
+    return jsonify(inference_service.status())
+
+
+def start_game_process(game_name, script_name, headless=False, profile=None):
     try:
-        # If already running, just report success
-        if game_name in running_processes and running_processes[game_name].poll() is None:
-            return jsonify({
-                "message": f"{game_name.capitalize()} game already running",
-                "process_id": running_processes[game_name].pid,
-                "status": "running"
-            })
-        # Stop existing process if running
-        if game_name in running_processes:
-            stop_game_process(game_name)
-            time.sleep(1)  # Give it a moment to stop
-
         # Resolve absolute path to the game script (stable regardless of CWD)
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        script_path = os.path.join(base_dir, "face", script_name)
+        script_path = os.path.join(FACE_DIR, script_name)
         
         # ADD DEBUG LOGGING
         print(f"🔍 Debug Info for {game_name}:")
-        print(f"   Base dir: {base_dir}")
+        print(f"   Base dir: {BASE_DIR}")
         print(f"   Script path: {script_path}")
         print(f"   Script exists: {os.path.exists(script_path)}")
         print(f"   Current working directory: {os.getcwd()}")
@@ -245,105 +360,23 @@ def start_game_process(game_name, script_name):
         if not os.path.exists(script_path):
             return jsonify({"error": f"Script {script_name} not found at {script_path}"}), 404
 
-        # Ensure per-game dependencies are present before starting the process
-        _ensure_game_deps(game_name)
-
-        # Start the process
-        env = os.environ.copy()
-        # ADD THIS: Set the working directory to the face folder
-        face_dir = os.path.join(base_dir, "face")
-        
-        # Prepare log files for debugging
-        log_dir = os.path.join(base_dir, "logs")
-        os.makedirs(log_dir, exist_ok=True)
-        stdout_path = os.path.join(log_dir, f"{game_name}.out.log")
-        stderr_path = os.path.join(log_dir, f"{game_name}.err.log")
-        stdout_f = open(stdout_path, "ab")
-        stderr_f = open(stderr_path, "ab")
-        if sys.platform == "win32":
-            env.setdefault("OPENCV_VIDEOIO_PRIORITY_MSMF", "0")
-        # Force UTF-8 so emoji / unicode logs won't crash in child process redirected to file (Windows default cp1252)
-        env.setdefault("PYTHONIOENCODING", "utf-8")
-        env.setdefault("PYTHONUTF8", "1")
-
-        if sys.platform == "win32":
-            command = [sys.executable, script_path]
-            creationflags = subprocess.CREATE_NEW_PROCESS_GROUP  # no extra console window
-            process = subprocess.Popen(
-                command,
-                stdout=stdout_f,
-                stderr=stderr_f,
-                creationflags=creationflags,
-                cwd=face_dir,
-                env=env,
-            )
-        else:
-            command = [sys.executable, script_path]
-            process = subprocess.Popen(
-                command,
-                stdout=stdout_f,
-                stderr=stderr_f,
-                cwd=face_dir,
-                env=env,
-            )
-
-        # Quick sanity check: if the process exits immediately, report an error
-        time.sleep(2.0)  # INCREASED: Give more time for startup
-        if process.poll() is not None:
-            # Try to read the last few lines of stderr for diagnostics
-            log_tail = []
-            stdout_tail = []
-            try:
-                stderr_f.flush()
-                stdout_f.flush()
-                stderr_f.close()
-                stdout_f.close()
-                
-                # Read stderr
-                with open(stderr_path, "rb") as rf:
-                    rf.seek(0, os.SEEK_END)
-                    size = rf.tell()
-                    if size > 0:
-                        rf.seek(max(0, size - 2000))
-                        data = rf.read().decode(errors="ignore")
-                        log_tail = data.splitlines()[-20:] if data.strip() else []
-                
-                # Read stdout
-                with open(stdout_path, "rb") as rf:
-                    rf.seek(0, os.SEEK_END)
-                    size = rf.tell()
-                    if size > 0:
-                        rf.seek(max(0, size - 2000))
-                        data = rf.read().decode(errors="ignore")
-                        stdout_tail = data.splitlines()[-20:] if data.strip() else []
-                        
-            except Exception as e:
-                log_tail.append(f"Error reading logs: {e}")
-                
-            print(f"❌ Process {game_name} exited immediately with code {process.returncode}")
-            print(f"Stderr: {log_tail}")
-            print(f"Stdout: {stdout_tail}")
-            
+        # Dependencies, camera hand-over and the readiness wait all happen in the background
+        session, created = supervisor.start(game_name, script_name, headless=headless, profile=profile)
+        status = session.as_dict()
+        if not created:
             return jsonify({
-                "error": (
-                    f"Failed to start {game_name} game (process exited immediately). "
-                    "Ensure required dependencies are installed and your webcam is accessible. "
-                    "Required: opencv-python, numpy (plus mediapipe for gestures)."
-                ),
-                "exit_code": process.returncode,
-                "stderr_tail": log_tail,
-                "stdout_tail": stdout_tail,
-                "stderr_log": stderr_path,
-                "stdout_log": stdout_path,
-            }), 500
-
-        running_processes[game_name] = process
+                **status,
+                "message": f"{game_name.capitalize()} game already running",
+                "status": session.state,
+                "status_url": _status_url(game_name),
+            })
 
         return jsonify({
-            "message": f"{game_name.capitalize()} game started successfully!",
-            "process_id": process.pid,
-            "status": "running"
-        })
+            **status,
+            "message": f"{game_name.capitalize()} game is starting",
+            "status": session.state,
+            "status_url": _status_url(game_name),
+        }), 202
 
     except Exception as e:
         return jsonify({"error": f"Failed to start {game_name} game: {str(e)}"}), 500
@@ -351,60 +384,103 @@ def start_game_process(game_name, script_name):
 
 def stop_game_process(game_name):
     try:
-        if game_name not in running_processes:
-            return jsonify({"message": f"{game_name.capitalize()} game was not running"})
+        session = supervisor.stop(game_name)
+        if session is None:
+            return jsonify({"message": f"{game_name.capitalize()} game was not running", "status": "stopped"})
 
-        process = running_processes[game_name]
+        return jsonify({
+            **session.as_dict(),
+            "message": f"{game_name.capitalize()} game is stopping",
+            "status": session.state,
+            "status_url": _status_url(game_name),
+        }), 202
 
-        if sys.platform == "win32":
-            # For Windows, send CTRL_BREAK_EVENT
-            try:
-                process.send_signal(signal.CTRL_BREAK_EVENT)
-            except Exception:
-                process.terminate()
-        else:
-            process.terminate()
+    except Exception as e:
+        return jsonify({"error": f"Failed to stop {game_name} game: {str(e)}"}), 500
 
-        # Wait for process to finish
-        try:
-            process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            process.kill()
 
-        del running_processes[game_name]
-        
-        # ADD: Give camera time to be released
-        time.sleep(2)
+def _status_url(game_name):
+    return f"/game/{game_name}/status"
 
-        return jsonify({
-            "message": f"{game_name.capitalize()} game stopped successfully!",
-            "status": "stopped"
-        })
 
-    except Exception as e:
-        return jsonify({"error": f"Failed to stop {game_name} game: {str(e)}"}), 500
+@app.route('/game/<game_name>/status', methods=['GET'])
+def game_status(game_name):
+    session = supervisor.get(game_name)
+    if session is None:
+        return jsonify({"game": game_name, "state": "idle"})
+    return jsonify(session.as_dict())
+
+
+@app.route('/game/<game_name>/stream', methods=['GET'])
+def game_stream(game_name):
+    """MJPEG stream of the running session's annotated frames (for an <img> tag)."""
+    session = supervisor.get(game_name)
+    if session is None or not session.active or session.link is None:
+        return jsonify({"error": f"{game_name.capitalize()} game is not running"}), 404
+    response = Response(
+        session.link.frames.mjpeg(is_alive=lambda: session.active and session.alive),
+        mimetype=STREAM_MIMETYPE,
+    )
+    response.headers['Cache-Control'] = 'no-cache, no-store'
+    return response
+
+
+@app.route('/game/<game_name>/calibrate', methods=['POST', 'OPTIONS'])
+def game_calibrate(game_name):
+    """Start, capture or skip the skin calibration of a running gesture fallback session."""
+    if request.method == 'OPTIONS':
+        return _cors_preflight_ok()
+    body = request.get_json(silent=True) or {}
+    action = request.args.get('action', body.get('action', 'start') if isinstance(body, dict) else 'start')
+    session = supervisor.get(game_name)
+    if session is None or not session.active or session.link is None:
+        return jsonify({"error": f"{game_name.capitalize()} game is not running"}), 404
+    ready = session.link.last("ready") or {}
+    actions = ready.get("calibration_actions")
+    if not actions:
+        return jsonify({"error": f"{game_name.capitalize()} game has no skin calibration"}), 409
+    if action not in actions:
+        return jsonify({"error": f"Unknown calibration action '{action}'", "actions": actions}), 400
+    if not session.link.send("calibrate", action=action):
+        return jsonify({"error": f"{game_name.capitalize()} game is not connected"}), 503
+    return jsonify({
+        "game": game_name,
+        "session": session.id,
+        "profile": session.profile,
+        "action": action,
+        "message": f"Calibration '{action}' sent",
+    }), 202
+
+
+@app.route('/game/<game_name>/events', methods=['GET'])
+def game_events(game_name):
+    """SSE feed of the session's events; resumes after Last-Event-ID or ?since=<cursor>."""
+    session = supervisor.get(game_name)
+    if session is None or session.link is None:
+        return jsonify({"error": f"{game_name.capitalize()} game has no session"}), 404
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('since')
+    response = Response(sse_events(session, parse_cursor(cursor, session.id)), mimetype=EVENTS_MIMETYPE)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @app.route('/stop-all', methods=['POST'])
 def stop_all_games():
-    stopped_games = []
-    for game_name in list(running_processes.keys()):
-        stop_game_process(game_name)
-        stopped_games.append(game_name)
+    stopped_games = supervisor.stop_all()
 
     return jsonify({
-        "message": "All games stopped",
+        "message": "All games stopping",
         "stopped_games": stopped_games
-    })
+    }), 202
 
 
 ## ------------- Diagnostics: fetch log tails -------------
 @app.route('/logs/<game_name>', methods=['GET'])
 def get_game_logs(game_name):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    log_dir = os.path.join(base_dir, 'logs')
-    stderr_path = os.path.join(log_dir, f"{game_name}.err.log")
-    stdout_path = os.path.join(log_dir, f"{game_name}.out.log")
+    if 'since' in request.args:
+        return _game_logs_since(game_name, request.args.get('since'))
+    stdout_path, stderr_path = _log_paths(game_name)
     def _tail(path):
         if not os.path.exists(path):
             return []
@@ -420,8 +496,52 @@ def get_game_logs(game_name):
     return jsonify({
         "stderr": _tail(stderr_path),
         "stdout": _tail(stdout_path),
-        "running": game_name in running_processes and running_processes[game_name].poll() is None
+        "running": supervisor.is_running(game_name)
+    })
+
+def _parse_log_cursor(value):
+    """``<stdout offset>-<stderr offset>`` as two ints (0, 0 for an empty or invalid cursor)."""
+    out, _, err = (value or '').partition('-')
+    try:
+        return max(0, int(out or 0)), max(0, int(err or 0))
+    except ValueError:
+        return 0, 0
+
+def _game_logs_since(game_name, since):
+    """
+    New log output after cursor ``since``. 304 when there is nothing new and
+    the client's ETag matches (without one: while the game is still running).
+    """
+    stdout_path, stderr_path = _log_paths(game_name)
+    if not (os.path.exists(stdout_path) or os.path.exists(stderr_path)):
+        return jsonify({"error": f"No logs for {game_name}"}), 404
+    out_log, err_log = log_manager.get(stdout_path), log_manager.get(stderr_path)
+    out_since, err_since = _parse_log_cursor(since)
+    # Up to date cursors cost no file access
+    out_data, out_next, out_truncated = out_log.read_since(out_since)
+    err_data, err_next, err_truncated = err_log.read_since(err_since)
+    running = supervisor.is_running(game_name)
+    # Describes exactly this response: the cursor it hands out and whether the game runs
+    etag = f'"{out_log.base}.{out_next}-{err_log.base}.{err_next}-{int(running)}"'
+    unchanged = not (out_data or err_data or out_truncated or err_truncated)
+    client_etag = request.headers.get('If-None-Match')
+    # Without an ETag the client cannot know the game stopped, so that always gets a body
+    if unchanged and (client_etag == etag if client_etag is not None else running):
+        response = make_response('', 304)
+        response.headers['ETag'] = etag
+        return response
+
+    response = jsonify({
+        "stdout": out_data.decode(errors='replace'),
+        "stderr": err_data.decode(errors='replace'),
+        "next": f"{out_next}-{err_next}",
+        # Some output after the cursor was rotated away before it could be read
+        "truncated": out_truncated or err_truncated,
+        "running": running,
     })
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 # --- Backwards compatibility routes (old endpoint names) ---
 @app.route('/start-color', methods=['POST','OPTIONS'])
@@ -488,6 +608,14 @@ if __name__ == '__main__':
     print("[BOOT] Python:", sys.executable)
     print("[BOOT] Working dir:", os.getcwd())
     print("[BOOT] File location:", __file__)
+    print("[BOOT] Warming game worker pool:", worker_pool.sizes)
+    worker_pool.start()
+    if camera_service.enabled:
+        print("[BOOT] Starting shared capture service, ring:", camera_service.ring_name)
+        camera_service.start()
+    if inference_service.enabled:
+        print("[BOOT] Starting emotion inference worker on", inference_service.address)
+        inference_service.start()
     try:
         print("[BOOT] Entering Flask event loop...")
         app.run(host="127.0.0.1", port= FIXED_PORT, debug=False, use_reloader=False)
@@ -498,6 +626,8 @@ if __name__ == '__main__':
         traceback.print_exc()
     finally:
         print("[CLEANUP] Stopping any running game processes...")
-        for game_name in list(running_processes.keys()):
-            stop_game_process(game_name)
+        supervisor.stop_all(wait=True)
+        worker_pool.shutdown()
+        camera_service.stop()
+        inference_service.stop()
         print("[CLEANUP] Done.")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark the game detectors directly, without a camera, window or subprocess.
+
+Each detector is run on synthetic 640x480 frames (coloured shapes on a grey
+background) and timed per frame. The in-process engine is then compared with
+running the same detectors one after another on every frame.
+
+    python backend/benchmark_detectors.py
+    python backend/benchmark_detectors.py --detectors color,shape --frames 300
+"""
+import argparse
+import os
+import sys
+import time
+
+FACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face")
+sys.path.insert(0, FACE_DIR)
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from detectors import DETECTORS, create_detector  # noqa: E402
+from engine import DetectorEngine  # noqa: E402
+
+
+def synthetic_frames(count, width=640, height=480, seed=0):
+    """Frames with a few filled shapes that move a little from frame to frame."""
+    rng = np.random.default_rng(seed)
+    colors = [(0, 0, 255), (0, 255, 0), (255, 0, 0), (0, 255, 255)]
+    frames = []
+    for i in range(count):
+        frame = np.full((height, width, 3), 90, dtype=np.uint8)
+        dx = (i * 3) % 60
+        cv2.rectangle(frame, (60 + dx, 80), (200 + dx, 220), colors[i % 4], -1)
+        cv2.circle(frame, (420 - dx, 160), 70, colors[(i + 1) % 4], -1)
+        triangle = np.array([[300 + dx, 300], [380 + dx, 440], [220 + dx, 440]], dtype=np.int32)
+        cv2.fillPoly(frame, [triangle], colors[(i + 2) % 4])
+        noise = rng.integers(0, 12, size=frame.shape, dtype=np.uint8)
+        frames.append(cv2.add(frame, noise))
+    return frames
+
+
+def _summary(samples_ms):
+    samples = np.asarray(samples_ms)
+    mean = float(samples.mean())
+    return {
+        "mean_ms": round(mean, 2),
+        "p50_ms": round(float(np.percentile(samples, 50)), 2),
+        "p95_ms": round(float(np.percentile(samples, 95)), 2),
+        "fps": round(1000.0 / mean, 1) if mean > 0 else None,
+    }
+
+
+def bench_detector(key, frames, warmup=5):
+    detector = create_detector(key)
+    try:
+        for frame in frames[:warmup]:
+            detector.process(frame)
+        samples = []
+        for frame in frames:
+            t = time.perf_counter()
+            detector.process(frame)
+            samples.append((time.perf_counter() - t) * 1000.0)
+    finally:
+        detector.close()
+    return _summary(samples)
+
+
+def bench_sequential(keys, frames):
+    detectors = [create_detector(key) for key in keys]
+    try:
+        started = time.perf_counter()
+        for frame in frames:
+            for detector in detectors:
+                detector.process(frame)
+        elapsed = time.perf_counter() - started
+    finally:
+        for detector in detectors:
+            detector.close()
+    return len(frames) / elapsed
+
+
+def bench_engine(keys, frames):
+    """Throughput of the engine when every frame is waited for (no frames skipped)."""
+    engine = DetectorEngine()
+    for key in keys:
+        engine.add(key)
+    try:
+        started = time.perf_counter()
+        for frame in frames:
+            engine.wait(engine.submit(frame))
+        elapsed = time.perf_counter() - started
+    finally:
+        engine.stop()
+    return len(frames) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--detectors", default="color,shape,emotion,gesture_fallback",
+                        help=f"Comma separated detector keys ({', '.join(DETECTORS)})")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    frames = synthetic_frames(args.frames)
+    keys = []
+    print(f"Benchmarking on {len(frames)} synthetic {frames[0].shape[1]}x{frames[0].shape[0]} frames")
+    print("=" * 60)
+    for key in [k.strip() for k in args.detectors.split(",") if k.strip()]:
+        try:
+            stats = bench_detector(key, frames)
+        except ImportError as e:
+            print(f"{key:18s} skipped ({e})")
+            continue
+        keys.append(key)
+        print(f"{key:18s} mean {stats['mean_ms']:7.2f} ms  p50 {stats['p50_ms']:7.2f}  "
+              f"p95 {stats['p95_ms']:7.2f}  {stats['fps']:7.1f} fps")
+
+    if len(keys) > 1:
+        print("=" * 60)
+        sequential = bench_sequential(keys, frames)
+        threaded = bench_engine(keys, frames)
+        print(f"All detectors, sequential : {sequential:7.1f} frames/s")
+        print(f"All detectors, engine     : {threaded:7.1f} frames/s ({threaded / sequential:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-face emotion analysis for frames with several faces.
+
+Synthetic faces (grey ovals with eyes and a mouth, on a noisy background) are
+placed at known boxes, so the measurement covers only the per-face feature
+cascades, not face detection. Each face count is timed with the faces
+analysed one after another and on thread pools of the given sizes.
+
+    python backend/benchmark_faces.py
+    python backend/benchmark_faces.py --faces 1,2,4 --workers 1,2,4 --frames 100
+"""
+import argparse
+import os
+import sys
+import time
+
+FACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face")
+sys.path.insert(0, FACE_DIR)
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from emotion_game import EmotionDetector  # noqa: E402
+
+FACE_SIZE = 180
+
+
+def synthetic_face_frame(faces, width=1280, height=720, size=FACE_SIZE, seed=0):
+    """A grayscale frame with ``faces`` cartoon faces in a row; returns ``(gray, boxes)``."""
+    rng = np.random.default_rng(seed)
+    gray = rng.integers(60, 120, size=(height, width), dtype=np.uint8)
+    boxes = []
+    gap = (width - faces * size) // (faces + 1)
+    y = (height - size) // 2
+    for i in range(faces):
+        x = gap + i * (size + gap)
+        cx, cy = x + size // 2, y + size // 2
+        cv2.ellipse(gray, (cx, cy), (size * 2 // 5, size // 2), 0, 0, 360, 180, -1)
+        for ex in (cx - size // 6, cx + size // 6):
+            cv2.ellipse(gray, (ex, y + size * 2 // 5), (size // 14, size // 20), 0, 0, 360, 40, -1)
+        cv2.ellipse(gray, (cx, y + size * 3 // 4), (size // 6, size // 14), 0, 0, 180, 50, -1)
+        boxes.append((x, y, size, size))
+    gray = cv2.GaussianBlur(gray, (3, 3), 0)
+    return gray, boxes
+
+
+def bench_faces(faces, workers, frames):
+    gray, boxes = synthetic_face_frame(faces)
+    detector = EmotionDetector(workers=workers)
+    try:
+        for _ in range(3):
+            detector.analyze_faces(gray, boxes)
+        samples = []
+        for _ in range(frames):
+            t = time.perf_counter()
+            detector.analyze_faces(gray, boxes)
+            samples.append((time.perf_counter() - t) * 1000.0)
+    finally:
+        detector.close()
+    return float(np.mean(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--faces", default="1,2,4", help="Comma separated face counts")
+    parser.add_argument("--workers", default="1,2,4", help="Comma separated pool sizes (1 = sequential)")
+    parser.add_argument("--frames", type=int, default=50)
+    args = parser.parse_args()
+
+    face_counts = [int(n) for n in args.faces.split(",") if n.strip()]
+    pool_sizes = [int(n) for n in args.workers.split(",") if n.strip()]
+    print(f"Per-frame face analysis, {FACE_SIZE}px faces, {args.frames} frames, {os.cpu_count()} CPUs")
+    print("=" * 60)
+    print("faces " + "".join(f"{f'{w} worker' + ('s' if w > 1 else ''):>18s}" for w in pool_sizes))
+    for faces in face_counts:
+        baseline = None
+        cells = []
+        for workers in pool_sizes:
+            mean_ms = bench_faces(faces, workers, args.frames)
+            baseline = baseline or mean_ms
+            cells.append(f"{mean_ms:8.2f} ms ({baseline / mean_ms:4.2f}x)")
+        print(f"{faces:5d} " + "".join(f"{cell:>18s}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark micro-batched emotion inference with the stub model.
+
+Several simulated game sessions each send the face crops of a frame and wait
+for the labels, as the emotion game does. The same load runs once with
+batching disabled (``max_batch=1``) and once per requested batch size, and
+reports face throughput and per-face latency. No camera, TensorFlow or model
+download is needed.
+
+    python backend/benchmark_inference.py
+    python backend/benchmark_inference.py --sessions 4 --faces 2 --batch 1,8,32 --transport socket
+"""
+import argparse
+import os
+import secrets
+import sys
+import threading
+import time
+from multiprocessing.connection import arbitrary_address, default_family
+
+FACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face")
+sys.path.insert(0, FACE_DIR)
+
+import numpy as np  # noqa: E402
+
+from inference_worker import InferenceClient, InferenceServer, MicroBatcher, StubEmotionModel  # noqa: E402
+
+
+def run_sessions(batcher, sessions, faces, frames, transport="local"):
+    """Returns ``(faces_per_second, per-frame latencies in ms)``."""
+    server = None
+    if transport == "socket":
+        authkey = secrets.token_bytes(16)
+        server = InferenceServer(batcher, arbitrary_address(default_family), authkey)
+        classifiers = [InferenceClient(server.address, authkey) for _ in range(sessions)]
+    else:
+        classifiers = [batcher] * sessions
+
+    rng = np.random.default_rng(0)
+    crops = [rng.integers(0, 255, size=(120, 120), dtype=np.uint8) for _ in range(faces)]
+    latencies = [[] for _ in range(sessions)]
+
+    def session(index):
+        for _ in range(frames):
+            started = time.perf_counter()
+            classifiers[index].classify(crops)
+            latencies[index].append((time.perf_counter() - started) * 1000.0)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if server is not None:
+        for client in classifiers:
+            client.close()
+        server.close()
+    return sessions * faces * frames / elapsed, np.concatenate(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent game sessions")
+    parser.add_argument("--faces", type=int, default=1, help="Faces per frame")
+    parser.add_argument("--frames", type=int, default=50, help="Frames per session")
+    parser.add_argument("--batch", default="1,8,32", help="Comma separated max batch sizes (1 = no batching)")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Batch deadline")
+    parser.add_argument("--model-batch-ms", type=float, default=8.0, help="Stub model cost per call")
+    parser.add_argument("--model-item-ms", type=float, default=0.25, help="Stub model cost per face")
+    parser.add_argument("--transport", choices=("local", "socket"), default="local",
+                        help="Call the batcher directly or through the inference worker protocol")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions x {args.faces} faces/frame x {args.frames} frames, "
+          f"stub model {args.model_batch_ms} ms/call + {args.model_item_ms} ms/face, {args.transport}")
+    print("=" * 72)
+    for max_batch in [int(b) for b in args.batch.split(",") if b.strip()]:
+        model = StubEmotionModel(args.model_batch_ms, args.model_item_ms)
+        batcher = MicroBatcher(model, max_batch=max_batch, max_latency_ms=args.latency_ms)
+        try:
+            throughput, latencies = run_sessions(batcher, args.sessions, args.faces, args.frames, args.transport)
+            stats = batcher.stats()
+        finally:
+            batcher.close()
+        print(f"max_batch {max_batch:3d}: {throughput:8.1f} faces/s  mean batch {stats['mean_batch'] or 0:5.2f}  "
+              f"frame latency p50 {np.percentile(latencies, 50):6.1f} ms  p95 {np.percentile(latencies, 95):6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Backend side of the shared camera capture service.
+
+When enabled (``GAME_CAPTURE_SERVICE=1``) the backend runs
+``face/capture_service.py`` once for its whole lifetime. The service owns the
+camera and publishes frames into a shared-memory ring; every game process is
+started with ``GAME_FRAME_RING`` naming that ring and reads frames from it
+instead of opening the device (see ``face/camera.py``).
+
+Environment:
+    GAME_CAPTURE_SERVICE  1 to run the capture service (default off)
+    GAME_CAMERA_INDEX     camera index the service opens (default 0)
+"""
+import os
+
+from game_sessions import ServiceProcess
+
+# Keep in sync with face/camera.py
+FRAME_RING_ENV = "GAME_FRAME_RING"
+
+
+def capture_service_enabled(environ=None):
+    environ = os.environ if environ is None else environ
+    return environ.get("GAME_CAPTURE_SERVICE", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class CameraService(ServiceProcess):
+    """Starts, watches and stops the capture service process."""
+
+    name = "capture"
+    script = "capture_service.py"
+    label = "Capture service"
+    ready_fields = ("ring", "shape", "slots")
+
+    def __init__(self, control, spawn, enabled=None, camera_index=None, ring_name=None):
+        super().__init__(control, spawn, capture_service_enabled() if enabled is None else enabled)
+        if camera_index is None:
+            try:
+                camera_index = int(os.environ.get("GAME_CAMERA_INDEX", "0"))
+            except ValueError:
+                camera_index = 0
+        self.camera_index = camera_index
+        self.ring_name = ring_name or f"asd_frames_{os.getpid()}"
+
+    def env(self):
+        """Environment variables that point game processes at the frame ring."""
+        return {FRAME_RING_ENV: self.ring_name} if self.enabled else {}
+
+    def _args(self):
+        return ["--ring", self.ring_name, "--camera", str(self.camera_index)]
+
+    def _status(self):
+        return {"ring": self.ring_name if self.enabled else None, "camera_index": self.camera_index}
+
+    def _stats(self, stats):
+        return {"fps": stats.get("fps"), "frames": stats.get("frames")}
@@ -0,0 +1,132 @@
+"""
+Cached probe of the vision/ML packages the games depend on.
+
+The Flask process never imports OpenCV, MediaPipe or TensorFlow itself: it
+only asks ``importlib.util.find_spec`` whether they are installed and reads
+their versions from package metadata. Results are cached until ``refresh()``.
+Actual import costs can be measured on demand in throwaway subprocesses, which
+shows how much the control plane saves by not importing them.
+"""
+import importlib
+import importlib.metadata
+import importlib.util
+import json
+import subprocess
+import sys
+import threading
+import time
+
+# Distributions that may provide a top-level module (first installed one wins)
+_DISTRIBUTIONS = {
+    "cv2": ["opencv-python", "opencv-python-headless", "opencv-contrib-python", "opencv-contrib-python-headless"],
+    "PIL": ["Pillow"],
+    "mediapipe": ["mediapipe"],
+    "tensorflow": ["tensorflow", "tensorflow-cpu", "tensorflow-macos"],
+}
+
+_IMPORT_TIMER = (
+    "import json, sys, time\n"
+    "t = time.perf_counter()\n"
+    "import {module}\n"
+    "print(json.dumps({{'import_ms': (time.perf_counter() - t) * 1000.0}}))\n"
+)
+
+
+def _version(module):
+    for dist in _DISTRIBUTIONS.get(module, [module]):
+        try:
+            return importlib.metadata.version(dist)
+        except importlib.metadata.PackageNotFoundError:
+            continue
+    return None
+
+
+def measure_import_ms(module, timeout=120):
+    """Import ``module`` in a fresh interpreter and return the import time in ms (None on failure)."""
+    try:
+        result = subprocess.run(
+            [sys.executable, "-c", _IMPORT_TIMER.format(module=module)],
+            capture_output=True, text=True, timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    try:
+        return round(json.loads(result.stdout.strip().splitlines()[-1])["import_ms"], 1)
+    except (ValueError, KeyError, IndexError):
+        return None
+
+
+class CapabilityRegistry:
+    """Installed/available state of a fixed set of modules, probed once and cached."""
+
+    def __init__(self, modules):
+        self.modules = list(modules)
+        self._results = {}
+        self._probed_at = None
+        self._probe_ms = None
+        self._lock = threading.Lock()
+
+    def probe(self, measure=False):
+        """(Re)probe every module. With ``measure`` also time real imports in subprocesses."""
+        importlib.invalidate_caches()  # notice packages pip-installed since the last probe
+        results = {}
+        started = time.perf_counter()
+        for module in self.modules:
+            t = time.perf_counter()
+            try:
+                spec = importlib.util.find_spec(module)
+            except (ImportError, ValueError):
+                spec = None
+            results[module] = {
+                "available": spec is not None,
+                "version": _version(module) if spec is not None else None,
+                "origin": getattr(spec, "origin", None) if spec is not None else None,
+                "probe_ms": round((time.perf_counter() - t) * 1000.0, 3),
+            }
+        probe_ms = round((time.perf_counter() - started) * 1000.0, 3)
+
+        if measure:
+            for module, info in results.items():
+                info["import_ms"] = measure_import_ms(module) if info["available"] else None
+
+        with self._lock:
+            self._results = results
+            self._probe_ms = probe_ms
+            self._probed_at = time.time()
+        return self.snapshot()
+
+    refresh = probe
+
+    def _ensure_probed(self):
+        if self._probed_at is None:
+            self.probe()
+
+    def available(self, module):
+        self._ensure_probed()
+        return self._results.get(module, {}).get("available", False)
+
+    def missing(self, modules):
+        """Return the subset of ``modules`` that is not installed."""
+        self._ensure_probed()
+        return [m for m in modules if not self._results.get(m, {}).get("available", False)]
+
+    def version(self, module):
+        self._ensure_probed()
+        return self._results.get(module, {}).get("version")
+
+    def snapshot(self):
+        self._ensure_probed()
+        with self._lock:
+            modules = {m: dict(info) for m, info in self._results.items()}
+            data = {
+                "modules": modules,
+                "probed_at": self._probed_at,
+                "probe_ms": self._probe_ms,
+            }
+        measured = [info["import_ms"] for info in modules.values() if info.get("import_ms") is not None]
+        if measured:
+            data["import_ms_total"] = round(sum(measured), 1)
+            data["saved_ms"] = round(sum(measured) - self._probe_ms, 1)
+        return data
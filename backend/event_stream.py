@@ -0,0 +1,64 @@
+"""
+Server-Sent Events feed of a game session's events.
+
+Games report typed events over the control channel (``ready``, ``detection``,
+``gesture``, ``shape_appeared``, ``stats``, ``exited`` ...). Each one is
+numbered on arrival (``WorkerLink.seq``), so ``/game/<name>/events`` can
+stream them as SSE with ``id: <session>-<seq>``: a reconnecting
+``EventSource`` sends that id back as ``Last-Event-ID`` and picks up exactly
+where it left off, as long as the event is still in the link's replay window.
+A cursor from an earlier session replays the current one from the start.
+"""
+import json
+
+MIMETYPE = "text/event-stream"
+HEARTBEAT = 15.0   # seconds between keep-alive comments (also how dead clients are noticed)
+RETRY_MS = 2000    # reconnect delay suggested to EventSource
+
+# Worker-pool and streaming bookkeeping, not game events
+INTERNAL_EVENTS = ("hello", "warm", "stream_ready")
+
+
+def parse_cursor(value, session_id):
+    """
+    Sequence number to resume after: ``<session>-<seq>`` from the same
+    session, or a bare ``<seq>``. Anything else replays from the start.
+    """
+    if not value:
+        return 0
+    session, _, seq = str(value).rpartition("-")
+    if session and session != session_id:
+        return 0
+    try:
+        return max(0, int(seq))
+    except ValueError:
+        return 0
+
+
+def _format(event, event_id, data):
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_events(session, since=0, heartbeat=HEARTBEAT):
+    """Yield SSE messages for ``session`` after cursor ``since`` until the game has gone."""
+    link = session.link
+    yield f"retry: {RETRY_MS}\n\n"
+    seq = since
+    while True:
+        events = link.events_since(seq, timeout=heartbeat)
+        if not events:
+            finished = (link.seq > 0 and not link.connected) or (session.process is not None and not session.alive)
+            if finished and link.seq <= seq:
+                return
+            yield ": keep-alive\n\n"
+            continue
+        if events[0]["seq"] > seq + 1:
+            # The replay window no longer holds everything after the cursor
+            yield _format("gap", f"{session.id}-{seq}", {"game": session.game, "missed": events[0]["seq"] - seq - 1})
+        for message in events:
+            seq = message["seq"]
+            if message.get("event") in INTERNAL_EVENTS:
+                continue
+            data = {key: value for key, value in message.items() if key != "worker_id"}
+            data.update(game=session.game, session=session.id)
+            yield _format(message.get("event", "message"), f"{session.id}-{seq}", data)
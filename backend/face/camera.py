@@ -0,0 +1,280 @@
+"""
+Camera access shared by the game scripts.
+
+Games read frames through ``CameraSource``: a background thread grabs frames
+as fast as the camera delivers them and keeps only the newest one, so a slow
+detector frame never stalls capture and never works on a stale frame queued
+by the driver.
+
+``open_capture`` returns something with the ``cv2.VideoCapture`` interface
+(``read``, ``isOpened``, ``release``). When the backend runs the capture
+service it exports the name of its frame ring in ``GAME_FRAME_RING`` and the
+game reads frames from shared memory instead of opening the device, so
+starting or switching games never touches the camera itself.
+"""
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+FRAME_RING_ENV = "GAME_FRAME_RING"
+RING_ATTACH_TIMEOUT = 5.0
+RING_READ_TIMEOUT = 2.0
+MAX_RING_STALLS = 15     # read timeouts in a row (~30 s) before an open ring counts as dead
+MAX_GRAB_FAILURES = 30
+
+
+def open_camera(index: int = 0, warmup_frames: int = 10, timeout_sec: float = 5.0, fallback_indices=(1, 2)):
+    """Try multiple camera indices with warm-up; return first working capture or None."""
+    candidate_indices = [index, *fallback_indices]
+    seen = set()
+    for idx in candidate_indices:
+        if idx in seen:
+            continue
+        seen.add(idx)
+        backend = cv2.CAP_ANY
+        if sys.platform == "win32":
+            backend = cv2.CAP_DSHOW
+            os.environ.setdefault("OPENCV_VIDEOIO_PRIORITY_MSMF", "0")
+        cap = cv2.VideoCapture(idx, backend)
+        start = time.time()
+        while not cap.isOpened() and (time.time() - start) < timeout_sec:
+            time.sleep(0.1)
+            cap.open(idx, backend)
+        if not cap.isOpened():
+            continue
+        # Warm up frames
+        for _ in range(warmup_frames):
+            ok, _ = cap.read()
+            if not ok:
+                time.sleep(0.05)
+        print(f"[Camera] Using camera index {idx}")
+        return cap
+    return None
+
+
+class RingCapture:
+    """
+    ``cv2.VideoCapture`` look-alike that reads from the capture service's frame ring.
+
+    The ring has only a few slots and the service keeps writing, so a frame is
+    copied out of shared memory once and checked against the slot's seqlock;
+    a frame overwritten during the copy is dropped for the next one.
+    """
+
+    def __init__(self, ring, read_timeout=RING_READ_TIMEOUT):
+        self.ring = ring
+        self.read_timeout = read_timeout
+        self.last_seq = 0
+        self.last_timestamp = None
+        self.dropped = 0
+        self.torn = 0
+
+    def isOpened(self):
+        return self.ring is not None
+
+    def read(self):
+        """
+        Return ``(True, frame)`` with the next new frame (a private copy), or
+        ``(False, None)`` once the service has closed the ring
+        or delivered nothing for ``MAX_RING_STALLS`` read timeouts.
+
+        A stall (camera re-enumerating, capture service restarting) is waited
+        out, re-attaching by name in case the service recreated the ring.
+        """
+        stalls = 0
+        while True:
+            ring = self.ring
+            if ring is None:
+                return False, None
+            frame = ring.wait_next(self.last_seq, timeout=self.read_timeout)
+            if frame is not None:
+                image = frame.image.copy()
+                if ring.is_intact(frame):
+                    break
+                # The service lapped the ring while we copied; newer frames are already there
+                self.torn += 1
+                self.dropped += max(0, frame.seq - self.last_seq) if self.last_seq else 0
+                self.last_seq = frame.seq
+                stalls = 0
+                continue
+            if ring.closed:
+                return False, None
+            stalls += 1
+            if stalls >= MAX_RING_STALLS:
+                print(f"[Camera] No frame from ring '{ring.name}' for {stalls * self.read_timeout:g}s; giving up")
+                return False, None
+            if stalls == 1:
+                print(f"[Camera] No frame from ring '{ring.name}' for {self.read_timeout:g}s; waiting")
+            self._reattach(ring)
+        if self.last_seq:
+            self.dropped += max(0, frame.seq - self.last_seq - 1)
+        self.last_seq = frame.seq
+        self.last_timestamp = frame.timestamp
+        return True, image
+
+    def _reattach(self, stalled):
+        fresh = attach_ring(stalled.name, timeout=0)
+        if fresh is None:
+            return
+        if self.ring is not stalled or fresh.same_block(stalled):
+            # Released while we were waiting, or simply no new frame yet
+            fresh.close()
+            return
+        self.ring = fresh
+        # A restarted service numbers its frames from 1 again
+        self.last_seq = 0
+        stalled.close()
+
+    def release(self):
+        # Only detaches; the camera stays open in the capture service
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+def attach_ring(name=None, timeout=RING_ATTACH_TIMEOUT):
+    """Attach to the frame ring named in GAME_FRAME_RING, waiting for the service to create it."""
+    from frame_ring import FrameRing
+
+    name = name or os.environ.get(FRAME_RING_ENV)
+    if not name:
+        return None
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return FrameRing.attach(name)
+        except (FileNotFoundError, ValueError):
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.1)
+
+
+def open_capture(index: int = 0, **kwargs):
+    """
+    Return a frame source for the game: the shared frame ring when the capture
+    service is running, otherwise the camera device itself. None if neither works.
+    """
+    if os.environ.get(FRAME_RING_ENV):
+        ring = attach_ring()
+        if ring is not None:
+            print(f"[Camera] Reading frames from shared ring '{ring.name}' {ring.shape}")
+            return RingCapture(ring)
+        print("[Camera] Capture service ring not available; opening the camera directly")
+    return open_camera(index, **kwargs)
+
+
+class CameraSource:
+    """
+    Latest-frame-wins frame source with the ``cv2.VideoCapture`` interface.
+
+    A grab thread reads the underlying capture continuously; ``read()`` hands
+    out the newest frame not yet seen and counts frames that were replaced
+    before anybody read them as dropped. Shared ring captures are already
+    latest-frame-wins and are read directly, without a thread.
+    """
+
+    def __init__(self, capture, threaded=None):
+        self._capture = capture
+        self.threaded = not isinstance(capture, RingCapture) if threaded is None else threaded
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_timestamp = None
+        self._seq = 0
+        self._read_seq = 0
+        self._ok = True
+        self._running = True
+        self.grabbed = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.last_timestamp = None
+        self._thread = None
+        if self.threaded:
+            self._thread = threading.Thread(target=self._grab_loop, name="camera-grab", daemon=True)
+            self._thread.start()
+
+    @classmethod
+    def open(cls, index: int = 0, **kwargs):
+        """Open the camera (or the shared ring) like ``open_capture``; None if it is not accessible."""
+        capture = open_capture(index, **kwargs)
+        return cls(capture) if capture is not None else None
+
+    def _grab_loop(self):
+        failures = 0
+        while self._running:
+            ok, frame = self._capture.read()
+            timestamp = time.time()
+            if not ok:
+                failures += 1
+                if failures >= MAX_GRAB_FAILURES:
+                    with self._cond:
+                        self._ok = False
+                        self._cond.notify_all()
+                    return
+                time.sleep(0.01)
+                continue
+            failures = 0
+            with self._cond:
+                if self._seq > self._read_seq:
+                    self.dropped += 1  # the previous frame was never read
+                self._frame = frame
+                self._frame_timestamp = timestamp
+                self._seq += 1
+                self.grabbed += 1
+                self._cond.notify_all()
+
+    def isOpened(self):
+        return self._capture is not None and self._ok
+
+    def read(self, timeout: float = RING_READ_TIMEOUT):
+        """
+        Return ``(True, frame)`` with the newest unseen frame, or ``(False, None)``
+        once capture has stopped (released, or the grab thread gave up on the
+        camera). A camera that stalls while still open is waited for; a warning
+        is printed after every ``timeout`` seconds without a frame.
+        """
+        if not self.threaded:
+            ok, frame = self._capture.read()
+            if ok:
+                self.delivered += 1
+                self.last_timestamp = getattr(self._capture, "last_timestamp", None) or time.time()
+                self.dropped = getattr(self._capture, "dropped", 0)
+                self.grabbed = self.delivered + self.dropped
+            return ok, frame
+
+        waited = 0.0
+        with self._cond:
+            while self._seq == self._read_seq and self._ok and self._running:
+                if not self._thread.is_alive():
+                    return False, None
+                if not self._cond.wait(timeout):
+                    waited += timeout
+                    print(f"[Camera] No frame for {waited:g}s; waiting for the camera")
+            if self._seq == self._read_seq:
+                return False, None
+            self._read_seq = self._seq
+            self.delivered += 1
+            self.last_timestamp = self._frame_timestamp
+            return True, self._frame
+
+    @property
+    def frame_age_ms(self):
+        """How old the last frame handed out by ``read()`` was when it was captured, in ms."""
+        if self.last_timestamp is None:
+            return None
+        return (time.time() - self.last_timestamp) * 1000.0
+
+    def stats(self):
+        return {"grabbed": self.grabbed, "delivered": self.delivered, "dropped": self.dropped}
+
+    def release(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
@@ -0,0 +1,85 @@
+"""
+Long-lived camera capture service.
+
+Owns the camera for the lifetime of the backend and publishes every frame into
+a shared-memory frame ring (see ``frame_ring.py``). Games attach to the ring
+instead of opening the device, so switching games never closes and reopens
+the camera and several games or detectors can read the same frames.
+
+    python capture_service.py --ring asd_frames --camera 0
+"""
+import argparse
+import sys
+import time
+
+import cv2
+
+from camera import open_camera
+from control import emit, quit_requested
+from frame_ring import DEFAULT_SLOTS, FrameRing
+
+MAX_READ_FAILURES = 30
+STATS_INTERVAL = 5.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish camera frames into a shared-memory ring")
+    parser.add_argument("--ring", required=True, help="Name of the shared memory block")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS)
+    args = parser.parse_args()
+
+    cap = open_camera(args.camera)
+    if cap is None:
+        print("❌ Webcam not accessible on indices (0,1,2). Exiting.")
+        emit("failed", error="Webcam not accessible on indices (0,1,2)")
+        sys.exit(2)
+
+    ok, frame = cap.read()
+    if not ok:
+        cap.release()
+        print("❌ Camera opened but returned no frame. Exiting.")
+        emit("failed", error="Camera returned no frame")
+        sys.exit(2)
+
+    ring = FrameRing.create(args.ring, frame.shape, slots=args.slots)
+    ring.write(frame)
+    print(f"[Capture] Publishing {frame.shape[1]}x{frame.shape[0]} frames to ring '{ring.name}' ({ring.slots} slots)")
+    emit("ready", ring=ring.name, shape=list(ring.shape), slots=ring.slots)
+
+    failures = 0
+    frames = 0
+    last_stats = time.monotonic()
+    try:
+        while not quit_requested():
+            ok, frame = cap.read()
+            if not ok:
+                failures += 1
+                if failures >= MAX_READ_FAILURES:
+                    print("[Capture] Camera stopped delivering frames")
+                    break
+                time.sleep(0.01)
+                continue
+            failures = 0
+            if frame.shape != ring.shape:
+                frame = cv2.resize(frame, (ring.shape[1], ring.shape[0]))
+            ring.write(frame)
+            frames += 1
+
+            now = time.monotonic()
+            if now - last_stats >= STATS_INTERVAL:
+                fps = frames / (now - last_stats)
+                emit("stats", fps=round(fps, 1), frames=ring.write_seq)
+                frames, last_stats = 0, now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.mark_closed()
+        cap.release()
+        emit("camera_released")
+        ring.close()
+        ring.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Per-camera color calibration.
+
+Hold a reference object of a known color inside the box in the middle of the
+preview, pick its color with the number keys and press SPACE to sample it
+(repeat under a few lighting angles). Press 's' to save: HSV ranges are fitted
+to the samples, merged in front of the default ``color_ranges`` and compiled
+into the binary table that the color game maps at start-up.
+
+    python color_calibration.py --camera 0 --camera-id desk-webcam
+"""
+import argparse
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from camera import CameraSource
+from color_identifier import color_ranges
+from color_lut import ColorTable, calibration_path, label_name, save_table
+
+WINDOW_NAME = "Color Calibration"
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+SAMPLE_FRAMES = 15
+ROI_FRACTION = 0.2
+
+# Padding added around the sampled percentiles (H, S, V)
+MARGINS = (5, 25, 35)
+# Below this median saturation hue carries no information (white/grey/black)
+ACHROMATIC_SATURATION = 40
+H_MAX = 180
+
+
+def _fit(values, low_pct=2, high_pct=98):
+    return int(np.percentile(values, low_pct)), int(np.percentile(values, high_pct))
+
+
+def ranges_from_samples(samples):
+    """
+    Fit inclusive HSV ranges to sampled pixels.
+
+    ``samples`` maps a color name to an (N, 3) array of HSV pixels. Hues that
+    wrap around red (both near 0 and near 180) become two ranges, ``name`` and
+    ``name2``, like the defaults do.
+    """
+    ranges = {}
+    for name, pixels in samples.items():
+        pixels = np.asarray(pixels, dtype=np.int32).reshape(-1, 3)
+        if len(pixels) == 0:
+            continue
+        hue, sat, val = pixels[:, 0], pixels[:, 1], pixels[:, 2]
+        s_lo, s_hi = _fit(sat)
+        v_lo, v_hi = _fit(val)
+        sv_low = (max(0, s_lo - MARGINS[1]), max(0, v_lo - MARGINS[2]))
+        sv_high = (min(255, s_hi + MARGINS[1]), min(255, v_hi + MARGINS[2]))
+
+        if np.median(sat) < ACHROMATIC_SATURATION:
+            ranges[name] = [(0, *sv_low), (H_MAX, *sv_high)]
+        elif (hue < 20).mean() > 0.05 and (hue > 160).mean() > 0.05:
+            _, low_hi = _fit(hue[hue < 90])
+            high_lo, _ = _fit(hue[hue >= 90])
+            ranges[name] = [(0, *sv_low), (min(H_MAX, low_hi + MARGINS[0]), *sv_high)]
+            ranges[f"{name}2"] = [(max(0, high_lo - MARGINS[0]), *sv_low), (H_MAX, *sv_high)]
+        else:
+            h_lo, h_hi = _fit(hue)
+            ranges[name] = [(max(0, h_lo - MARGINS[0]), *sv_low), (min(H_MAX, h_hi + MARGINS[0]), *sv_high)]
+    return ranges
+
+
+def merge_ranges(calibrated, defaults):
+    """Calibrated ranges first (they win overlaps), then defaults for colors that were not calibrated."""
+    names = {label_name(name) for name in calibrated}
+    merged = dict(calibrated)
+    for name, bounds in defaults.items():
+        if label_name(name) not in names:
+            merged[name] = bounds
+    return merged
+
+
+def build_calibrated_table(samples, defaults=None):
+    calibrated = ranges_from_samples(samples)
+    return ColorTable.from_ranges(merge_ranges(calibrated, color_ranges if defaults is None else defaults)), calibrated
+
+
+def _roi(frame):
+    h, w = frame.shape[:2]
+    half_w, half_h = int(w * ROI_FRACTION / 2), int(h * ROI_FRACTION / 2)
+    cx, cy = w // 2, h // 2
+    return (cx - half_w, cy - half_h, cx + half_w, cy + half_h)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the color game for one camera")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--camera-id", default=None, help="Name the table is saved under (default: GAME_CAMERA_ID or 'default')")
+    args = parser.parse_args()
+
+    names = []
+    for name in color_ranges:
+        if label_name(name) not in names:
+            names.append(label_name(name))
+    keys = "123456789abcdefghijklmnop"[:len(names)]
+
+    cap = CameraSource.open(args.camera)
+    if cap is None:
+        print("❌ Webcam not accessible. Exiting.")
+        sys.exit(2)
+
+    print("Hold a reference object inside the box, choose its color and press SPACE to sample:")
+    for key, name in zip(keys, names):
+        print(f"  [{key}] {name}")
+    print("Press 's' to save the calibration, 'q' to quit without saving")
+
+    selected = names[0]
+    samples = {}
+    pending = 0
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frame = cv2.flip(frame, 1)
+            x0, y0, x1, y1 = _roi(frame)
+            if pending:
+                hsv = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2HSV)
+                samples.setdefault(selected, []).append(hsv.reshape(-1, 3))
+                pending -= 1
+                if not pending:
+                    print(f"Sampled {selected} ({sum(len(s) for s in samples[selected])} pixels)")
+
+            cv2.rectangle(frame, (x0, y0), (x1, y1), (0, 255, 255) if pending else (255, 255, 255), 2)
+            cv2.putText(frame, f"Color: {selected}", (10, 30), FONT, 0.8, (0, 255, 0), 2)
+            cv2.putText(frame, f"Calibrated: {', '.join(samples) or '-'}", (10, 60), FONT, 0.5, (255, 255, 255), 1)
+            cv2.putText(frame, "SPACE sample, s save, q quit", (10, frame.shape[0] - 20), FONT, 0.5, (255, 255, 255), 1)
+            cv2.imshow(WINDOW_NAME, frame)
+
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord("q"):
+                return
+            if key == ord(" "):
+                pending = SAMPLE_FRAMES
+            elif key == ord("s"):
+                break
+            elif key != 0xFF and chr(key) in keys:
+                selected = names[keys.index(chr(key))]
+    finally:
+        cap.release()
+        cv2.destroyAllWindows()
+
+    if not samples:
+        print("Nothing sampled; calibration not saved.")
+        return
+    table, calibrated = build_calibrated_table({name: np.concatenate(chunks) for name, chunks in samples.items()})
+    path = calibration_path(args.camera_id)
+    save_table(path, table, camera_id=args.camera_id, calibrated=list(samples), created_at=time.time())
+    print(f"Saved calibration for {', '.join(samples)} to {path}")
+    for name, bounds in calibrated.items():
+        print(f"  {name}: {bounds[0]} - {bounds[1]}")
+
+
+if __name__ == "__main__":
+    main()
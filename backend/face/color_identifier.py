@@ -1,10 +1,15 @@
 import cv2
-import numpy as np
+import os
 import sys
 import time
-import os
 from datetime import datetime
 
+from camera import CameraSource
+from color_lut import ColorTable, calibration_path, load_or_rebuild
+from control import emit
+from detectors import Detector
+from pipeline import destroy_windows, run_game_pipeline
+
 def _force_utf8():
     if sys.platform.startswith("win"):
         try:
@@ -35,56 +40,92 @@ color_ranges = {
     "Cyan": [(85, 50, 50), (95, 255, 255)],
 }
 
+MIN_COLOR_PIXELS = 5000  # Minimum pixel threshold
+
+# Multi-object mode: every colored blob instead of one label for the whole frame
+COLOR_MODE_ENV = "GAME_COLOR_MODE"
+MIN_BLOB_AREA = 1500  # full-frame pixels
+BLOB_SCALE = 0.25     # blobs are labeled on a 4x downscaled frame
+BACKGROUND_COLORS = ("White", "Grey", "Black")
+
+_color_table = None
+
+
+def get_color_table():
+    """
+    The HSV lookup table for this camera: the calibrated one if
+    ``color_calibration.py`` saved one, otherwise compiled from ``color_ranges``.
+    """
+    global _color_table
+    if _color_table is None:
+        path = calibration_path()
+        loaded = load_or_rebuild(path)
+        if loaded is not None:
+            _color_table, meta = loaded
+            print(f"[ColorGame] Using calibrated colors from {path} ({', '.join(meta.get('calibrated', []))})")
+        else:
+            _color_table = ColorTable.from_ranges(color_ranges)
+    return _color_table
+
+
+def preload():
+    """Warm-up hook used by the backend worker pool."""
+    get_color_table()
+
+
+def color_counts(frame):
+    """Return ``(dominant, {color: pixels})`` for a BGR frame in a single pass."""
+    return get_color_table().classify(frame, min_pixels=MIN_COLOR_PIXELS)
+
+
 def detect_color(frame):
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-    detected_colors = []
-    
-    for color_name, (lower, upper) in color_ranges.items():
-        mask = cv2.inRange(hsv, np.array(lower), np.array(upper))
-        if cv2.countNonZero(mask) > 5000:  # Minimum pixel threshold
-            detected_colors.append(color_name.replace("2", ""))  # Merge Red + Red2
-    
-    # Return the most dominant color or the first detected
-    if detected_colors:
-        return detected_colors[0]
-    return "Unknown"
-
-def open_camera(index: int = 0, warmup_frames: int = 10, timeout_sec: float = 5.0):
-    """Try multiple camera indices with warm-up; return first working capture or None."""
-    candidate_indices = [index, 1, 2]
-    seen = set()
-    for idx in candidate_indices:
-        if idx in seen:
-            continue
-        seen.add(idx)
-        backend = cv2.CAP_ANY
-        if sys.platform == "win32":
-            backend = cv2.CAP_DSHOW
-            os.environ.setdefault("OPENCV_VIDEOIO_PRIORITY_MSMF", "0")
-        cap = cv2.VideoCapture(idx, backend)
-        start = time.time()
-        while not cap.isOpened() and (time.time() - start) < timeout_sec:
-            time.sleep(0.1)
-            cap.open(idx, backend)
-        if not cap.isOpened():
-            continue
-        # Warm up frames
-        for _ in range(warmup_frames):
-            ok, _ = cap.read()
-            if not ok:
-                time.sleep(0.05)
-        print(f"[ColorGame] Using camera index {idx}")
-        return cap
-    return None
+    # Overlapping ranges go to the color listed first in color_ranges
+    dominant, _ = color_counts(frame)
+    return dominant or "Unknown"
+
+
+def find_color_blobs(frame, min_area=MIN_BLOB_AREA):
+    """Every colored object in the frame with bbox, area and centroid, largest first."""
+    return get_color_table().find_blobs(frame, scale=BLOB_SCALE, min_area=min_area, ignore=BACKGROUND_COLORS)
 
 
+class ColorDetector(Detector):
+    """
+    Color game per-frame analysis behind the common Detector API.
+
+    ``mode="single"`` (default) names the dominant color of the whole frame;
+    ``mode="multi"`` reports every colored blob with its bounding box, area and
+    centroid, and names the largest one. The default comes from GAME_COLOR_MODE.
+    """
+
+    game = "color"
+
+    def __init__(self, mode=None):
+        self.mode = mode or os.environ.get(COLOR_MODE_ENV, "single")
+        if self.mode not in ("single", "multi"):
+            raise ValueError(f"Unknown color mode {self.mode!r}; expected 'single' or 'multi'")
+
+    def process(self, frame):
+        if self.mode == "multi":
+            blobs = find_color_blobs(frame)
+            return {"label": blobs[0]["label"] if blobs else None, "detections": blobs}
+
+        label, counts = color_counts(frame)
+        detections = [
+            {"label": name, "pixels": pixels}
+            for name, pixels in sorted(counts.items(), key=lambda item: -item[1])
+            if pixels > MIN_COLOR_PIXELS
+        ]
+        return {"label": label, "detections": detections, "counts": counts}
+
 def main():
-    cap = open_camera(0)
+    cap = CameraSource.open(0)
     if cap is None:
         print("❌ Webcam not accessible on indices (0,1,2). Exiting.")
-        time.sleep(2)
+        emit("failed", error="Webcam not accessible on indices (0,1,2)")
         sys.exit(2)
 
+    detector = ColorDetector()
     font = cv2.FONT_HERSHEY_SIMPLEX
     detected_colors_history = []
     last_detection_time = time.time()
@@ -97,17 +138,12 @@ def main():
         print("Color Detection Game Started!")
     print("Show different colored objects to the camera")
     print("Press 'q' to quit")
+    emit("ready", game="color")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        # Flip frame horizontally for mirror effect
-        frame = cv2.flip(frame, 1)
-        
-        # Detect color
-        detected_color = detect_color(frame)
+    def observe(result):
+        """Track the detected color and log new ones (every frame, also headless)."""
+        nonlocal current_color, color_confidence, last_detection_time
+        detected_color = result["label"] or "Unknown"
         current_time = time.time()
         
         # Update color tracking
@@ -129,7 +165,17 @@ def main():
                     print(f"✅ New color detected: {detected_color}")
                 except Exception:
                     print(f"New color detected: {detected_color}")
-        
+
+    def annotate(frame, result):
+        """Pipeline annotate stage: draw the game UI."""
+        # Outline every object found in multi-object mode
+        for blob in result["detections"]:
+            if "bbox" not in blob:
+                continue
+            x, y, w, h = blob["bbox"]
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 255), 2)
+            cv2.putText(frame, blob["label"], (x, max(15, y - 8)), font, 0.6, (0, 255, 255), 2)
+
         # Create display info
         display_text = f"Current: {current_color}" if current_color != "Unknown" else "Show a colored object!"
         
@@ -164,25 +210,26 @@ def main():
                 cv2.rectangle(frame, (frame.shape[1] - 150, 30), (frame.shape[1] - 30, 100), color_bgr, -1)
                 cv2.rectangle(frame, (frame.shape[1] - 150, 30), (frame.shape[1] - 30, 100), (0, 0, 0), 2)
 
-        cv2.imshow("🎨 Color Detection Game", frame)
-
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
+        return frame
 
-    # Game summary
     try:
-        print("\n🎯 Game Summary:")
-    except Exception:
-        print("\nGame Summary:")
-    print(f"Total colors detected: {len(detected_colors_history)}")
-    if detected_colors_history:
-        print(f"Colors found: {', '.join(detected_colors_history)}")
-    else:
-        print("No colors were detected. Try showing more colorful objects!")
+        # Capture, mirror, color detection, annotation and display overlap on separate threads
+        run_game_pipeline(cap, "🎨 Color Detection Game", detector.process, annotate, observe=observe)
+    finally:
+        # Game summary
+        try:
+            print("\n🎯 Game Summary:")
+        except Exception:
+            print("\nGame Summary:")
+        print(f"Total colors detected: {len(detected_colors_history)}")
+        if detected_colors_history:
+            print(f"Colors found: {', '.join(detected_colors_history)}")
+        else:
+            print("No colors were detected. Try showing more colorful objects!")
     
-    cap.release()
-    cv2.destroyAllWindows()
+        cap.release()
+        emit("camera_released")
+        destroy_windows()
 
 if __name__ == "__main__":
     main()
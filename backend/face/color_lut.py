@@ -0,0 +1,305 @@
+"""
+Single-pass HSV color classification through a compiled lookup table.
+
+``color_ranges`` style definitions (name → inclusive HSV box) are compiled
+once into:
+
+* one lookup table per HSV channel that maps a value to the index of the
+  interval it falls in between range boundaries, pre-multiplied so that the
+  three lookups add up to a cell index, and
+* a table mapping every (h, s, v) cell to a color label, with overlapping
+  ranges resolved by priority (earlier definitions win).
+
+Because range boundaries are cell boundaries the result is exact, and the
+cell table has only a few thousand entries (it stays in cache). Per frame we
+do one ``cv2.LUT``, one channel sum and one ``cv2.calcHist`` over the cell
+indices; per-color pixel counts then fall out of a tiny ``np.bincount`` over
+the cells instead of one full-frame ``cv2.inRange`` mask per color.
+
+Compiled tables can be saved as a small binary file (``save_table``) and
+mapped back with ``np.memmap`` (``load_table``), so calibrated tables cost
+nothing to load and every game process shares the same pages. The file keeps
+the ranges it was compiled from; a table written by an older version of this
+module is recompiled from them (``load_or_rebuild``).
+"""
+import hashlib
+import json
+import os
+import struct
+import time
+
+import cv2
+import numpy as np
+
+UNKNOWN = "Unknown"
+_CHANNEL_LIMITS = (256, 256, 256)
+
+TABLE_MAGIC = b"ASDCOLOR"
+# Bump whenever the file layout or the way ranges are compiled changes
+TABLE_VERSION = 1
+# magic, version, metadata length, interval counts (h, s, v), digest of the source ranges
+_HEADER = struct.Struct("<8sIIIII32s")
+
+
+class StaleTableError(ValueError):
+    """A saved table was written by another version or does not match its ranges."""
+
+
+def label_name(range_name):
+    # "Red2" is the second half of red wrapping around the hue circle
+    return range_name.rstrip("0123456789")
+
+
+class ColorTable:
+    """Compiled HSV → color label table. Build with ``from_ranges``."""
+
+    def __init__(self, names, bounds, cells, ranges=None):
+        self.ranges = ranges
+        self.names = list(names)                 # label i + 1 -> names[i]; label 0 is UNKNOWN
+        self.label_names = [UNKNOWN, *self.names]
+        self.bounds = [np.asarray(b, dtype=np.int32) for b in bounds]
+        self.cells = np.ascontiguousarray(cells, dtype=np.uint8).ravel()
+        self.shape = tuple(len(b) - 1 for b in self.bounds)
+        self.cell_count = int(np.prod(self.shape))
+        if self.cells.size != self.cell_count:
+            raise ValueError(f"Cell table has {self.cells.size} entries, expected {self.cell_count}")
+        if self.cell_count > np.iinfo(np.uint16).max:
+            raise ValueError("Too many range boundaries for a 16-bit cell index")
+
+        strides = (self.shape[1] * self.shape[2], self.shape[2], 1)
+        channel_luts = []
+        for channel, bound in enumerate(self.bounds):
+            interval = np.searchsorted(bound, np.arange(256), side="right") - 1
+            channel_luts.append(np.clip(interval, 0, self.shape[channel] - 1) * strides[channel])
+        self._lut = np.stack(channel_luts, axis=-1).astype(np.uint16).reshape(256, 1, 3)
+        self._sum = np.ones((1, 3), dtype=np.float32)
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        """Compile ``{name: [(h, s, v) low, (h, s, v) high]}``; earlier entries win where ranges overlap."""
+        items = list(ranges.items())
+        names = []
+        for range_name, _ in items:
+            name = label_name(range_name)
+            if name not in names:
+                names.append(name)
+
+        bounds = []
+        for channel in range(3):
+            edges = {0, _CHANNEL_LIMITS[channel]}
+            for _, (low, high) in items:
+                edges.add(int(low[channel]))
+                edges.add(min(int(high[channel]) + 1, _CHANNEL_LIMITS[channel]))
+            bounds.append(sorted(edges))
+
+        # Every cell is uniform, so testing its first value decides the whole cell
+        h, s, v = np.meshgrid(*(np.asarray(b[:-1]) for b in bounds), indexing="ij")
+        cells = np.zeros(h.shape, dtype=np.uint8)
+        for range_name, (low, high) in reversed(items):
+            inside = (
+                (h >= low[0]) & (h <= high[0])
+                & (s >= low[1]) & (s <= high[1])
+                & (v >= low[2]) & (v <= high[2])
+            )
+            cells[inside] = names.index(label_name(range_name)) + 1
+        return cls(names, bounds, cells, ranges=_plain_ranges(ranges))
+
+    def cell_index(self, hsv):
+        """Per-pixel cell index (uint16) of an HSV image."""
+        return cv2.transform(cv2.LUT(hsv, self._lut), self._sum)
+
+    def label_image(self, frame, hsv=None):
+        """Per-pixel color label (uint8, 0 = unknown) of a BGR frame."""
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV) if hsv is None else hsv
+        return self.cells.take(self.cell_index(hsv))
+
+    def counts(self, frame, hsv=None):
+        """Pixel count per label (index 0 = unknown) of a BGR frame, in one pass."""
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV) if hsv is None else hsv
+        index = self.cell_index(hsv)
+        per_cell = cv2.calcHist([index], [0], None, [self.cell_count], [0, self.cell_count]).ravel()
+        return np.bincount(self.cells, weights=per_cell, minlength=len(self.label_names)).astype(np.int64)
+
+    def classify(self, frame, min_pixels=0, hsv=None):
+        """
+        Return ``(dominant, counts)``: the color with the most pixels (None if
+        it has ``min_pixels`` or fewer) and ``{name: pixels}`` for every color seen.
+        """
+        counts = self.counts(frame, hsv)
+        by_name = {self.label_names[i]: int(n) for i, n in enumerate(counts) if i and n}
+        best = int(np.argmax(counts[1:])) + 1 if len(counts) > 1 else 0
+        dominant = self.label_names[best] if best and counts[best] > min_pixels else None
+        return dominant, by_name
+
+    def find_blobs(self, frame, scale=0.25, min_area=1500, ignore=()):
+        """
+        Every connected region of one color, largest first, as dicts with
+        ``label``, ``bbox`` [x, y, w, h], ``area`` and ``centroid`` (x, y) in
+        full-frame pixels.
+
+        Labels come from one pass over a downscaled frame. Pixels that border a
+        different label are cleared first, so a single 4-connected
+        ``cv2.connectedComponentsWithStats`` separates touching objects of
+        different colors and every component has exactly one label.
+        """
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        labels = self.label_image(small)
+
+        keep = labels != 0
+        for name in ignore:
+            if name in self.label_names:
+                keep &= labels != self.label_names.index(name)
+        edge_x = labels[:, :-1] != labels[:, 1:]
+        edge_y = labels[:-1, :] != labels[1:, :]
+        keep[:, :-1] &= ~edge_x
+        keep[:, 1:] &= ~edge_x
+        keep[:-1, :] &= ~edge_y
+        keep[1:, :] &= ~edge_y
+
+        count, components, stats, centroids = cv2.connectedComponentsWithStats(
+            keep.view(np.uint8), connectivity=4
+        )
+        if count <= 1:
+            return []
+        component_label = np.zeros(count, dtype=np.uint8)
+        component_label[components[keep]] = labels[keep]
+
+        inv = 1.0 / scale
+        min_small_area = min_area * scale * scale
+        blobs = []
+        for i in np.argsort(-stats[1:, cv2.CC_STAT_AREA]) + 1:
+            area = stats[i, cv2.CC_STAT_AREA]
+            if area < min_small_area:
+                break
+            # Grow back the border pixel cleared between neighbouring labels
+            x0, y0 = max(0, stats[i, 0] - 1), max(0, stats[i, 1] - 1)
+            x1 = min(labels.shape[1], stats[i, 0] + stats[i, 2] + 1)
+            y1 = min(labels.shape[0], stats[i, 1] + stats[i, 3] + 1)
+            cx, cy = centroids[i]
+            blobs.append({
+                "label": self.label_names[component_label[i]],
+                "bbox": [int(x0 * inv), int(y0 * inv), int((x1 - x0) * inv), int((y1 - y0) * inv)],
+                "area": int(area * inv * inv),
+                "centroid": (int(cx * inv), int(cy * inv)),
+            })
+        return blobs
+
+
+# -- persistence ---------------------------------------------------------------
+
+CALIBRATION_DIR_ENV = "GAME_CALIBRATION_DIR"
+CAMERA_ID_ENV = "GAME_CAMERA_ID"
+
+
+def calibration_dir():
+    """Directory for calibration files: GAME_CALIBRATION_DIR or face/calibration."""
+    return os.environ.get(CALIBRATION_DIR_ENV) or os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibration")
+
+
+def safe_name(name):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+def calibration_path(camera_id=None):
+    """Where the calibrated table for ``camera_id`` (default: GAME_CAMERA_ID or "default") lives."""
+    camera_id = camera_id or os.environ.get(CAMERA_ID_ENV) or "default"
+    return os.path.join(calibration_dir(), f"color_{safe_name(camera_id)}.lut")
+
+
+def _plain_ranges(ranges):
+    """Ranges as JSON-friendly lists, keeping their priority order."""
+    return {name: [[int(x) for x in low], [int(x) for x in high]] for name, (low, high) in ranges.items()}
+
+
+def ranges_digest(ranges):
+    return hashlib.sha256(json.dumps(_plain_ranges(ranges)).encode("utf-8")).digest()
+
+
+def _align(n, to=8):
+    return (n + to - 1) // to * to
+
+
+def save_table(path, table, **meta):
+    """Write ``table`` (built by ``from_ranges``) to ``path`` atomically, with ``meta`` stored alongside."""
+    if table.ranges is None:
+        raise ValueError("Only tables compiled from ranges can be saved")
+    meta = {**meta, "names": table.names, "ranges": table.ranges, "created_at": meta.get("created_at", time.time())}
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    header = _HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(meta_bytes), *table.shape, ranges_digest(table.ranges))
+    bounds = np.concatenate(table.bounds).astype("<i4")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(meta_bytes)
+        f.write(b"\0" * (_align(f.tell()) - f.tell()))
+        f.write(bounds.tobytes())
+        f.write(np.ascontiguousarray(table.cells, dtype=np.uint8).tobytes())
+    # Readers either see the old file or the complete new one
+    os.replace(tmp_path, path)
+
+
+def _read_header(path):
+    with open(path, "rb") as f:
+        raw = f.read(_HEADER.size)
+        if len(raw) < _HEADER.size:
+            raise StaleTableError(f"{path} is truncated")
+        magic, version, meta_len, n_h, n_s, n_v, digest = _HEADER.unpack(raw)
+        if magic != TABLE_MAGIC:
+            raise StaleTableError(f"{path} is not a color table")
+        try:
+            meta = json.loads(f.read(meta_len).decode("utf-8"))
+        except ValueError as e:
+            raise StaleTableError(f"{path} has unreadable metadata: {e}")
+    return version, meta, (n_h, n_s, n_v), digest, _align(_HEADER.size + meta_len)
+
+
+def load_table(path):
+    """
+    Map a saved table. Returns ``(table, meta)``; raises FileNotFoundError or
+    StaleTableError (old version, corrupt file, ranges that do not match).
+    """
+    version, meta, shape, digest, offset = _read_header(path)
+    if version != TABLE_VERSION:
+        raise StaleTableError(f"{path} has table version {version}, expected {TABLE_VERSION}")
+    if ranges_digest(meta.get("ranges", {})) != digest:
+        raise StaleTableError(f"{path} does not match the ranges it claims to be built from")
+
+    bound_sizes = [n + 1 for n in shape]
+    cell_count = int(np.prod(shape))
+    expected_size = offset + 4 * sum(bound_sizes) + cell_count
+    if os.path.getsize(path) != expected_size:
+        raise StaleTableError(f"{path} has {os.path.getsize(path)} bytes, expected {expected_size}")
+
+    bounds_flat = np.memmap(path, dtype="<i4", mode="r", offset=offset, shape=(sum(bound_sizes),))
+    cells = np.memmap(path, dtype=np.uint8, mode="r", offset=offset + 4 * sum(bound_sizes), shape=(cell_count,))
+    bounds = np.split(np.asarray(bounds_flat), np.cumsum(bound_sizes)[:-1])
+    return ColorTable(meta["names"], bounds, cells, ranges=meta["ranges"]), meta
+
+
+def load_or_rebuild(path):
+    """
+    Load the table at ``path``; if it is stale, recompile it from the ranges
+    stored in the file and rewrite it. Returns ``(table, meta)`` or None when
+    there is no usable table.
+    """
+    try:
+        return load_table(path)
+    except FileNotFoundError:
+        return None
+    except StaleTableError as e:
+        print(f"[ColorTable] {e}; rebuilding")
+    try:
+        _, meta, _, _, _ = _read_header(path)
+        table = ColorTable.from_ranges(meta["ranges"])
+    except (StaleTableError, KeyError, TypeError, ValueError) as e:
+        print(f"[ColorTable] Cannot rebuild {path}: {e}")
+        return None
+    meta = {k: v for k, v in meta.items() if k not in ("names", "ranges")}
+    meta["rebuilt_at"] = time.time()
+    try:
+        save_table(path, table, **meta)
+    except OSError as e:
+        print(f"[ColorTable] Could not rewrite {path}: {e}")
+    return table, meta
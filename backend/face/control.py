@@ -0,0 +1,143 @@
+"""
+Game side of the control channel to the Flask backend.
+
+The backend passes the listener address, auth key and a worker id through the
+environment. When they are missing (a game script started by hand) the channel
+stays disconnected and every call is a harmless no-op.
+
+Lifecycle events every game reports:
+    ready            camera is open and the main loop is about to start
+    camera_released  the capture device has been released
+    exited           the process is shutting down (sent from atexit)
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import Client
+
+# Keep these in sync with backend/game_control.py
+CONTROL_ADDRESS_ENV = "GAME_CONTROL_ADDRESS"
+CONTROL_AUTHKEY_ENV = "GAME_CONTROL_AUTHKEY"
+WORKER_ID_ENV = "GAME_WORKER_ID"
+
+
+class ControlChannel:
+    """Connection used to report events to, and receive commands from, the backend."""
+
+    def __init__(self, address=None, authkey=None, worker_id=None):
+        self.worker_id = worker_id
+        self.quit_event = threading.Event()
+        self._conn = None
+        self._send_lock = threading.Lock()
+        self._commands = queue.Queue()
+        self._handlers = {}
+        self._exit_reported = False
+        if address and worker_id:
+            try:
+                self._conn = Client(address, authkey=authkey)
+            except Exception as e:
+                print(f"[Control] Could not connect to backend at {address}: {e}")
+                self._conn = None
+            else:
+                self.send("hello", pid=os.getpid())
+                threading.Thread(target=self._read_commands, name="control-reader", daemon=True).start()
+                atexit.register(self.report_exit)
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def send(self, event: str, **fields) -> bool:
+        """Send an event dict to the backend. Returns False when disconnected."""
+        conn = self._conn
+        if conn is None:
+            return False
+        message = {"event": event, "worker_id": self.worker_id, "ts": time.monotonic()}
+        message.update(fields)
+        try:
+            with self._send_lock:
+                conn.send(message)
+            return True
+        except (OSError, EOFError, ValueError):
+            self._conn = None
+            return False
+
+    def _read_commands(self):
+        conn = self._conn
+        while conn is not None:
+            try:
+                message = conn.recv()
+            except (OSError, EOFError):
+                break
+            if isinstance(message, dict) and message.get("cmd") == "quit":
+                self.quit_event.set()
+            handler = self._handlers.get(message.get("cmd")) if isinstance(message, dict) else None
+            if handler is not None:
+                try:
+                    handler(message)
+                except Exception as e:
+                    print(f"[Control] Handler for {message.get('cmd')!r} failed: {e}")
+                continue
+            self._commands.put(message)
+        # Backend went away: nobody is left to stop us, so treat it as a quit
+        self._conn = None
+        self.quit_event.set()
+        self._commands.put(None)
+
+    def on_command(self, cmd, handler) -> None:
+        """Call ``handler(message)`` on the reader thread for ``cmd`` instead of queueing it for ``recv``."""
+        self._handlers[cmd] = handler
+
+    def recv(self, timeout=None):
+        """
+        Wait for the next command from the backend.
+        Returns None on timeout or when the connection is closed.
+        """
+        if self._conn is None and self._commands.empty():
+            return None
+        try:
+            return self._commands.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def report_exit(self) -> None:
+        """Send the ``exited`` event once."""
+        if not self._exit_reported:
+            self._exit_reported = True
+            self.send("exited", pid=os.getpid())
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+
+_channel = None
+
+
+def get_channel() -> ControlChannel:
+    """Return the process-wide channel, connecting on first use."""
+    global _channel
+    if _channel is None:
+        authkey = os.environ.get(CONTROL_AUTHKEY_ENV)
+        _channel = ControlChannel(
+            os.environ.get(CONTROL_ADDRESS_ENV),
+            authkey.encode() if authkey else None,
+            os.environ.get(WORKER_ID_ENV),
+        )
+    return _channel
+
+
+def emit(event: str, **fields) -> bool:
+    """Shortcut for ``get_channel().send(...)``."""
+    return get_channel().send(event, **fields)
+
+
+def quit_requested() -> bool:
+    """True once the backend has asked this game to stop."""
+    return get_channel().quit_event.is_set()
@@ -0,0 +1,104 @@
+"""
+Common per-frame detector API and the registry of games.
+
+Every game exposes its per-frame analysis as a ``Detector``:
+
+    detector = create_detector("color")
+    result = detector.process(frame)
+
+``process`` takes a BGR frame and returns a dict with at least ``label`` (the
+main answer for the frame, or None) and ``detections`` (a list of dicts with
+``label`` and, where the detector knows them, ``bbox`` [x, y, w, h] and
+``confidence``). It never draws on the frame.
+
+This module imports no vision packages: detector classes are loaded lazily
+from their game module, so the backend can read the registry without pulling
+OpenCV or MediaPipe into its process.
+"""
+import importlib
+
+
+class Detector:
+    """Base class for the per-frame analysis of a game."""
+
+    game = None
+
+    def process(self, frame) -> dict:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release models or native resources held by the detector."""
+
+
+class DetectorSpec:
+    """Where a detector lives and what it needs to run."""
+
+    def __init__(self, key, module, class_name, requires, game=None, fallback=None):
+        self.key = key
+        self.game = game or key
+        self.module = module
+        self.class_name = class_name
+        self.requires = tuple(requires)
+        self.fallback = fallback
+
+    @property
+    def script(self):
+        return f"{self.module}.py"
+
+    def as_dict(self):
+        return {
+            "key": self.key,
+            "game": self.game,
+            "script": self.script,
+            "detector": f"{self.module}.{self.class_name}",
+            "requires": list(self.requires),
+            "fallback": self.fallback,
+        }
+
+
+DETECTORS = {}
+
+
+def register(spec):
+    DETECTORS[spec.key] = spec
+    return spec
+
+
+register(DetectorSpec("color", "color_identifier", "ColorDetector", requires=("cv2", "numpy")))
+register(DetectorSpec("shape", "shape", "ShapeDetector", requires=("cv2", "numpy")))
+register(DetectorSpec("emotion", "emotion_game", "EmotionDetector", requires=("cv2",)))
+register(DetectorSpec(
+    "gesture", "gesture_recognition", "GestureDetector",
+    requires=("cv2", "numpy", "mediapipe"), fallback="gesture_fallback",
+))
+register(DetectorSpec(
+    "gesture_fallback", "gesture_recognition_fallback", "GestureFallbackDetector",
+    requires=("cv2",), game="gesture",
+))
+
+# Games the frontend can start (fallback variants are reached through resolve())
+GAMES = ("color", "shape", "emotion", "gesture")
+
+
+def resolve(game, is_available=None):
+    """
+    Return the spec to run for ``game``, following fallbacks while a required
+    module is unavailable. Returns None for unknown games.
+    """
+    spec = DETECTORS.get(game)
+    while spec is not None and spec.fallback and is_available is not None:
+        if all(is_available(module) for module in spec.requires):
+            break
+        spec = DETECTORS[spec.fallback]
+    return spec
+
+
+def load_detector_class(key):
+    spec = DETECTORS[key]
+    module = importlib.import_module(spec.module)
+    return getattr(module, spec.class_name)
+
+
+def create_detector(key, **kwargs) -> Detector:
+    """Import the detector's game module and instantiate its detector."""
+    return load_detector_class(key)(**kwargs)
@@ -0,0 +1,115 @@
+"""
+Pluggable emotion backends for the emotion game.
+
+A backend turns the grayscale face crops of one frame into emotion labels, in
+face order:
+
+    heuristic  Haar eye/smile cascades and a few rules (default; no ML deps)
+    model      a neural model behind a ``MicroBatcher`` (``inference_worker.py``)
+
+``GAME_EMOTION_BACKEND`` selects one. The model backend talks to the backend's
+dedicated inference worker when ``GAME_INFERENCE_ADDRESS`` is set, so faces
+from all running games share batches; otherwise it batches in-process.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+EMOTION_BACKEND_ENV = "GAME_EMOTION_BACKEND"
+DEFAULT_BACKEND = "heuristic"
+
+# Model emotion names → labels shown by the game
+MODEL_LABELS = {
+    "angry": "Angry 😠",
+    "disgust": "Disgusted 🤢",
+    "fear": "Scared 😨",
+    "happy": "Happy 😊",
+    "sad": "Sad 😢",
+    "surprise": "Surprised 😮",
+    "neutral": "Neutral 😐",
+}
+
+
+class EmotionBackend:
+    """Labels the faces of one frame."""
+
+    name = None
+
+    def classify(self, faces):
+        """Emotion label per grayscale face crop, in order."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release threads, models or connections held by the backend."""
+
+
+class HeuristicBackend(EmotionBackend):
+    """
+    Runs ``classify_face`` per crop; with more than one face they are spread
+    over a small thread pool (the cascades release the GIL).
+    """
+
+    name = "heuristic"
+
+    def __init__(self, classify_face, workers=1, initializer=None):
+        self.classify_face = classify_face
+        self.workers = max(1, workers)
+        self._pool = None
+        if self.workers > 1:
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="emotion-face", initializer=initializer)
+
+    def classify(self, faces):
+        if self._pool is not None and len(faces) > 1:
+            return list(self._pool.map(self.classify_face, faces))
+        return [self.classify_face(face) for face in faces]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+class ModelBackend(EmotionBackend):
+    """Neural emotion model through the inference worker or an in-process ``MicroBatcher``."""
+
+    name = "model"
+
+    def __init__(self, classifier):
+        self.classifier = classifier
+
+    @classmethod
+    def create(cls, model=None):
+        from inference_worker import InferenceClient, MicroBatcher, load_model
+
+        client = InferenceClient.from_env()
+        if client is not None:
+            print("[Emotion] Using the shared inference worker")
+            return cls(client)
+        return cls(MicroBatcher(load_model(model)))
+
+    def classify(self, faces):
+        if not faces:
+            return []
+        return [MODEL_LABELS.get(name, name) for name in self.classifier.classify(faces)]
+
+    def close(self):
+        self.classifier.close()
+
+
+def backend_name(name=None):
+    return (name or os.environ.get(EMOTION_BACKEND_ENV) or DEFAULT_BACKEND).strip().lower()
+
+
+def create_backend(name, heuristic):
+    """
+    Backend called ``name`` (or GAME_EMOTION_BACKEND). ``heuristic`` builds the
+    heuristic backend, which is also the fallback when the model cannot load.
+    """
+    name = backend_name(name)
+    if name == "model":
+        try:
+            return ModelBackend.create()
+        except Exception as e:
+            print(f"[Emotion] Model backend unavailable ({e}); using heuristics")
+    elif name != DEFAULT_BACKEND:
+        print(f"[Emotion] Unknown emotion backend {name!r}; using heuristics")
+    return heuristic()
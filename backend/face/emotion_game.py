@@ -1,9 +1,17 @@
 import cv2
+import os
 import sys
+import threading
 import time
-import os
 from typing import Tuple
 
+from camera import CameraSource
+from control import emit
+from detectors import Detector
+from emotion_backends import HeuristicBackend, create_backend
+from face_tracker import FaceTracker
+from pipeline import destroy_windows, run_game_pipeline
+
 def _force_utf8():
     if sys.platform.startswith("win"):
         try:
@@ -20,58 +28,98 @@ FONT = cv2.FONT_HERSHEY_SIMPLEX
 TEXT_COLOR: Tuple[int, int, int] = (255, 0, 0)  # Blue
 QUIT_KEY = 'q'
 
-class EmotionDetectorApp:
-    """
-    A webcam-based emotion detection application using OpenCV face detection
-    and basic facial feature analysis for educational purposes.
-    """
+# Threads analysing the faces of one frame in parallel (1 analyses them in turn)
+FACE_WORKERS_ENV = "GAME_FACE_WORKERS"
+DEFAULT_FACE_WORKERS = 2
 
-    def __init__(self, camera_index: int = 0):
-        # Prefer DirectShow on Windows; fall back with warm-up attempts
-        backend = cv2.CAP_ANY
-        if sys.platform == "win32":
-            backend = cv2.CAP_DSHOW
-            os.environ.setdefault("OPENCV_VIDEOIO_PRIORITY_MSMF", "0")
-        self.cap = cv2.VideoCapture(camera_index, backend)
-        start = time.time()
-        while not self.cap.isOpened() and (time.time() - start) < 5.0:
-            time.sleep(0.1)
-            self.cap.open(camera_index, backend)
-        if not self.cap.isOpened():
-            print(f"Error: Could not open video stream from camera index {camera_index}.")
-            sys.exit("Exiting application.")
-        # Warm-up frames
-        for _ in range(10):
-            ok, _ = self.cap.read()
-            if not ok:
-                time.sleep(0.05)
-
-        # Load face detector
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        self.eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
-        self.smile_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_smile.xml')
-        
-        self.detected_expressions = []
-        self.last_detection_time = time.time()
+_CASCADE_FILES = {
+    "face": 'haarcascade_frontalface_default.xml',
+    "eye": 'haarcascade_eye.xml',
+    "smile": 'haarcascade_smile.xml',
+}
+_cascades = {}
 
-    def detect_basic_emotion(self, face_roi):
+
+def load_cascades():
+    """Load the Haar cascades once per process and return them by name."""
+    if not _cascades:
+        for name, filename in _CASCADE_FILES.items():
+            _cascades[name] = cv2.CascadeClassifier(cv2.data.haarcascades + filename)
+    return _cascades
+
+
+_worker_cascades = threading.local()
+
+
+def _init_face_worker():
+    """Give each face-analysis thread its own feature cascades; one classifier is not shared across threads."""
+    _worker_cascades.eye = cv2.CascadeClassifier(cv2.data.haarcascades + _CASCADE_FILES["eye"])
+    _worker_cascades.smile = cv2.CascadeClassifier(cv2.data.haarcascades + _CASCADE_FILES["smile"])
+
+
+def face_workers():
+    """Pool size from GAME_FACE_WORKERS; by default never more threads than CPUs."""
+    default = min(DEFAULT_FACE_WORKERS, os.cpu_count() or 1)
+    try:
+        return max(1, int(os.environ.get(FACE_WORKERS_ENV, default)))
+    except ValueError:
+        return default
+
+
+def preload():
+    """Warm-up hook used by the backend worker pool."""
+    load_cascades()
+
+
+class EmotionDetector(Detector):
+    """Emotion game per-frame analysis behind the common Detector API."""
+
+    game = "emotion"
+
+    def __init__(self, track_faces=False, workers=None, backend=None):
+        cascades = load_cascades()
+        self.face_cascade = cascades["face"]
+        self.eye_cascade = cascades["eye"]
+        self.smile_cascade = cascades["smile"]
+        # Consecutive camera frames: follow faces between full-frame detections
+        self.face_tracker = FaceTracker(self.detect_faces) if track_faces else None
+        # The cascades release the GIL, so faces of one frame can be analysed side by side
+        self.workers = face_workers() if workers is None else max(1, workers)
+        self.backend = create_backend(backend, lambda: HeuristicBackend(
+            self.detect_basic_emotion, self.workers, initializer=_init_face_worker))
+
+    def detect_faces(self, gray):
+        """Full-frame Haar face detection."""
+        return self.face_cascade.detectMultiScale(gray, 1.3, 5)
+
+    def detect_features(self, gray_face):
         """
-        Basic emotion detection based on facial features.
-        This is a simplified approach for educational purposes.
+        Find eyes and smiles in a grayscale face crop. Eyes are only searched
+        for in the upper half of the face and smiles in the lower third, with
+        window sizes bounded by the face size; boxes are face-relative.
         """
-        gray_face = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY) if len(face_roi.shape) == 3 else face_roi
-        
-        # Detect eyes and smile
-        eyes = self.eye_cascade.detectMultiScale(gray_face, 1.3, 5)
-        smiles = self.smile_cascade.detectMultiScale(gray_face, 1.8, 20)
-        
-        # Simple heuristic-based emotion detection
+        eye_cascade = getattr(_worker_cascades, "eye", self.eye_cascade)
+        smile_cascade = getattr(_worker_cascades, "smile", self.smile_cascade)
+        h, w = gray_face.shape[:2]
+        upper = gray_face[:h // 2]
+        eyes = eye_cascade.detectMultiScale(
+            upper, 1.3, 5, minSize=(max(1, w // 8), max(1, h // 10)), maxSize=(w // 2, h // 2))
+
+        top = h - h // 3
+        lower = gray_face[top:]
+        smiles = smile_cascade.detectMultiScale(
+            lower, 1.8, 20, minSize=(max(1, w // 4), max(1, h // 12)), maxSize=(w, h // 3))
+        smiles = [(x, y + top, sw, sh) for (x, y, sw, sh) in smiles]
+        return eyes, smiles
+
+    @staticmethod
+    def classify_features(eyes, smiles, face_area):
+        """Simple heuristic-based emotion from the facial features found."""
         if len(smiles) > 0:
             return "Happy 😊"
         elif len(eyes) >= 2:
             # Calculate eye area ratio for basic emotion inference
             total_eye_area = sum([w * h for (x, y, w, h) in eyes])
-            face_area = gray_face.shape[0] * gray_face.shape[1]
             eye_ratio = total_eye_area / face_area
             
             if eye_ratio > 0.02:
@@ -85,26 +133,87 @@ class EmotionDetectorApp:
         else:
             return "Eyes Closed 😴"
 
+    def detect_basic_emotion(self, face_roi):
+        """
+        Basic emotion detection based on facial features.
+        This is a simplified approach for educational purposes.
+        """
+        gray_face = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY) if len(face_roi.shape) == 3 else face_roi
+        eyes, smiles = self.detect_features(gray_face)
+        return self.classify_features(eyes, smiles, gray_face.shape[0] * gray_face.shape[1])
+
+    def analyze_faces(self, gray, faces):
+        """Emotion per face box, in face order, from the configured emotion backend."""
+        # The grayscale frame is already there; crop it instead of converting the face again
+        return self.backend.classify([gray[y:y+h, x:x+w] for (x, y, w, h) in faces])
+
+    def process(self, frame):
+        """Detect faces and classify each one."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = self.face_tracker.update(gray) if self.face_tracker is not None else self.detect_faces(gray)
+
+        detections = [
+            {"label": emotion, "bbox": [int(x), int(y), int(w), int(h)]}
+            for (x, y, w, h), emotion in zip(faces, self.analyze_faces(gray, faces))
+        ]
+        return {"label": detections[0]["label"] if detections else None, "detections": detections}
+
+    def close(self):
+        self.backend.close()
+
+
+class EmotionDetectorApp:
+    """
+    A webcam-based emotion detection application using OpenCV face detection
+    and basic facial feature analysis for educational purposes.
+    """
+
+    def __init__(self, camera_index: int = 0):
+        self.cap = CameraSource.open(camera_index, fallback_indices=())
+        if self.cap is None:
+            print(f"Error: Could not open video stream from camera index {camera_index}.")
+            emit("failed", error=f"Could not open camera index {camera_index}")
+            sys.exit("Exiting application.")
+
+        # Load face detector (cascades are already resident when started from a warm worker)
+        self.detector = EmotionDetector(track_faces=True)
+        
+        self.detected_expressions = []
+        self.last_detection_time = time.time()
+
+    def detect_basic_emotion(self, face_roi):
+        """Kept for callers of the old API; see EmotionDetector.detect_basic_emotion."""
+        return self.detector.detect_basic_emotion(face_roi)
+
     def _process_frame(self, frame):
         """
         Detects faces and basic emotions in a frame and annotates the video stream.
         """
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+        result = self.detector.process(frame)
+        self._observe(result)
+        return self._annotate(frame, result)
 
+    def _observe(self, result):
+        """Logs expression changes (every frame, also headless)."""
         current_time = time.time()
-        
-        if len(faces) > 0:
-            for (x, y, w, h) in faces:
+        for face in result["detections"]:
+            emotion = face["label"]
+            if (current_time - self.last_detection_time > 2 and
+                    emotion not in self.detected_expressions[-3:]):  # Avoid duplicates
+                self.detected_expressions.append(emotion)
+                self.last_detection_time = current_time
+                print(f"Expression detected: {emotion}")
+
+    def _annotate(self, frame, result):
+        """Draws the detector result and game info onto the frame (pipeline annotate stage)."""
+        if result["detections"]:
+            for face in result["detections"]:
+                x, y, w, h = face["bbox"]
+                emotion = face["label"]
+
                 # Draw face rectangle
                 cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
                 
-                # Extract face region
-                face_roi = frame[y:y+h, x:x+w]
-                
-                # Detect basic emotion
-                emotion = self.detect_basic_emotion(face_roi)
-                
                 # Display emotion
                 cv2.putText(
                     frame,
@@ -115,13 +224,6 @@ class EmotionDetectorApp:
                     TEXT_COLOR,
                     2
                 )
-                
-                # Log emotion detection
-                if (current_time - self.last_detection_time > 2 and 
-                    emotion not in self.detected_expressions[-3:]):  # Avoid duplicates
-                    self.detected_expressions.append(emotion)
-                    self.last_detection_time = current_time
-                    print(f"Expression detected: {emotion}")
         else:
             cv2.putText(frame, "Show your face to the camera!", (50, 50), FONT, 0.8, (0, 0, 255), 2)
 
@@ -145,21 +247,14 @@ class EmotionDetectorApp:
         print("Look at the camera and try different facial expressions")
         print("The system will detect basic emotions and expressions")
         print("Press 'q' to quit")
+        emit("ready", game="emotion")
         
         try:
-            while True:
-                ret, frame = self.cap.read()
-                if not ret:
-                    print("Error: Failed to capture frame. Exiting loop.")
-                    break
-
-                # Flip frame horizontally for mirror effect
-                frame = cv2.flip(frame, 1)
-                processed_frame = self._process_frame(frame)
-                cv2.imshow(WINDOW_NAME, processed_frame)
-
-                if cv2.waitKey(1) & 0xFF == ord(QUIT_KEY):
-                    break
+            # Capture, mirror, detection, annotation and display overlap on separate threads
+            run_game_pipeline(
+                self.cap, WINDOW_NAME, self.detector.process, self._annotate,
+                quit_key=QUIT_KEY, observe=self._observe,
+            )
         finally:
             self.cleanup()
 
@@ -174,10 +269,14 @@ class EmotionDetectorApp:
             print(f"Total expression changes: {len(self.detected_expressions)}")
         else:
             print("No expressions were clearly detected. Try again with better lighting!")
+        tracking = self.detector.face_tracker.stats()
+        print(f"Face detection ran on {tracking['detections']} frames, tracking covered {tracking['tracked']}")
         
         print("Releasing resources and closing windows...")
         self.cap.release()
-        cv2.destroyAllWindows()
+        self.detector.close()
+        emit("camera_released")
+        destroy_windows()
 
 
 def main():
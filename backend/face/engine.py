@@ -0,0 +1,185 @@
+"""
+In-process detector engine.
+
+Hosts several detectors in one interpreter, each on its own thread, instead of
+one game subprocess (and one copy of OpenCV/MediaPipe) per detector. Frames
+are published once; each detector picks up the newest frame whenever it is
+free and skips the ones it missed, so a slow detector never holds back a fast
+one. OpenCV and MediaPipe release the GIL in native code, so the detectors
+really do run side by side.
+
+    python engine.py --detectors color,shape,emotion    # live camera, headless
+"""
+import argparse
+import sys
+import threading
+import time
+
+from detectors import DETECTORS, create_detector
+
+
+class _Slot:
+    """One hosted detector and its latest result."""
+
+    def __init__(self, key, detector):
+        self.key = key
+        self.detector = detector
+        self.result = None
+        self.result_seq = 0
+        self.processed = 0
+        self.skipped = 0
+        self.total_ms = 0.0
+        self.last_ms = None
+        self.error = None
+        self.thread = None
+
+    def stats(self):
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "last_ms": self.last_ms,
+            "avg_ms": round(self.total_ms / self.processed, 2) if self.processed else None,
+            "error": self.error,
+        }
+
+
+class DetectorEngine:
+    """Runs detectors on worker threads against the most recently submitted frame."""
+
+    def __init__(self):
+        self._slots = {}
+        self._frame = None
+        self._seq = 0
+        self._timestamp = None
+        self._running = True
+        self._cond = threading.Condition()
+
+    def add(self, key, **kwargs):
+        """Create the registered detector ``key`` and start its thread."""
+        if key in self._slots:
+            raise ValueError(f"Detector '{key}' is already hosted")
+        slot = _Slot(key, create_detector(key, **kwargs))
+        slot.thread = threading.Thread(target=self._run, args=(slot,), name=f"detector-{key}", daemon=True)
+        self._slots[key] = slot
+        slot.thread.start()
+        return slot.detector
+
+    def submit(self, frame, timestamp=None):
+        """
+        Publish a frame to every detector and return its sequence number.
+        Detectors must treat the frame as read-only.
+        """
+        with self._cond:
+            self._seq += 1
+            self._frame = frame
+            self._timestamp = time.monotonic() if timestamp is None else timestamp
+            self._cond.notify_all()
+            return self._seq
+
+    def _run(self, slot):
+        last_seq = 0
+        while True:
+            with self._cond:
+                while self._running and self._seq == last_seq:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                frame, seq = self._frame, self._seq
+            if last_seq and seq - last_seq > 1:
+                slot.skipped += seq - last_seq - 1
+            last_seq = seq
+
+            started = time.perf_counter()
+            try:
+                result = slot.detector.process(frame)
+                slot.error = None
+            except Exception as e:
+                result = None
+                slot.error = f"{type(e).__name__}: {e}"
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+            with self._cond:
+                slot.result = result
+                slot.result_seq = seq
+                slot.processed += 1
+                slot.total_ms += elapsed_ms
+                slot.last_ms = round(elapsed_ms, 2)
+                self._cond.notify_all()
+
+    def wait(self, seq, timeout=None):
+        """Block until every detector has produced a result for frame ``seq`` (or later)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while any(slot.result_seq < seq for slot in self._slots.values()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def results(self):
+        """Latest result per detector with the sequence number of the frame it came from."""
+        with self._cond:
+            return {key: {"seq": slot.result_seq, "result": slot.result} for key, slot in self._slots.items()}
+
+    def stats(self):
+        with self._cond:
+            return {key: slot.stats() for key, slot in self._slots.items()}
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for slot in self._slots.values():
+            slot.thread.join(timeout=2)
+            try:
+                slot.detector.close()
+            except Exception:
+                pass
+
+
+def main():
+    import cv2
+    from camera import CameraSource
+    from control import emit, quit_requested
+
+    parser = argparse.ArgumentParser(description="Run several detectors in one process on the live camera")
+    parser.add_argument("--detectors", default="color,shape",
+                        help=f"Comma separated detector keys ({', '.join(DETECTORS)})")
+    parser.add_argument("--camera", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = DetectorEngine()
+    for key in [k.strip() for k in args.detectors.split(",") if k.strip()]:
+        engine.add(key)
+
+    cap = CameraSource.open(args.camera)
+    if cap is None:
+        print("❌ Webcam not accessible. Exiting.")
+        emit("failed", error="Webcam not accessible")
+        engine.stop()
+        sys.exit(2)
+
+    print(f"[Engine] Hosting detectors: {', '.join(engine.stats())}")
+    emit("ready", game="engine")
+    last_report = time.time()
+    try:
+        while not quit_requested():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            engine.submit(cv2.flip(frame, 1))
+            if time.time() - last_report >= 1.0:
+                last_report = time.time()
+                labels = {k: (v["result"] or {}).get("label") for k, v in engine.results().items()}
+                print(f"[Engine] {labels} {engine.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        emit("camera_released")
+        engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Face-box tracking between full-frame Haar detections.
+
+Running the face cascade over the whole image pyramid is the most expensive
+call in the emotion game. ``FaceTracker`` runs it only every N frames; in
+between, each face box is followed by template matching (normalised cross
+correlation, on a downscaled copy) inside a small search window around its
+last position. A full detection runs early whenever a match falls below
+``min_confidence``, and on every frame while nobody is in view, so a face
+entering the picture is picked up at once.
+
+N (``interval``: 1 detects on every frame) adapts to the measured frame rate so that full detections happen about
+``detect_hz`` times per second: a fast loop tracks more frames between
+detections, a slow one re-detects more often, since faces move further
+between its frames.
+"""
+import time
+
+import cv2
+
+
+class FaceTrack:
+    """One face box followed by template matching."""
+
+    def __init__(self, box, template):
+        self.box = box
+        self.template = template
+        self.confidence = 1.0
+
+
+class FaceTracker:
+    """
+    ``update(gray)`` returns the face boxes ``[(x, y, w, h), ...]`` for a
+    grayscale frame, from ``detect(gray)`` or from tracking.
+    """
+
+    def __init__(self, detect, detect_hz=3.0, min_interval=1, max_interval=15, min_confidence=0.6,
+                 search_margin=0.3, scale=0.5):
+        self.detect = detect
+        self.detect_hz = detect_hz
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.min_confidence = min_confidence
+        self.search_margin = search_margin
+        self.scale = scale
+        self.interval = min_interval
+        self.tracks = []
+        self.fps = None
+        self.detections = 0
+        self.tracked = 0
+        self.redetections = 0  # full detections forced by a lost track
+        self._since_detection = 0
+        self._last_update = None
+
+    def _measure_fps(self):
+        now = time.perf_counter()
+        if self._last_update is not None and now > self._last_update:
+            fps = 1.0 / (now - self._last_update)
+            self.fps = fps if self.fps is None else 0.9 * self.fps + 0.1 * fps
+            interval = int(self.fps / self.detect_hz)
+            self.interval = max(self.min_interval, min(self.max_interval, interval))
+        self._last_update = now
+
+    def _small(self, image):
+        if self.scale == 1.0:
+            return image
+        return cv2.resize(image, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+
+    def _detect(self, gray):
+        self.detections += 1
+        self._since_detection = 0
+        self.tracks = []
+        for (x, y, w, h) in self.detect(gray):
+            box = (int(x), int(y), int(w), int(h))
+            self.tracks.append(FaceTrack(box, self._small(gray[box[1]:box[1] + box[3], box[0]:box[0] + box[2]])))
+        return [t.box for t in self.tracks]
+
+    def _follow(self, gray, track):
+        """Move ``track`` to its best match in the search window; returns the match score."""
+        x, y, w, h = track.box
+        mx, my = int(w * self.search_margin), int(h * self.search_margin)
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(gray.shape[1], x + w + mx), min(gray.shape[0], y + h + my)
+        window = self._small(gray[y0:y1, x0:x1])
+        th, tw = track.template.shape[:2]
+        if window.shape[0] < th or window.shape[1] < tw:
+            return 0.0  # pushed against the frame edge
+        scores = cv2.matchTemplate(window, track.template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (bx, by) = cv2.minMaxLoc(scores)
+        track.box = (x0 + int(round(bx / self.scale)), y0 + int(round(by / self.scale)), w, h)
+        track.confidence = best
+        return best
+
+    def update(self, gray):
+        self._measure_fps()
+        # Counts this frame, so ``interval`` frames apart means interval - 1 tracked frames in between
+        self._since_detection += 1
+        if not self.tracks or self._since_detection >= self.interval:
+            return self._detect(gray)
+        for track in self.tracks:
+            if self._follow(gray, track) < self.min_confidence:
+                self.redetections += 1
+                return self._detect(gray)
+        self.tracked += 1
+        return [t.box for t in self.tracks]
+
+    def reset(self):
+        """Drop all tracks; the next ``update`` runs a full detection."""
+        self.tracks = []
+        self.detections = 0
+
+    def stats(self):
+        return {
+            "fps": round(self.fps, 1) if self.fps is not None else None,
+            "interval": self.interval,
+            "detections": self.detections,
+            "tracked": self.tracked,
+            "redetections": self.redetections,
+            "faces": len(self.tracks),
+        }
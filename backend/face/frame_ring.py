@@ -0,0 +1,200 @@
+"""
+Shared-memory ring buffer of camera frames.
+
+One writer (the capture service) owns the camera and copies every frame into
+the next slot of a ``multiprocessing.shared_memory`` block; any number of
+readers (game processes) attach by name and get numpy views straight into
+that block. Readers copy a frame out once (``camera.RingCapture``) rather
+than holding views, which the writer overwrites after ``slots`` frames.
+
+Layout of the block::
+
+    header   magic, version, slots, height, width, channels, closed, write_seq
+    slots    per-slot sequence number and capture timestamp
+    frames   ``slots`` frames of height x width x channels uint8
+
+Every slot carries its own sequence number, which doubles as a seqlock: the
+writer zeroes it before overwriting the pixels and sets it to the new sequence
+number afterwards. A reader that still sees the sequence number it started
+with after copying a view (``is_intact``) knows the pixels were not touched
+underneath it.
+"""
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0x52445341  # "ASDR"
+VERSION = 1
+DEFAULT_SLOTS = 4
+
+_HEADER_BYTES = 64
+_ALIGN = 64
+
+# uint32 header fields
+_MAGIC, _VERSION, _SLOTS, _HEIGHT, _WIDTH, _CHANNELS, _CLOSED = range(7)
+_WRITE_SEQ_OFFSET = 32  # uint64
+
+
+def _aligned(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _layout(slots, shape):
+    height, width, channels = shape
+    slot_table = _aligned(_HEADER_BYTES + 16 * slots)
+    frame_bytes = height * width * channels
+    return slot_table, slot_table + slots * frame_bytes
+
+
+class RingFrame:
+    """A frame read from the ring: a read-only view plus where it came from."""
+
+    __slots__ = ("seq", "timestamp", "image")
+
+    def __init__(self, seq, timestamp, image):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.image = image
+
+
+class FrameRing:
+    """Writer or reader end of a shared-memory frame ring. Use ``create`` or ``attach``."""
+
+    def __init__(self, shm, owner):
+        self._shm = shm
+        self.owner = owner
+        self.name = shm.name
+        buf = shm.buf
+        self._meta = np.ndarray((7,), dtype=np.uint32, buffer=buf, offset=0)
+        if self._meta[_MAGIC] != MAGIC or self._meta[_VERSION] != VERSION:
+            raise ValueError(f"Shared memory block '{shm.name}' is not a version {VERSION} frame ring")
+        self.slots = int(self._meta[_SLOTS])
+        self.shape = (int(self._meta[_HEIGHT]), int(self._meta[_WIDTH]), int(self._meta[_CHANNELS]))
+        frames_offset, _ = _layout(self.slots, self.shape)
+        self._write_seq = np.ndarray((1,), dtype=np.uint64, buffer=buf, offset=_WRITE_SEQ_OFFSET)
+        self._slot_seq = np.ndarray((self.slots,), dtype=np.uint64, buffer=buf, offset=_HEADER_BYTES)
+        self._slot_ts = np.ndarray((self.slots,), dtype=np.float64, buffer=buf, offset=_HEADER_BYTES + 8 * self.slots)
+        self._frames = np.ndarray((self.slots, *self.shape), dtype=np.uint8, buffer=buf, offset=frames_offset)
+        if not owner:
+            self._frames.flags.writeable = False
+
+    @classmethod
+    def create(cls, name, shape, slots=DEFAULT_SLOTS):
+        """Create a ring for frames of ``shape`` (h, w, c), replacing a stale block of the same name."""
+        if len(shape) == 2:
+            shape = (*shape, 1)
+        _, size = _layout(slots, shape)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a capture service that was killed
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        meta = np.ndarray((7,), dtype=np.uint32, buffer=shm.buf, offset=0)
+        meta[:] = (MAGIC, VERSION, slots, *shape, 0)
+        np.ndarray((1,), dtype=np.uint64, buffer=shm.buf, offset=_WRITE_SEQ_OFFSET)[0] = 0
+        np.ndarray((slots,), dtype=np.uint64, buffer=shm.buf, offset=_HEADER_BYTES)[:] = 0
+        del meta
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to an existing ring. Raises FileNotFoundError if it does not exist."""
+        # The resource tracker would unlink the block when this reader exits,
+        # while the capture service still owns it
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            try:
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        try:
+            return cls(shm, owner=False)
+        except ValueError:
+            shm.close()
+            raise
+
+    # -- writer --------------------------------------------------------------
+
+    def write(self, frame, timestamp=None):
+        """Copy ``frame`` into the next slot and publish it. Returns its sequence number."""
+        seq = int(self._write_seq[0]) + 1
+        slot = seq % self.slots
+        self._slot_seq[slot] = 0
+        self._frames[slot].reshape(frame.shape)[...] = frame
+        self._slot_ts[slot] = time.time() if timestamp is None else timestamp
+        self._slot_seq[slot] = seq
+        self._write_seq[0] = seq
+        return seq
+
+    def mark_closed(self):
+        """Tell readers that no more frames will be written."""
+        self._meta[_CLOSED] = 1
+
+    # -- reader --------------------------------------------------------------
+
+    @property
+    def closed(self):
+        return bool(self._meta[_CLOSED])
+
+    @property
+    def write_seq(self):
+        return int(self._write_seq[0])
+
+    def latest(self):
+        """Return the newest complete frame as a zero-copy RingFrame, or None if none was written yet."""
+        while True:
+            seq = int(self._write_seq[0])
+            if seq == 0:
+                return None
+            slot = seq % self.slots
+            timestamp = float(self._slot_ts[slot])
+            if int(self._slot_seq[slot]) == seq:
+                image = self._frames[slot]
+                if self.shape[2] == 1:
+                    image = image[:, :, 0]
+                return RingFrame(seq, timestamp, image)
+            # The writer lapped us between reading write_seq and the slot; try again
+
+    def wait_next(self, after_seq, timeout=1.0, poll=0.002):
+        """Block until a frame newer than ``after_seq`` is available. Returns None on timeout or close."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.write_seq > after_seq:
+                frame = self.latest()
+                if frame is not None:
+                    return frame
+            if self.closed or time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+
+    def same_block(self, other):
+        """True when ``other`` maps the same block as this ring (as opposed to one recreated under its name)."""
+        return self.write_seq == other.write_seq and np.array_equal(self._slot_ts, other._slot_ts)
+
+    def is_intact(self, frame):
+        """True while the slot behind ``frame`` has not been overwritten since it was read."""
+        return int(self._slot_seq[frame.seq % self.slots]) == frame.seq
+
+    # -- lifetime ------------------------------------------------------------
+
+    def close(self):
+        # Drop our views first; SharedMemory.close() refuses while buffers are exported
+        self._meta = self._write_seq = self._slot_seq = self._slot_ts = self._frames = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # a caller still holds a frame view; the mapping goes away with the process
+
+    def unlink(self):
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -2,8 +2,16 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import sys
-import time
-import os
+
+from camera import CameraSource
+from control import emit
+from detectors import Detector
+from gesture_rules import load_gesture_table
+from gesture_smoother import GestureSmoother
+from hand_landmarks import (
+    centroids, finger_masks, finger_states, hand_labels, landmarks_to_array, stack_hands, thumb_sides,
+)
+from pipeline import destroy_windows, run_game_pipeline
 
 def _force_utf8():
     if sys.platform.startswith("win"):
@@ -21,147 +29,151 @@ FONT = cv2.FONT_HERSHEY_SIMPLEX
 TEXT_COLOR = (0, 255, 0)
 QUIT_KEY = 'q'
 
+_preloaded_hands = None
+
+
+def create_hands():
+    """Build the MediaPipe Hands graph used by the game."""
+    return mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=2,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5
+    )
+
+
+def preload():
+    """Warm-up hook used by the backend worker pool: build the graph and run one frame."""
+    global _preloaded_hands
+    if _preloaded_hands is None:
+        hands = create_hands()
+        hands.process(np.zeros((120, 160, 3), dtype=np.uint8))
+        _preloaded_hands = hands
+
+
+def _take_hands():
+    """Hand out the preloaded graph once, otherwise build a fresh one."""
+    global _preloaded_hands
+    hands, _preloaded_hands = _preloaded_hands, None
+    return hands if hands is not None else create_hands()
+
+
+class GestureDetector(Detector):
+    """Gesture game per-frame analysis behind the common Detector API."""
+
+    game = "gesture"
+
+    def __init__(self):
+        self.hands = _take_hands()
+        self.gestures = load_gesture_table()
+
+    def detect_gesture(self, landmarks):
+        """
+        Detect gesture based on hand landmarks.
+        Returns the name of the detected gesture.
+        """
+        points = landmarks_to_array(landmarks)[None]
+        sides = thumb_sides(points)
+        return self.classify_fingers(finger_states(points, sides)[0], points[0], sides[0])
+
+    def classify_fingers(self, fingers_up, points=None, side=1):
+        """Gesture name from the five finger states (thumb first) via the compiled gesture table."""
+        return self.gestures.classify(int(finger_masks(np.asarray(fingers_up)[None])[0]), points, side)
+
+    def process(self, frame):
+        """Find hands and classify the gesture of each one."""
+        # Convert BGR to RGB for MediaPipe
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = self.hands.process(rgb_frame)
+
+        # Landmarks of all hands as one (H, 21, 3) array, converted once
+        multi_hand_landmarks = results.multi_hand_landmarks or []
+        points = stack_hands(multi_hand_landmarks)
+        height, width = frame.shape[:2]
+        sides = thumb_sides(points)
+        labels = hand_labels(results.multi_handedness, len(multi_hand_landmarks))
+        states = finger_states(points, sides)
+        masks = finger_masks(states)
+        centers = centroids(points, width, height)
+
+        detections = []
+        for i, hand_landmarks in enumerate(multi_hand_landmarks):
+            detections.append({
+                "label": self.gestures.classify(int(masks[i]), points[i], sides[i]),
+                "center": centers[i].tolist(),
+                "handedness": labels[i],
+                "fingers": states[i].tolist(),
+                # hand_landmarks is the MediaPipe object, used for drawing only
+                "hand_landmarks": hand_landmarks,
+            })
+        return {"label": detections[0]["label"] if detections else None, "detections": detections}
+
+    def close(self):
+        self.hands.close()
+
+
 class GestureRecognitionApp:
     """
     A webcam-based hand gesture recognition application using MediaPipe.
     """
 
     def __init__(self, camera_index: int = 0):
-        # Prefer DirectShow on Windows; warm up frames
-        backend = cv2.CAP_ANY
-        if sys.platform == "win32":
-            backend = cv2.CAP_DSHOW
-            os.environ.setdefault("OPENCV_VIDEOIO_PRIORITY_MSMF", "0")
-        self.cap = cv2.VideoCapture(camera_index, backend)
-        start = time.time()
-        while not self.cap.isOpened() and (time.time() - start) < 5.0:
-            time.sleep(0.1)
-            self.cap.open(camera_index, backend)
-        if not self.cap.isOpened():
+        self.cap = CameraSource.open(camera_index, fallback_indices=())
+        if self.cap is None:
             print(f"Error: Could not open video stream from camera index {camera_index}.")
+            emit("failed", error=f"Could not open camera index {camera_index}")
             sys.exit("Exiting application.")
-        for _ in range(10):
-            ok, _ = self.cap.read()
-            if not ok:
-                time.sleep(0.05)
 
-        # Initialize MediaPipe hands
+        # Initialize MediaPipe hands (already built when started from a warm worker)
+        self.detector = GestureDetector()
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
         self.mp_drawing = mp.solutions.drawing_utils
 
         self.detected_gestures = []
-        self.last_detection_time = time.time()
+        self.smoother = GestureSmoother()
 
     def detect_gesture(self, landmarks):
-        """
-        Detect gesture based on hand landmarks.
-        Returns the name of the detected gesture.
-        """
-        # Get landmark coordinates
-        thumb_tip = landmarks[4]
-        thumb_ip = landmarks[3]
-        index_tip = landmarks[8]
-        index_pip = landmarks[6]
-        middle_tip = landmarks[12]
-        middle_pip = landmarks[10]
-        ring_tip = landmarks[16]
-        ring_pip = landmarks[14]
-        pinky_tip = landmarks[20]
-        pinky_pip = landmarks[18]
-
-        # Count extended fingers
-        fingers_up = []
-
-        # Thumb
-        if thumb_tip.x > thumb_ip.x:  # Right hand
-            fingers_up.append(thumb_tip.x > thumb_ip.x)
-        else:  # Left hand
-            fingers_up.append(thumb_tip.x < thumb_ip.x)
-
-        # Other fingers
-        fingers_up.append(index_tip.y < index_pip.y)
-        fingers_up.append(middle_tip.y < middle_pip.y)
-        fingers_up.append(ring_tip.y < ring_pip.y)
-        fingers_up.append(pinky_tip.y < pinky_pip.y)
-
-        total_fingers = fingers_up.count(True)
-
-        # Gesture recognition logic
-        if total_fingers == 0:
-            return "Fist"
-        elif total_fingers == 1:
-            if fingers_up[1]:  # Only index finger
-                return "Pointing"
-            elif fingers_up[0]:  # Only thumb
-                return "Thumbs Up"
-            else:
-                return "One Finger"
-        elif total_fingers == 2:
-            if fingers_up[1] and fingers_up[2]:  # Index and middle
-                return "Peace Sign"
-            elif fingers_up[0] and fingers_up[1]:  # Thumb and index
-                return "Gun"
-            else:
-                return "Two Fingers"
-        elif total_fingers == 3:
-            if fingers_up[0] and fingers_up[1] and fingers_up[2]:
-                return "Three Fingers"
-            else:
-                return "Three Fingers"
-        elif total_fingers == 4:
-            return "Four Fingers"
-        elif total_fingers == 5:
-            return "Open Hand"
-        else:
-            return "Unknown"
+        """Kept for callers of the old API; see GestureDetector.detect_gesture."""
+        return self.detector.detect_gesture(landmarks)
 
     def _process_frame(self, frame):
         """
         Process each frame for gesture recognition and display results.
         """
-        # Convert BGR to RGB for MediaPipe
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
-
-        # Draw hand landmarks and detect gestures
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Draw landmarks
-                self.mp_drawing.draw_landmarks(
-                    frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
-                )
-
-                # Detect gesture
-                gesture = self.detect_gesture(hand_landmarks.landmark)
-                
-                # Get hand center for text placement
-                landmark_list = []
-                for landmark in hand_landmarks.landmark:
-                    height, width, _ = frame.shape
-                    x, y = int(landmark.x * width), int(landmark.y * height)
-                    landmark_list.append([x, y])
-
-                if landmark_list:
-                    # Calculate center point
-                    center_x = sum([point[0] for point in landmark_list]) // len(landmark_list)
-                    center_y = sum([point[1] for point in landmark_list]) // len(landmark_list)
-
-                    # Display gesture name
-                    cv2.putText(frame, gesture, (center_x - 50, center_y - 50), 
-                               FONT, 1, TEXT_COLOR, 2)
-
-                    # Log gesture
-                    current_time = time.time()
-                    if current_time - self.last_detection_time > 1:
-                        self.detected_gestures.append(gesture)
-                        self.last_detection_time = current_time
-                        print(f"Detected gesture: {gesture}")
+        result = self.detector.process(frame)
+        self._observe(result)
+        return self._annotate(frame, result)
+
+    def _observe(self, result):
+        """Smooths each hand's gesture and reports changes (every frame, also headless)."""
+        # Per-frame labels are noisy: show and log each hand's smoothed gesture
+        labels = {}
+        for i, hand in enumerate(result["detections"]):
+            name = hand["handedness"] or "Hand"
+            hand["key"] = name if name not in labels else f"{name} {i}"
+            labels[hand["key"]] = hand["label"]
+        for event in self.smoother.update(labels):
+            if event["gesture"] is not None:
+                self.detected_gestures.append(event["gesture"])
+                print(f"Detected gesture: {event['gesture']} ({event['hand']} hand)")
+            emit("gesture", hand=event["hand"], gesture=event["gesture"], previous=event["previous"])
+
+    def _annotate(self, frame, result):
+        """Draws landmarks, gesture names and instructions (pipeline annotate stage)."""
+        # Draw hand landmarks and detected gestures
+        for hand in result["detections"]:
+            # Draw landmarks
+            self.mp_drawing.draw_landmarks(
+                frame, hand["hand_landmarks"], self.mp_hands.HAND_CONNECTIONS
+            )
+
+            gesture = self.smoother.stable(hand["key"])
+            if hand["center"] is not None and gesture is not None:
+                center_x, center_y = hand["center"]
+
+                # Display gesture name
+                cv2.putText(frame, gesture, (center_x - 50, center_y - 50), 
+                           FONT, 1, TEXT_COLOR, 2)
 
         # Display instructions
         cv2.putText(frame, "Show hand gestures to the camera!", (10, 30), 
@@ -181,21 +193,14 @@ class GestureRecognitionApp:
         print("Show different hand gestures to the camera")
         print("Try gestures like: Fist, Peace Sign, Thumbs Up, Open Hand, Pointing")
         print("Press 'q' to quit")
+        emit("ready", game="gesture")
         
         try:
-            while True:
-                ret, frame = self.cap.read()
-                if not ret:
-                    print("Error: Failed to capture frame. Exiting loop.")
-                    break
-
-                # Flip frame horizontally for mirror effect
-                frame = cv2.flip(frame, 1)
-                processed_frame = self._process_frame(frame)
-                cv2.imshow(WINDOW_NAME, processed_frame)
-
-                if cv2.waitKey(1) & 0xFF == ord(QUIT_KEY):
-                    break
+            # Capture, mirror, hand tracking, annotation and display overlap on separate threads
+            run_game_pipeline(
+                self.cap, WINDOW_NAME, self.detector.process, self._annotate,
+                quit_key=QUIT_KEY, observe=self._observe,
+            )
         finally:
             self.cleanup()
 
@@ -211,7 +216,9 @@ class GestureRecognitionApp:
         
         print("Releasing resources and closing windows...")
         self.cap.release()
-        cv2.destroyAllWindows()
+        emit("camera_released")
+        self.detector.close()
+        destroy_windows()
 
 
 def main():
@@ -1,76 +1,109 @@
 import cv2
+import numpy as np
 import sys
-import time
-import os
 from typing import Tuple
 
+from camera import CameraSource
+from control import emit, get_channel
+from detectors import Detector
+from gesture_smoother import GestureSmoother
+from pipeline import destroy_windows, headless_mode, run_game_pipeline
+from skin_model import SkinModel, load_skin_model, save_skin_model, skin_model_path
+
 # Constants
 WINDOW_NAME = "Gesture Recognition Game (Fallback Mode)"
 FONT = cv2.FONT_HERSHEY_SIMPLEX
 TEXT_COLOR = (0, 255, 0)
 QUIT_KEY = 'q'
 
-class GestureFallbackApp:
-    """
-    A simplified gesture recognition app that doesn't require MediaPipe.
-    Uses basic computer vision techniques for demonstration purposes.
-    """
+# Skin segmentation runs at this fraction of the camera resolution
+MASK_SCALE = 0.5
+MORPH_KERNEL_SIZE = 11  # at full resolution
+MIN_HAND_AREA = 1000    # at full resolution
+# Convexity defects shallower than this (full-resolution pixels) are contour noise, not finger
+# gaps; the mask's resolution decides how many of those there are, so they are not counted
+MIN_DEFECT_DEPTH = 20
 
-    def __init__(self, camera_index: int = 0):
-        # Prefer DirectShow on Windows; warm up frames
-        backend = cv2.CAP_ANY
-        if sys.platform == "win32":
-            backend = cv2.CAP_DSHOW
-            os.environ.setdefault("OPENCV_VIDEOIO_PRIORITY_MSMF", "0")
-        self.cap = cv2.VideoCapture(camera_index, backend)
-        start = time.time()
-        while not self.cap.isOpened() and (time.time() - start) < 5.0:
-            time.sleep(0.1)
-            self.cap.open(camera_index, backend)
-        if not self.cap.isOpened():
-            print(f"Error: Could not open video stream from camera index {camera_index}.")
-            sys.exit("Exiting application.")
-        for _ in range(10):
-            ok, _ = self.cap.read()
-            if not ok:
-                time.sleep(0.05)
+# Calibration: the palm box (fractions of the frame, centred) and how many frames to sample
+PALM_BOX = (0.2, 0.3)
+CALIBRATION_FRAMES = 15
+CALIBRATE_KEY = 'c'
+SKIP_CALIBRATION_KEY = 's'
+# Actions of the backend's "calibrate" command (the browser's stand-in for the keys)
+CALIBRATION_ACTIONS = ("start", "capture", "skip")
 
-        self.detected_gestures = []
-        self.last_detection_time = time.time()
-        self.frame_count = 0
 
-    def detect_simple_gesture(self, frame):
-        """
-        Simple gesture detection without MediaPipe.
-        Uses basic contour detection and shape analysis.
-        """
+class GestureFallbackDetector(Detector):
+    """Fallback gesture analysis (no MediaPipe) behind the common Detector API."""
+
+    game = "gesture"
+
+    def __init__(self, mask_scale=MASK_SCALE, skin_model=None):
+        self.mask_scale = mask_scale
+        # Learned per-user skin histogram; None uses the fixed HSV range
+        self.skin_model = skin_model
+        # Structuring element sized for the downscaled mask, built once
+        size = max(3, int(MORPH_KERNEL_SIZE * mask_scale) | 1)
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size))
+
+    def skin_mask(self, frame):
+        """Cleaned-up skin mask of ``frame`` at ``mask_scale`` resolution."""
+        small = frame
+        if self.mask_scale != 1.0:
+            small = cv2.resize(frame, None, fx=self.mask_scale, fy=self.mask_scale, interpolation=cv2.INTER_AREA)
+
         # Convert to HSV for better color detection
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        
-        # Define skin color range (this is a simplified approach)
-        lower_skin = (0, 20, 70)
-        upper_skin = (20, 255, 255)
-        
-        # Create mask for skin color
-        mask = cv2.inRange(hsv, lower_skin, upper_skin)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+
+        if self.skin_model is not None:
+            mask = self.skin_model.mask(hsv)
+        else:
+            # Define skin color range (this is a simplified approach)
+            lower_skin = (0, 20, 70)
+            upper_skin = (20, 255, 255)
+
+            # Create mask for skin color
+            mask = cv2.inRange(hsv, lower_skin, upper_skin)
         
         # Apply morphological operations to clean up the mask
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (11, 11))
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        
-        # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+        return mask
+
+    @staticmethod
+    def palm_box(frame):
+        """(x1, y1, x2, y2) of the centred box the palm is held in during calibration."""
+        h, w = frame.shape[:2]
+        half_w, half_h = int(w * PALM_BOX[0] / 2), int(h * PALM_BOX[1] / 2)
+        return w // 2 - half_w, h // 2 - half_h, w // 2 + half_w, h // 2 + half_h
+
+    def sample_skin(self, frame):
+        """HSV pixels inside the palm box, (N, 3) uint8."""
+        x1, y1, x2, y2 = self.palm_box(frame)
+        return cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2HSV).reshape(-1, 3)
+
+    def find_hand(self, frame):
+        """Largest skin blob as a full-resolution contour, or None."""
+        contours, _ = cv2.findContours(self.skin_mask(frame), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         if not contours:
-            return "No Hand Detected"
-        
+            return None
+
         # Find the largest contour (assume it's the hand)
         largest_contour = max(contours, key=cv2.contourArea)
-        
-        # Basic gesture recognition based on contour properties
-        area = cv2.contourArea(largest_contour)
-        if area < 1000:
+        if cv2.contourArea(largest_contour) < MIN_HAND_AREA * self.mask_scale * self.mask_scale:
+            return None
+        # Only this blob is mapped back to full resolution
+        if self.mask_scale != 1.0:
+            largest_contour = np.round(largest_contour / self.mask_scale).astype(np.int32)
+        return largest_contour
+
+    def detect_simple_gesture(self, frame):
+        """
+        Simple gesture detection without MediaPipe.
+        Uses basic contour detection and shape analysis.
+        """
+        largest_contour = self.find_hand(frame)
+        if largest_contour is None:
             return "No Hand Detected"
         
         # Calculate convex hull and convexity defects
@@ -78,7 +111,8 @@ class GestureFallbackApp:
         if len(hull) > 3:
             defects = cv2.convexityDefects(largest_contour, hull)
             if defects is not None:
-                defect_count = len(defects)
+                # Depths are fixed-point, 8 fractional bits
+                defect_count = int(np.count_nonzero(defects[:, 0, 3] >= MIN_DEFECT_DEPTH * 256))
                 
                 # Simple gesture classification based on defects
                 if defect_count == 0:
@@ -92,6 +126,42 @@ class GestureFallbackApp:
         
         return "Unknown Gesture"
 
+    def process(self, frame):
+        gesture = self.detect_simple_gesture(frame)
+        label = gesture if gesture not in ("No Hand Detected", "Unknown Gesture") else None
+        return {"label": label, "detections": [{"label": label}] if label else [], "status": gesture}
+
+
+class GestureFallbackApp:
+    """
+    A simplified gesture recognition app that doesn't require MediaPipe.
+    Uses basic computer vision techniques for demonstration purposes.
+    """
+
+    def __init__(self, camera_index: int = 0):
+        self.cap = CameraSource.open(camera_index, fallback_indices=())
+        if self.cap is None:
+            print(f"Error: Could not open video stream from camera index {camera_index}.")
+            emit("failed", error=f"Could not open camera index {camera_index}")
+            sys.exit("Exiting application.")
+
+        self.skin_path = skin_model_path()
+        skin_model = load_skin_model(self.skin_path)
+        self.detector = GestureFallbackDetector(skin_model=skin_model)
+        self.detected_gestures = []
+        self.smoother = GestureSmoother()
+        # Without a saved skin model for this profile, start in the calibration phase
+        # (not when headless: until the browser asks for calibration the default range is used)
+        self.headless = headless_mode()
+        self.calibrating = skin_model is None and not self.headless
+        self.capturing = False
+        self.skin_samples = []
+        get_channel().on_command("calibrate", self._on_calibrate_command)
+
+    def detect_simple_gesture(self, frame):
+        """Kept for callers of the old API; see GestureFallbackDetector.detect_simple_gesture."""
+        return self.detector.detect_simple_gesture(frame)
+
     def run(self):
         """Main application loop."""
         print("🎮 Starting Gesture Recognition Game (Fallback Mode)")
@@ -100,48 +170,123 @@ class GestureFallbackApp:
         print("  - Try different gestures: fist, pointing, peace sign, open hand")
         print("  - Press 'q' to quit")
         print("  - Press 'r' to reset detection")
+        print(f"  - Press '{CALIBRATE_KEY}' to calibrate skin color (palm in the box), '{SKIP_CALIBRATION_KEY}' to skip")
         print()
+        if self.calibrating:
+            print(f"🖐️  No skin model for this profile yet: hold your palm in the box and press '{CALIBRATE_KEY}'")
+        emit("ready", game="gesture", fallback=True, skin_model=self.detector.skin_model is not None,
+             calibration_actions=list(CALIBRATION_ACTIONS))
 
-        while True:
-            ret, frame = self.cap.read()
-            if not ret:
-                print("Failed to grab frame from camera")
-                break
+        try:
+            # Capture, mirror, detection, annotation and display overlap on separate threads
+            run_game_pipeline(
+                self.cap, WINDOW_NAME, self._detect, self._annotate,
+                quit_key=QUIT_KEY, on_key=self._handle_key, observe=self._observe, report=self._report,
+            )
+        finally:
+            self.cleanup()
 
-            # Flip frame horizontally for mirror effect
-            frame = cv2.flip(frame, 1)
-            self.frame_count += 1
+    def _detect(self, frame):
+        """Pipeline detect stage: the downscaled mask is cheap enough to analyse every frame."""
+        if self.calibrating:
+            if self.capturing:
+                self._sample_calibration(frame)
+            return None
+        return self.detect_simple_gesture(frame)
 
-            # Detect gesture every few frames to improve performance
-            if self.frame_count % 3 == 0:
-                current_time = time.time()
-                gesture = self.detect_simple_gesture(frame)
-                
-                # Store gesture detection with timestamp
-                if gesture != "No Hand Detected" and gesture != "Unknown Gesture":
-                    if current_time - self.last_detection_time > 1.0:  # Avoid rapid duplicates
-                        self.detected_gestures.append({
-                            'gesture': gesture,
-                            'timestamp': current_time
-                        })
-                        self.last_detection_time = current_time
-                        print(f"✅ Detected: {gesture}")
-
-            # Draw UI elements
-            self.draw_ui(frame)
-
-            # Display the frame
-            cv2.imshow(WINDOW_NAME, frame)
-
-            # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord(QUIT_KEY):
-                break
-            elif key == ord('r'):
-                self.detected_gestures.clear()
-                print("🔄 Detection history reset")
-
-        self.cleanup()
+    def _sample_calibration(self, frame):
+        """Collect palm pixels over a few frames, then learn and save the skin model."""
+        self.skin_samples.append(self.detector.sample_skin(frame))
+        if len(self.skin_samples) < CALIBRATION_FRAMES:
+            return
+        samples, self.skin_samples, self.capturing = np.concatenate(self.skin_samples), [], False
+        try:
+            model = SkinModel.from_samples(samples)
+        except ValueError as e:
+            print(f"⚠️  Calibration failed: {e}; try again with more light")
+            emit("calibration_failed", error=str(e))
+            return
+        self.detector.skin_model = model
+        self.calibrating = False
+        self.smoother.reset()
+        try:
+            save_skin_model(self.skin_path, model)
+            print(f"✅ Skin model saved to {self.skin_path} ({model.coverage():.0%} of hue/saturation bins)")
+        except OSError as e:
+            print(f"⚠️  Could not save skin model: {e}")
+        emit("calibrated", path=self.skin_path, coverage=round(model.coverage(), 3))
+
+    @staticmethod
+    def _label(gesture):
+        return gesture if gesture not in (None, "No Hand Detected", "Unknown Gesture") else None
+
+    def _observe(self, gesture):
+        """Record new gestures (every frame, also headless)."""
+        if gesture is not None:
+            # Store a gesture once it is stable, not every noisy frame
+            label = self._label(gesture)
+            for event in self.smoother.update({"hand": label} if label else {}):
+                if event["gesture"] is not None:
+                    self.detected_gestures.append({
+                        'gesture': event["gesture"],
+                        'timestamp': event["timestamp"]
+                    })
+                    print(f"✅ Detected: {event['gesture']}")
+                emit("gesture", hand=event["hand"], gesture=event["gesture"], previous=event["previous"])
+
+    def _report(self, gesture):
+        """Detection events: the frame's gesture, with the raw status for frames without one."""
+        label = self._label(gesture)
+        return {"label": label, "detections": [{"label": label}] if label else [], "status": gesture}
+
+    def _annotate(self, frame, gesture):
+        """Pipeline annotate stage: draw the UI."""
+        # Draw UI elements
+        self.draw_ui(frame)
+        if self.calibrating:
+            self.draw_calibration(frame)
+        return frame
+
+    def _handle_key(self, key):
+        if key == ord('r'):
+            self.detected_gestures.clear()
+            self.smoother.reset()
+            print("🔄 Detection history reset")
+        elif key == ord(CALIBRATE_KEY):
+            self.calibrate("capture" if self.calibrating else "start")
+        elif key == ord(SKIP_CALIBRATION_KEY):
+            self.calibrate("skip")
+
+    def _on_calibrate_command(self, message):
+        action = message.get("action", "start")
+        if action not in CALIBRATION_ACTIONS:
+            print(f"[Control] Ignoring unknown calibrate action {action!r}")
+            return
+        self.calibrate(action)
+
+    def calibrate(self, action):
+        """
+        Drive the skin calibration: ``start`` shows the palm box, ``capture``
+        samples the palm (starting calibration if needed), ``skip`` leaves it.
+        """
+        if action == "start" and not self.calibrating:
+            self.calibrating = True
+            print(f"🖐️  Recalibrating: hold your palm in the box and press '{CALIBRATE_KEY}'")
+        elif action == "capture":
+            self.skin_samples = []
+            self.calibrating = self.capturing = True
+        elif action == "skip" and self.calibrating:
+            self.calibrating = self.capturing = False
+            self.skin_samples = []
+            print("⏭️  Calibration skipped" + (", keeping the previous skin model" if self.detector.skin_model else ", using the default skin range"))
+
+    def draw_calibration(self, frame):
+        """Palm box and calibration prompt."""
+        x1, y1, x2, y2 = self.detector.palm_box(frame)
+        color = (0, 0, 255) if self.capturing else (0, 255, 255)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        message = "Hold still..." if self.capturing else f"Palm in box, press '{CALIBRATE_KEY}' ('{SKIP_CALIBRATION_KEY}' skips)"
+        cv2.putText(frame, message, (10, 110), FONT, 0.5, color, 1)
 
     def draw_ui(self, frame):
         """Draw user interface elements on the frame."""
@@ -154,7 +299,7 @@ class GestureFallbackApp:
         # Draw instructions
         cv2.putText(frame, "Show gestures to camera", (10, 60), 
                    FONT, 0.5, (255, 255, 255), 1)
-        cv2.putText(frame, "Press 'q' to quit, 'r' to reset", (10, 80), 
+        cv2.putText(frame, "Press 'q' to quit, 'r' to reset, 'c' to calibrate", (10, 80), 
                    FONT, 0.5, (255, 255, 255), 1)
         
         # Draw detection count
@@ -181,7 +326,8 @@ class GestureFallbackApp:
         
         if self.cap:
             self.cap.release()
-        cv2.destroyAllWindows()
+            emit("camera_released")
+        destroy_windows()
         print("👋 Thanks for playing!")
 
 def main():
@@ -193,7 +339,7 @@ def main():
     except Exception as e:
         print(f"❌ Error: {e}")
     finally:
-        cv2.destroyAllWindows()
+        destroy_windows()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,160 @@
+"""
+Table-driven gesture rules.
+
+A gesture is declared as data: a finger pattern over (thumb, index, middle,
+ring, pinky) with ``1`` for extended, ``0`` for folded and ``x`` for either,
+or a number of extended fingers, plus an optional geometric predicate on the
+landmarks. ``GestureTable`` compiles the rules into a 32-entry lookup indexed
+by the 5-bit finger mask (thumb = bit 0), so classifying a hand is one list
+index plus, only where a rule has one, its predicate.
+
+Rules are tried in order; the first matching rule wins. Custom gestures come
+from a JSON file (``GAME_GESTURE_CONFIG``, default ``face/gestures.json``) and
+take priority over the built-in ones::
+
+    {
+      "gestures": [
+        {"name": "Thumbs Down", "fingers": "10000", "when": "thumb_pointing_down"},
+        {"name": "Rock On", "fingers": "x1001"}
+      ],
+      "replace_defaults": false
+    }
+"""
+import json
+import os
+
+import numpy as np
+
+from hand_landmarks import INDEX_MCP, PINKY_MCP, THUMB_IP, THUMB_TIP, WRIST
+
+GESTURE_CONFIG_ENV = "GAME_GESTURE_CONFIG"
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestures.json")
+UNKNOWN = "Unknown"
+MASKS = 32
+
+
+def _thumb_pointing_up(points, side):
+    return points[THUMB_TIP, 1] < points[INDEX_MCP, 1] and points[THUMB_TIP, 1] < points[THUMB_IP, 1]
+
+
+def _thumb_pointing_down(points, side):
+    return points[THUMB_TIP, 1] > points[WRIST, 1]
+
+
+def _hand_upright(points, side):
+    return points[INDEX_MCP, 1] < points[WRIST, 1] and points[PINKY_MCP, 1] < points[WRIST, 1]
+
+
+def _hand_sideways(points, side):
+    dx, dy = np.abs(points[INDEX_MCP, :2] - points[WRIST, :2])
+    return dx > dy
+
+
+# Geometric predicates available to rules: (points (21, 3), thumb side +1/-1) -> bool
+PREDICATES = {
+    "thumb_pointing_up": _thumb_pointing_up,
+    "thumb_pointing_down": _thumb_pointing_down,
+    "hand_upright": _hand_upright,
+    "hand_sideways": _hand_sideways,
+}
+
+
+class GestureRule:
+    """One gesture: finger pattern or finger count, plus an optional predicate."""
+
+    def __init__(self, name, fingers=None, count=None, when=None):
+        if (fingers is None) == (count is None):
+            raise ValueError(f"Gesture {name!r}: give exactly one of 'fingers' or 'count'")
+        if fingers is not None and (len(fingers) != 5 or set(fingers) - set("01x")):
+            raise ValueError(f"Gesture {name!r}: 'fingers' must be 5 of 0/1/x (thumb first), got {fingers!r}")
+        if count is not None and not 0 <= int(count) <= 5:
+            raise ValueError(f"Gesture {name!r}: 'count' must be 0-5, got {count!r}")
+        if when is not None and when not in PREDICATES:
+            raise ValueError(f"Gesture {name!r}: unknown predicate {when!r}; expected one of {', '.join(PREDICATES)}")
+        self.name = name
+        self.fingers = fingers
+        self.count = None if count is None else int(count)
+        self.when = when
+        self.predicate = PREDICATES[when] if when else None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], fingers=data.get("fingers"), count=data.get("count"), when=data.get("when"))
+
+    def matches_mask(self, mask):
+        if self.count is not None:
+            return bin(mask).count("1") == self.count
+        return all(c == "x" or int(c) == (mask >> i) & 1 for i, c in enumerate(self.fingers))
+
+    def __repr__(self):
+        pattern = self.fingers if self.fingers is not None else f"count={self.count}"
+        return f"GestureRule({self.name!r}, {pattern}{', when=' + self.when if self.when else ''})"
+
+
+# The built-in gestures, most specific first
+DEFAULT_RULES = [
+    GestureRule("Fist", fingers="00000"),
+    GestureRule("Pointing", fingers="01000"),
+    GestureRule("Thumbs Up", fingers="10000"),
+    GestureRule("One Finger", count=1),
+    GestureRule("Peace Sign", fingers="01100"),
+    GestureRule("Gun", fingers="11000"),
+    GestureRule("Two Fingers", count=2),
+    GestureRule("Three Fingers", count=3),
+    GestureRule("Four Fingers", count=4),
+    GestureRule("Open Hand", fingers="11111"),
+]
+
+
+class GestureTable:
+    """Rules compiled into a lookup from the 5-bit finger mask."""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._table = []
+        for mask in range(MASKS):
+            candidates = [rule for rule in self.rules if rule.matches_mask(mask)]
+            # Nothing after the first unconditional rule can ever match
+            for i, rule in enumerate(candidates):
+                if rule.predicate is None:
+                    candidates = candidates[:i + 1]
+                    break
+            self._table.append(tuple(candidates))
+
+    def classify(self, mask, points=None, side=1):
+        """Gesture name for a finger mask; ``points`` are needed only by predicate rules."""
+        for rule in self._table[mask]:
+            if rule.predicate is None:
+                return rule.name
+            if points is not None and rule.predicate(points, side):
+                return rule.name
+        return UNKNOWN
+
+    def unreachable(self):
+        """Rules that no finger mask can select (shadowed by earlier rules)."""
+        used = {id(rule) for candidates in self._table for rule in candidates}
+        return [rule for rule in self.rules if id(rule) not in used]
+
+
+def load_rules(path=None):
+    """Custom rules from the config file (if any) ahead of the defaults."""
+    path = path or os.environ.get(GESTURE_CONFIG_ENV) or DEFAULT_CONFIG_PATH
+    if not os.path.exists(path):
+        return list(DEFAULT_RULES)
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    custom = [GestureRule.from_dict(entry) for entry in config.get("gestures", [])]
+    return custom if config.get("replace_defaults") else custom + DEFAULT_RULES
+
+
+def load_gesture_table(path=None):
+    """Compile the configured gestures; a broken config file falls back to the built-in gestures."""
+    try:
+        rules = load_rules(path)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"[Gestures] Ignoring gesture config: {e}")
+        rules = list(DEFAULT_RULES)
+    table = GestureTable(rules)
+    for rule in table.unreachable():
+        print(f"[Gestures] {rule} can never match; an earlier gesture covers all of its finger masks")
+    return table
@@ -0,0 +1,101 @@
+"""
+Temporal smoothing for per-frame gesture labels.
+
+Per-frame classifications jitter (a hand between "Two Fingers" and "Peace
+Sign" flips every few frames). ``GestureSmoother`` keeps a fixed-size ring of
+the last ``window`` labels per hand and a running vote count. A hand's stable
+gesture only changes when a new label holds at least ``enter_ratio`` of the
+window and the current one has fallen to ``exit_ratio`` or below (hysteresis),
+and only those changes are reported as events.
+
+    smoother = GestureSmoother()
+    for event in smoother.update({"Right": "Fist"}):
+        print(event["hand"], event["gesture"], event["previous"])
+
+Hands missing from an update vote "no gesture" (None), so a lowered hand ends
+its gesture once the window has emptied out.
+"""
+import collections
+import time
+
+
+class _HandHistory:
+    def __init__(self, window):
+        self.labels = collections.deque(maxlen=window)
+        self.votes = collections.Counter()
+        self.stable = None
+        self.since = None
+
+    def push(self, label):
+        if len(self.labels) == self.labels.maxlen:
+            evicted = self.labels[0]
+            self.votes[evicted] -= 1
+            if not self.votes[evicted]:
+                del self.votes[evicted]
+        self.labels.append(label)
+        self.votes[label] += 1
+
+
+class GestureSmoother:
+    """Majority vote with hysteresis over the recent labels of each hand."""
+
+    def __init__(self, window=9, enter_ratio=0.6, exit_ratio=0.4):
+        if not 0 < exit_ratio <= enter_ratio <= 1:
+            raise ValueError("Expected 0 < exit_ratio <= enter_ratio <= 1")
+        self.window = window
+        self.enter_votes = max(1, round(window * enter_ratio))
+        self.exit_votes = int(window * exit_ratio)
+        self.hands = {}
+        self.updates = 0
+        self.changes = 0
+
+    def update(self, labels, timestamp=None):
+        """
+        Feed this frame's ``{hand: label or None}``; returns the stable-gesture
+        changes as ``[{"event": "gesture", "hand", "gesture", "previous", "timestamp", "held"}]``.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        self.updates += 1
+        for hand in labels:
+            if hand not in self.hands:
+                self.hands[hand] = _HandHistory(self.window)
+
+        events = []
+        for hand, history in list(self.hands.items()):
+            history.push(labels.get(hand))
+            event = self._vote(hand, history, timestamp)
+            if event is not None:
+                events.append(event)
+            if history.stable is None and not any(history.labels):
+                del self.hands[hand]  # gone for a whole window
+        return events
+
+    def _vote(self, hand, history, timestamp):
+        leader, votes = history.votes.most_common(1)[0]
+        if leader == history.stable or votes < self.enter_votes:
+            return None
+        if history.votes.get(history.stable, 0) > self.exit_votes:
+            return None
+        previous, history.stable = history.stable, leader
+        held = timestamp - history.since if history.since is not None else None
+        history.since = timestamp
+        self.changes += 1
+        return {
+            "event": "gesture",
+            "hand": hand,
+            "gesture": leader,
+            "previous": previous,
+            "timestamp": timestamp,
+            "held": round(held, 2) if held is not None else None,
+        }
+
+    def stable(self, hand):
+        """Current stable gesture of ``hand`` (None if none)."""
+        history = self.hands.get(hand)
+        return history.stable if history is not None else None
+
+    def reset(self):
+        self.hands.clear()
+
+    def stats(self):
+        return {"updates": self.updates, "changes": self.changes, "hands": len(self.hands)}
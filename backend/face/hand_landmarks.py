@@ -0,0 +1,83 @@
+"""
+Hand landmarks as numpy arrays.
+
+MediaPipe returns 21 landmark objects per hand. They are converted once per
+hand into a (21, 3) float32 array of normalised (x, y, z) and stacked into
+(H, 21, 3) for all hands of a frame, so finger states and centroids are
+computed for every hand at once instead of attribute by attribute.
+
+Which hand it is comes from MediaPipe's own classifier (``hand_labels``):
+the landmark geometry only tells which way the thumb points, and that flips
+when the hand turns over. Nothing here imports MediaPipe.
+"""
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+WRIST = 0
+THUMB_IP, THUMB_TIP = 3, 4
+INDEX_MCP, PINKY_MCP = 5, 17
+# Index, middle, ring and pinky: tip and PIP joint
+FINGER_TIPS = np.array([8, 12, 16, 20])
+FINGER_PIPS = np.array([6, 10, 14, 18])
+
+FINGER_NAMES = ("thumb", "index", "middle", "ring", "pinky")
+
+
+def landmarks_to_array(landmarks):
+    """One hand's landmark list (objects with ``x``, ``y``, ``z``) as a (21, 3) float32 array."""
+    return np.array([(p.x, p.y, p.z) for p in landmarks], dtype=np.float32)
+
+
+def stack_hands(multi_hand_landmarks):
+    """MediaPipe ``multi_hand_landmarks`` as an (H, 21, 3) array; (0, 21, 3) without hands."""
+    if not multi_hand_landmarks:
+        return np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+    return np.stack([landmarks_to_array(hand.landmark) for hand in multi_hand_landmarks])
+
+
+def hand_labels(multi_handedness, count):
+    """
+    "Right"/"Left" for each of ``count`` hands from MediaPipe's
+    ``multi_handedness`` (None where it gave none). MediaPipe expects mirrored
+    input, which is what the games pass it, so the labels are the player's.
+    """
+    labels = [None] * count
+    for i, hand in enumerate((multi_handedness or [])[:count]):
+        if hand.classification:
+            labels[i] = hand.classification[0].label
+    return labels
+
+
+def thumb_sides(hands):
+    """
+    +1 where the thumb side of the hand faces +x, -1 where it faces -x, per hand
+    of an (H, 21, 3) array: the side of the pinky knuckle the index knuckle is on.
+    Says nothing about which hand it is (turning a hand over flips it).
+    """
+    return np.where(hands[:, INDEX_MCP, 0] >= hands[:, PINKY_MCP, 0], 1, -1).astype(np.int8)
+
+
+def finger_states(hands, sides=None):
+    """
+    (H, 5) bool, True where a finger is extended, thumb first.
+
+    Fingers are up when the tip is above the PIP joint; the thumb is out when
+    its tip lies beyond the IP joint on the thumb side (``thumb_sides``).
+    """
+    if sides is None:
+        sides = thumb_sides(hands)
+    states = np.empty((len(hands), 5), dtype=bool)
+    states[:, 0] = (hands[:, THUMB_TIP, 0] - hands[:, THUMB_IP, 0]) * sides > 0
+    states[:, 1:] = hands[:, FINGER_TIPS, 1] < hands[:, FINGER_PIPS, 1]
+    return states
+
+
+def finger_masks(states):
+    """(H,) 5-bit masks of (H, 5) finger states; thumb is bit 0, pinky bit 4."""
+    return (states.astype(np.uint8) << np.arange(5, dtype=np.uint8)).sum(axis=1).astype(np.uint8)
+
+
+def centroids(hands, width, height):
+    """(H, 2) int pixel centre of each hand's landmarks in a ``width`` x ``height`` frame."""
+    return (hands[:, :, :2].mean(axis=1) * np.array([width, height], dtype=np.float32)).astype(np.int32)
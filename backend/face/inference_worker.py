@@ -0,0 +1,323 @@
+"""
+Micro-batching emotion inference worker.
+
+A neural emotion model is far cheaper per face when it sees many faces at
+once. ``MicroBatcher`` queues face crops from any number of threads and runs
+the model on a batch as soon as ``max_batch`` crops are waiting or the oldest
+one has waited ``max_latency_ms``, whichever comes first.
+
+Run as a script it is the dedicated inference process the backend starts when
+``GAME_EMOTION_BACKEND=model``: it loads the model once and serves every game
+process over a ``multiprocessing.connection`` listener, so faces from
+concurrent sessions end up in the same batches.
+
+    python inference_worker.py --address /tmp/asd_inference --model stub
+
+Models:
+    fer   the FER package's CNN (TensorFlow, weights ship with the package)
+    stub  deterministic stand-in with a fixed per-batch cost, for tests and
+          benchmarks without TensorFlow or downloads
+"""
+import argparse
+import collections
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+
+import cv2
+import numpy as np
+
+# Keep these in sync with backend/inference_service.py
+INFERENCE_ADDRESS_ENV = "GAME_INFERENCE_ADDRESS"
+INFERENCE_AUTHKEY_ENV = "GAME_INFERENCE_AUTHKEY"
+EMOTION_MODEL_ENV = "GAME_EMOTION_MODEL"
+DEFAULT_MODEL = "fer"
+
+DEFAULT_MAX_BATCH = 32
+DEFAULT_MAX_LATENCY_MS = 10.0
+RESULT_TIMEOUT = 5.0
+STATS_INTERVAL = 5.0
+
+EMOTIONS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+
+
+class StubEmotionModel:
+    """
+    Stand-in model: the label follows the mean brightness of the crop, and
+    ``predict`` sleeps for ``batch_ms`` plus ``item_ms`` per face, like an
+    accelerator whose cost is mostly per call.
+    """
+
+    labels = EMOTIONS
+    input_size = 48
+
+    def __init__(self, batch_ms=8.0, item_ms=0.25):
+        self.batch_ms = batch_ms
+        self.item_ms = item_ms
+        self.calls = 0
+
+    def predict(self, batch):
+        self.calls += 1
+        time.sleep((self.batch_ms + self.item_ms * len(batch)) / 1000.0)
+        index = (batch.reshape(len(batch), -1).mean(axis=1) * len(self.labels) / 256.0).astype(np.int64)
+        return np.eye(len(self.labels), dtype=np.float32)[np.clip(index, 0, len(self.labels) - 1)]
+
+
+class FerModel:
+    """The emotion CNN bundled with the ``fer`` package."""
+
+    labels = EMOTIONS
+
+    def __init__(self):
+        from fer import FER
+
+        self._model = FER()._emotion_classifier
+        self.input_size = int(self._model.input_shape[1])
+
+    def predict(self, batch):
+        x = (batch.astype(np.float32) / 255.0 - 0.5) * 2.0
+        return self._model.predict(x[..., None], verbose=0)
+
+
+MODELS = {"stub": StubEmotionModel, "fer": FerModel}
+
+
+def load_model(name=None):
+    name = name or os.environ.get(EMOTION_MODEL_ENV, DEFAULT_MODEL)
+    if name not in MODELS:
+        raise ValueError(f"Unknown emotion model {name!r}; expected one of {', '.join(MODELS)}")
+    return MODELS[name]()
+
+
+def prepare(face, size):
+    """Grayscale ``size`` x ``size`` uint8 crop, the model input."""
+    if face.ndim == 3:
+        face = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+    if face.shape[:2] != (size, size):
+        face = cv2.resize(face, (size, size), interpolation=cv2.INTER_AREA)
+    return face
+
+
+class _Request:
+    __slots__ = ("face", "future", "enqueued")
+
+    def __init__(self, face):
+        self.face = face
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class MicroBatcher:
+    """Collects faces from many callers into model batches under a latency deadline."""
+
+    def __init__(self, model, max_batch=DEFAULT_MAX_BATCH, max_latency_ms=DEFAULT_MAX_LATENCY_MS):
+        self.model = model
+        self.max_batch = max(1, max_batch)
+        self.max_latency_ms = max_latency_ms
+        self.input_size = model.input_size
+        self.labels = model.labels
+        self.batches = 0
+        self.items = 0
+        self._latencies_ms = collections.deque(maxlen=1000)
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="emotion-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, face):
+        """Queue one face crop; the future resolves to its emotion name."""
+        request = _Request(prepare(face, self.input_size))
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.append(request)
+            self._cond.notify_all()
+        return request.future
+
+    def classify(self, faces, timeout=RESULT_TIMEOUT):
+        """Emotion names for ``faces``, in order."""
+        futures = [self.submit(face) for face in faces]
+        return [future.result(timeout) for future in futures]
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue and self._running:
+                self._cond.wait()
+            if not self._running:
+                return []
+            deadline = self._queue[0].enqueued + self.max_latency_ms / 1000.0
+            while len(self._queue) < self.max_batch and self._running:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+
+    def _loop(self):
+        while self._running:
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                scores = self.model.predict(np.stack([r.face for r in batch]))
+                names = [self.labels[i] for i in np.argmax(scores, axis=1)]
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            self.batches += 1
+            self.items += len(batch)
+            for request, name in zip(batch, names):
+                self._latencies_ms.append((done - request.enqueued) * 1000.0)
+                request.future.set_result(name)
+
+    def stats(self):
+        latencies = np.asarray(self._latencies_ms) if self._latencies_ms else None
+        return {
+            "batches": self.batches,
+            "faces": self.items,
+            "mean_batch": round(self.items / self.batches, 2) if self.batches else None,
+            "latency_ms": round(float(latencies.mean()), 2) if latencies is not None else None,
+            "p95_latency_ms": round(float(np.percentile(latencies, 95)), 2) if latencies is not None else None,
+            "max_batch": self.max_batch,
+            "max_latency_ms": self.max_latency_ms,
+        }
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            pending = list(self._queue)
+            self._queue.clear()
+            self._cond.notify_all()
+        for request in pending:
+            request.future.set_exception(RuntimeError("MicroBatcher closed"))
+        self._thread.join(timeout=2)
+
+
+class InferenceServer:
+    """Serves a ``MicroBatcher`` to game processes; one reader thread per connection."""
+
+    def __init__(self, batcher, address, authkey):
+        self.batcher = batcher
+        self.clients = 0
+        self._listener = Listener(address, authkey=authkey)
+        self.address = self._listener.address
+        threading.Thread(target=self._accept_loop, name="inference-accept", daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return  # listener closed
+            except Exception as e:
+                print(f"[Inference] Rejected connection: {e}")
+                continue
+            self.clients += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            conn.send({"input_size": self.batcher.input_size, "labels": list(self.batcher.labels)})
+            while True:
+                request = conn.recv()
+                try:
+                    reply = {"id": request["id"], "labels": self.batcher.classify(request["faces"])}
+                except Exception as e:
+                    reply = {"id": request.get("id"), "error": str(e)}
+                conn.send(reply)
+        except (EOFError, OSError):
+            pass
+        finally:
+            self.clients -= 1
+            conn.close()
+
+    def close(self):
+        self._listener.close()
+
+
+class InferenceClient:
+    """Game-side connection to the inference worker; ``classify`` blocks for the batch results."""
+
+    def __init__(self, address, authkey):
+        self._conn = Client(address, authkey=authkey)
+        hello = self._conn.recv()
+        self.input_size = hello["input_size"]
+        self.labels = tuple(hello["labels"])
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    @classmethod
+    def from_env(cls, timeout=5.0):
+        """Connect to the worker named in GAME_INFERENCE_ADDRESS, waiting for it to start; None if unavailable."""
+        address = os.environ.get(INFERENCE_ADDRESS_ENV)
+        if not address:
+            return None
+        authkey = os.environ.get(INFERENCE_AUTHKEY_ENV, "").encode()
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return cls(address, authkey)
+            except (FileNotFoundError, ConnectionRefusedError, OSError):
+                if time.monotonic() >= deadline:
+                    return None
+                time.sleep(0.1)
+
+    def classify(self, faces):
+        faces = [prepare(face, self.input_size) for face in faces]
+        with self._lock:
+            self._next_id += 1
+            self._conn.send({"id": self._next_id, "faces": faces})
+            reply = self._conn.recv()
+        if "error" in reply:
+            raise RuntimeError(f"Inference worker: {reply['error']}")
+        return reply["labels"]
+
+    def close(self):
+        self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve batched emotion inference to the games")
+    parser.add_argument("--address", required=True, help="Listener address (Unix socket path or named pipe)")
+    parser.add_argument("--model", default=None, help=f"{', '.join(MODELS)} (default: GAME_EMOTION_MODEL or {DEFAULT_MODEL})")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--max-latency-ms", type=float, default=DEFAULT_MAX_LATENCY_MS)
+    args = parser.parse_args()
+
+    from control import emit, quit_requested
+
+    try:
+        model = load_model(args.model)
+    except Exception as e:
+        print(f"❌ Could not load emotion model: {e}")
+        emit("failed", error=f"Could not load emotion model: {e}")
+        sys.exit(2)
+
+    batcher = MicroBatcher(model, max_batch=args.max_batch, max_latency_ms=args.max_latency_ms)
+    server = InferenceServer(batcher, args.address, os.environ.get(INFERENCE_AUTHKEY_ENV, "").encode())
+    print(f"[Inference] Serving {type(model).__name__} on {server.address} "
+          f"(batches of up to {batcher.max_batch}, {batcher.max_latency_ms} ms deadline)")
+    emit("ready", address=str(server.address), model=type(model).__name__, input_size=batcher.input_size)
+
+    last_stats = time.monotonic()
+    try:
+        while not quit_requested():
+            time.sleep(0.25)
+            if time.monotonic() - last_stats >= STATS_INTERVAL:
+                last_stats = time.monotonic()
+                emit("stats", clients=server.clients, **batcher.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        batcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+"""
+Staged, multi-threaded frame pipeline.
+
+    capture → preprocess → detect → annotate → display
+
+Capture and every intermediate stage run on their own thread and hand frames
+on through small bounded queues; the final sink (usually ``cv2.imshow`` +
+``cv2.waitKey``, which must stay on the main thread) runs in ``run()``.
+OpenCV and MediaPipe release the GIL in native code, so detection of frame N
+overlaps annotation and display of frame N-1 and throughput approaches that of
+the slowest stage instead of the sum of all of them.
+
+Each queue has a drop policy for when it is full:
+
+    drop_oldest  replace the queued frame with the new one (latest frame wins)
+    drop_newest  discard the new frame and keep what is queued
+    block        wait for the consumer (nothing is ever dropped)
+
+Usage::
+
+    pipeline = Pipeline(camera)
+    pipeline.add_stage("preprocess", lambda p: p.update(frame=cv2.flip(p.frame, 1)))
+    pipeline.add_stage("detect", lambda p: p.update(result=detector.process(p.frame)))
+    pipeline.add_stage("annotate", app.annotate)
+    pipeline.run(display, should_stop=quit_requested)
+
+A stage function receives a ``FramePacket`` and returns it (or a replacement);
+returning None drops the frame at that stage.
+"""
+import collections
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+
+import cv2
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+STATS_INTERVAL = 5.0
+
+# Headless mode: no window, overlays or waitKey (set by the backend per session, or --headless)
+HEADLESS_ENV = "GAME_HEADLESS"
+HEADLESS_FLAG = "--headless"
+
+_CLOSED = object()
+_OPAQUE = object()
+
+
+class FramePacket:
+    """A frame travelling through the pipeline plus whatever the stages attach to it."""
+
+    def __init__(self, seq, timestamp, frame):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.frame = frame
+        self.result = None
+        self.data = {}
+
+    def update(self, **fields):
+        """Set attributes and return the packet, so one-line stages can ``return p.update(...)``."""
+        for name, value in fields.items():
+            setattr(self, name, value)
+        return self
+
+
+class StageQueue:
+    """Bounded hand-off queue with a drop policy."""
+
+    def __init__(self, maxsize=1, policy=DROP_OLDEST):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown drop policy {policy!r}; expected one of {POLICIES}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.dropped = 0
+        self._items = collections.deque()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        with self._cond:
+            if self.policy == BLOCK:
+                while len(self._items) >= self.maxsize and not self._closed:
+                    self._cond.wait()
+            elif len(self._items) >= self.maxsize:
+                self.dropped += 1
+                if self.policy == DROP_NEWEST:
+                    return
+                self._items.popleft()
+            if self._closed:
+                return
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Return the next item, None on timeout, or ``_CLOSED`` once closed and drained."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if self._items:
+                item = self._items.popleft()
+                self._cond.notify_all()
+                return item
+            return _CLOSED if self._closed else None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class _StageStats:
+    def __init__(self):
+        self.processed = 0
+        self.filtered = 0
+        self.total_ms = 0.0
+        self.last_ms = None
+
+    def record(self, elapsed_ms):
+        self.processed += 1
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+
+    def as_dict(self, queue=None):
+        data = {
+            "processed": self.processed,
+            "filtered": self.filtered,
+            "last_ms": round(self.last_ms, 2) if self.last_ms is not None else None,
+            "avg_ms": round(self.total_ms / self.processed, 2) if self.processed else None,
+        }
+        if queue is not None:
+            data.update(queue_depth=len(queue), queue_size=queue.maxsize, policy=queue.policy, dropped=queue.dropped)
+        return data
+
+
+class Stage:
+    def __init__(self, name, fn, queue):
+        self.name = name
+        self.fn = fn
+        self.input = queue
+        self.stats = _StageStats()
+        self.thread = None
+
+
+class Pipeline:
+    """Runs frames from ``source`` (anything with ``read() -> (ok, frame)``) through threaded stages."""
+
+    def __init__(self, source, name="pipeline"):
+        self.source = source
+        self.name = name
+        self.stages = []
+        self.error = None
+        self._running = False
+        self._sink_queue = None
+        self._capture_stats = _StageStats()
+        self._sink_stats = _StageStats()
+        self._latency_ms = None
+        self._started_at = None
+        self._threads = []
+
+    def add_stage(self, name, fn, queue_size=1, policy=DROP_OLDEST):
+        """Append a stage; ``queue_size``/``policy`` configure the queue feeding it."""
+        self.stages.append(Stage(name, fn, StageQueue(queue_size, policy)))
+        return self
+
+    # -- threads -------------------------------------------------------------
+
+    def _capture_loop(self, output):
+        seq = 0
+        try:
+            while self._running:
+                started = time.perf_counter()
+                ok, frame = self.source.read()
+                if not ok:
+                    break
+                seq += 1
+                timestamp = getattr(self.source, "last_timestamp", None) or time.time()
+                self._capture_stats.record((time.perf_counter() - started) * 1000.0)
+                output.put(FramePacket(seq, timestamp, frame))
+        except Exception as e:
+            self._fail("capture", e)
+        finally:
+            output.close()
+
+    def _stage_loop(self, stage, output):
+        try:
+            while True:
+                packet = stage.input.get()
+                if packet is _CLOSED:
+                    break
+                if packet is None:
+                    continue
+                started = time.perf_counter()
+                packet = stage.fn(packet)
+                stage.stats.record((time.perf_counter() - started) * 1000.0)
+                if packet is None:
+                    stage.stats.filtered += 1
+                    continue
+                output.put(packet)
+        except Exception as e:
+            self._fail(stage.name, e)
+        finally:
+            output.close()
+
+    def _fail(self, stage_name, error):
+        if self.error is None:
+            self.error = error
+        print(f"[Pipeline] Stage '{stage_name}' failed: {error}")
+        traceback.print_exc()
+        self._running = False
+
+    # -- driving -------------------------------------------------------------
+
+    def run(self, sink, should_stop=None, queue_size=1, policy=DROP_OLDEST, on_stats=None,
+            stats_interval=STATS_INTERVAL):
+        """
+        Start capture and stage threads and feed finished packets to ``sink`` on
+        the calling thread until ``sink`` returns False, ``should_stop()`` turns
+        True or the source runs dry. Re-raises the first stage error.
+        """
+        self._sink_queue = StageQueue(queue_size, policy)
+        queues = [stage.input for stage in self.stages] + [self._sink_queue]
+        self._running = True
+        self._started_at = time.monotonic()
+        self._threads = [threading.Thread(target=self._capture_loop, args=(queues[0],), name=f"{self.name}-capture", daemon=True)]
+        for stage, output in zip(self.stages, queues[1:]):
+            stage.thread = threading.Thread(target=self._stage_loop, args=(stage, output), name=f"{self.name}-{stage.name}", daemon=True)
+            self._threads.append(stage.thread)
+        for thread in self._threads:
+            thread.start()
+
+        last_stats = time.monotonic()
+        try:
+            while self._running:
+                if should_stop is not None and should_stop():
+                    break
+                packet = self._sink_queue.get(timeout=0.1)
+                if packet is _CLOSED:
+                    break
+                if packet is not None:
+                    started = time.perf_counter()
+                    keep_going = sink(packet)
+                    self._sink_stats.record((time.perf_counter() - started) * 1000.0)
+                    self._latency_ms = (time.time() - packet.timestamp) * 1000.0
+                    if keep_going is False:
+                        break
+                if on_stats is not None and time.monotonic() - last_stats >= stats_interval:
+                    last_stats = time.monotonic()
+                    on_stats(self.stats())
+        finally:
+            self.stop()
+        if self.error is not None:
+            raise self.error
+
+    def stop(self):
+        self._running = False
+        for stage in self.stages:
+            stage.input.close()
+        if self._sink_queue is not None:
+            self._sink_queue.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=2)
+
+    def stats(self):
+        """Per-stage throughput, latency and queue state, plus end-to-end latency."""
+        stages = {"capture": self._capture_stats.as_dict()}
+        for stage in self.stages:
+            stages[stage.name] = stage.stats.as_dict(stage.input)
+        stages["sink"] = self._sink_stats.as_dict(self._sink_queue)
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0
+        return {
+            "fps": round(self._sink_stats.processed / elapsed, 1) if elapsed > 0 else None,
+            "latency_ms": round(self._latency_ms, 1) if self._latency_ms is not None else None,
+            "stages": stages,
+        }
+
+
+# -- game loop ---------------------------------------------------------------
+
+def headless_mode():
+    """True when games should run without a display (``GAME_HEADLESS=1`` or ``--headless``)."""
+    value = os.environ.get(HEADLESS_ENV, "").strip().lower()
+    return value in ("1", "true", "yes", "on") or HEADLESS_FLAG in sys.argv[1:]
+
+
+def destroy_windows():
+    """``cv2.destroyAllWindows`` unless headless (headless OpenCV builds raise on GUI calls)."""
+    if not headless_mode():
+        cv2.destroyAllWindows()
+
+
+def mirror(packet):
+    """Preprocess stage: flip horizontally for the mirror effect (always a fresh, writable frame)."""
+    packet.frame = cv2.flip(packet.frame, 1)
+    return packet
+
+
+def writable(packet):
+    """Preprocess stage for games that draw on the raw frame (copies read-only frames)."""
+    if not packet.frame.flags.writeable:
+        packet.frame = packet.frame.copy()
+    return packet
+
+
+def _plain(value):
+    """``value`` as JSON-ready builtins, or ``_OPAQUE`` if it has no plain form (e.g. a MediaPipe object)."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if hasattr(value, "tolist"):  # numpy arrays and scalars
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        items = [_plain(v) for v in value]
+        return _OPAQUE if any(v is _OPAQUE for v in items) else items
+    return _OPAQUE
+
+
+def default_report(result):
+    """Structured form of a ``Detector.process`` result: label plus the plain fields of each detection."""
+    if not isinstance(result, dict):
+        return {"label": _plain(result) if result is not None else None, "detections": []}
+    detections = []
+    for detection in result.get("detections", []):
+        fields = {key: _plain(value) for key, value in detection.items()}
+        detections.append({key: value for key, value in fields.items() if value is not _OPAQUE})
+    return {"label": _plain(result.get("label")), "detections": detections}
+
+
+class DetectionReporter:
+    """
+    Reports a frame's detections when the labels change.
+
+    Events go over the control channel as ``detection``; with ``echo``, a
+    game started by hand (no backend) prints them to stdout as JSON lines instead.
+    """
+
+    def __init__(self, report=default_report, echo=False):
+        self.report = report
+        self.echo = echo
+        self.frames = 0
+        self.reported = 0
+        self._last_key = None
+
+    def __call__(self, packet):
+        from control import emit
+
+        self.frames += 1
+        payload = self.report(packet.result)
+        key = (payload.get("label"), tuple(d.get("label") for d in payload.get("detections", [])))
+        if key == self._last_key:
+            return
+        self._last_key = key
+        self.reported += 1
+        # "seq" is taken: the backend numbers every event it receives
+        event = {"frame_seq": packet.seq, "timestamp": packet.timestamp, **payload}
+        if not emit("detection", **event) and self.echo:
+            print(json.dumps({"event": "detection", **event}), flush=True)
+
+
+def run_game_pipeline(source, window_name, detect, annotate, preprocess=mirror, quit_key="q",
+                      on_key=None, should_stop=None, observe=None, report=default_report, headless=None):
+    """
+    Run the standard game loop as a pipeline: ``preprocess`` → ``detect(frame)``
+    → ``annotate(frame, result)`` → stream on worker threads, ``imshow`` on
+    this one. ``observe(result)`` (game state and events) runs for every frame
+    before ``annotate``. Annotated frames are JPEG-encoded for browser viewers
+    only while the backend has any (see ``stream_encoder.py``). Per-stage stats
+    are reported over the control channel every few seconds.
+
+    Each change in the detected labels is reported as a ``detection`` event
+    built by ``report``. Headless (default: ``headless_mode()``) skips the
+    window and ``waitKey``, and annotation too unless someone watches the
+    stream; only the control channel's quit ends the loop.
+    """
+    from control import emit, quit_requested
+    from stream_encoder import StreamEncoder
+
+    if headless is None:
+        headless = headless_mode()
+    streamer = StreamEncoder()
+    reporter = DetectionReporter(report, echo=headless)
+
+    def annotate_stage(packet):
+        if observe is not None:
+            observe(packet.result)
+        reporter(packet)
+        if headless and not streamer.active:
+            return packet
+        return packet.update(frame=annotate(packet.frame, packet.result))
+
+    pipeline = Pipeline(source, name=window_name)
+    pipeline.add_stage("preprocess", preprocess)
+    pipeline.add_stage("detect", lambda p: p.update(result=detect(p.frame)))
+    pipeline.add_stage("annotate", annotate_stage)
+    pipeline.add_stage("stream", streamer)
+
+    if headless:
+        def sink(packet):
+            return True
+    else:
+        def sink(packet):
+            cv2.imshow(window_name, packet.frame)
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord(quit_key):
+                return False
+            if on_key is not None and key != 0xFF:
+                on_key(key)
+            return True
+
+    pipeline.run(
+        sink,
+        should_stop=should_stop or quit_requested,
+        on_stats=lambda stats: emit("stats", pipeline=stats, headless=headless, streamed=streamer.encoded),
+    )
+    return pipeline
@@ -1,7 +1,12 @@
 import cv2
-import numpy as np
 import sys
-import time
+
+from camera import CameraSource
+from control import emit
+from detectors import Detector
+from pipeline import destroy_windows, run_game_pipeline, writable
+from shape_classifier import ShapeClassifier
+from shape_tracker import ShapeTracker
 
 def _force_utf8():
     if sys.platform.startswith("win"):
@@ -19,98 +24,110 @@ FONT = cv2.FONT_HERSHEY_SIMPLEX
 TEXT_COLOR = (0, 255, 0)
 QUIT_KEY = 'q'
 
+class ShapeDetector(Detector):
+    """Shape game per-frame analysis behind the common Detector API."""
+
+    game = "shape"
+
+    def __init__(self):
+        self.classifier = ShapeClassifier()
+
+    def find_shapes(self, frame):
+        """
+        Detect geometric shapes in the frame using contour detection.
+        Returns one dict per contour with label, contour, bbox and center (None if degenerate).
+        """
+        return self.classifier.detect(frame)
+
+    def process(self, frame):
+        shapes = [s for s in self.find_shapes(frame) if s["center"] is not None]
+        return {
+            "label": shapes[0]["label"] if shapes else None,
+            "detections": [{"label": s["label"], "bbox": s["bbox"], "center": list(s["center"])} for s in shapes],
+        }
+
+
+class ShapeRenderer:
+    """Draws classified shapes onto a frame."""
+
+    def __init__(self, contour_color=(0, 255, 0), text_color=TEXT_COLOR):
+        self.contour_color = contour_color
+        self.text_color = text_color
+
+    def draw(self, frame, shapes):
+        """Draw contours and labels in place; returns the labels that were drawn."""
+        labels = []
+        for shape in shapes:
+            cv2.drawContours(frame, [shape["contour"]], -1, self.contour_color, 2)
+            if shape["center"] is None:
+                continue
+            cx, cy = shape["center"]
+            cv2.putText(frame, shape["label"], (cx - 50, cy), FONT, 0.7, self.text_color, 2)
+            labels.append(shape["label"])
+        return labels
+
+
 class ShapeDetectorApp:
     """
     A webcam-based shape detection application using OpenCV contour detection.
     """
 
     def __init__(self, camera_index: int = 0):
-        self.cap = cv2.VideoCapture(camera_index)
-        if not self.cap.isOpened():
+        self.cap = CameraSource.open(camera_index, fallback_indices=())
+        if self.cap is None:
             print(f"Error: Could not open video stream from camera index {camera_index}.")
+            emit("failed", error=f"Could not open camera index {camera_index}")
             sys.exit("Exiting application.")
 
+        self.detector = ShapeDetector()
+        self.renderer = ShapeRenderer()
+        self.tracker = ShapeTracker(self.detector.classifier)
         self.detected_shapes = []
-        self.last_detection_time = time.time()
 
     def detect_shapes(self, frame):
         """
-        Detect geometric shapes in the frame using contour detection.
+        Detect geometric shapes in the frame and draw them.
         """
-        # Convert to grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        
-        # Apply edge detection
-        edges = cv2.Canny(blurred, 50, 150)
-        
-        # Find contours
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        shapes_found = []
-        
-        for contour in contours:
-            # Filter out small contours
-            area = cv2.contourArea(contour)
-            if area < 500:
-                continue
-            
-            # Approximate the contour
-            epsilon = 0.02 * cv2.arcLength(contour, True)
-            approx = cv2.approxPolyDP(contour, epsilon, True)
-            
-            # Determine shape based on number of vertices
-            vertices = len(approx)
-            shape_name = "Unknown"
-            
-            if vertices == 3:
-                shape_name = "Triangle"
-            elif vertices == 4:
-                # Check if it's a square or rectangle
-                x, y, w, h = cv2.boundingRect(approx)
-                aspect_ratio = float(w) / h
-                if 0.95 <= aspect_ratio <= 1.05:
-                    shape_name = "Square"
-                else:
-                    shape_name = "Rectangle"
-            elif vertices == 5:
-                shape_name = "Pentagon"
-            elif vertices == 6:
-                shape_name = "Hexagon"
-            elif vertices > 6:
-                # Check if it's a circle
-                area = cv2.contourArea(contour)
-                perimeter = cv2.arcLength(contour, True)
-                if perimeter > 0:
-                    circularity = 4 * np.pi * area / (perimeter * perimeter)
-                    if circularity > 0.7:
-                        shape_name = "Circle"
-                    else:
-                        shape_name = "Polygon"
-            
-            # Draw the contour and label
-            cv2.drawContours(frame, [contour], -1, (0, 255, 0), 2)
-            
-            # Get center point for text
-            M = cv2.moments(contour)
-            if M["m00"] != 0:
-                cx = int(M["m10"] / M["m00"])
-                cy = int(M["m01"] / M["m00"])
-                
-                # Draw shape name
-                cv2.putText(frame, shape_name, (cx - 50, cy), FONT, 0.7, TEXT_COLOR, 2)
-                
-                shapes_found.append(shape_name)
-        
-        return frame, shapes_found
+        return frame, self.renderer.draw(frame, self.detector.find_shapes(frame))
 
     def _process_frame(self, frame):
         """
         Process each frame for shape detection and display results.
         """
-        processed_frame, shapes = self.detect_shapes(frame)
+        return self._annotate(frame, self._track(frame))
+
+    def _track(self, frame):
+        """Tracks the shapes in ``frame`` and reports new ones (pipeline detect stage)."""
+        tracked = self.tracker.update(frame)
+        self._observe(tracked)
+        return tracked
+
+    def _observe(self, tracked):
+        """
+        Reports new shapes: each tracked shape once, when it has been stable for a few frames.
+        Runs in the detect stage because the tracker marks a shape reported as soon as it
+        creates the event, and the annotate stage may drop that packet.
+        """
+        for event in tracked[1]:
+            self.detected_shapes.append(event["label"])
+            print(f"New shape: {event['label']} (#{event['track_id']})")
+            emit("shape_appeared", track_id=event["track_id"], label=event["label"], bbox=event["bbox"])
+
+    @staticmethod
+    def _report(tracked):
+        """Detection events: the tracked shapes without their contours."""
+        shapes = [
+            {"label": s["label"], "track_id": s["track_id"], "bbox": s["bbox"],
+             "center": list(s["center"]) if s["center"] is not None else None}
+            for s in tracked[0]
+        ]
+        return {"label": shapes[0]["label"] if shapes else None, "detections": shapes}
+
+    def _annotate(self, frame, tracked):
+        """Draws the tracked shapes and game info (pipeline annotate stage)."""
+        found, _ = tracked
+        shapes = self.renderer.draw(frame, found)
+        processed_frame = frame
         
         # Display instructions
         cv2.putText(processed_frame, "Show shapes to the camera!", (10, 30), FONT, 0.7, (255, 255, 255), 2)
@@ -121,14 +138,7 @@ class ShapeDetectorApp:
             shapes_text = f"Found: {', '.join(set(shapes))}"
             cv2.putText(processed_frame, shapes_text, (10, processed_frame.shape[0] - 20), 
                        FONT, 0.6, (0, 255, 255), 2)
-            
-            # Update detected shapes list
-            current_time = time.time()
-            if current_time - self.last_detection_time > 1:  # Update every second
-                self.detected_shapes.extend(shapes)
-                self.last_detection_time = current_time
-                print(f"Detected shapes: {', '.join(set(shapes))}")
-        
+
         return processed_frame
 
     def run(self) -> None:
@@ -139,19 +149,14 @@ class ShapeDetectorApp:
             print("Shape Detection Game Started!")
         print("Show different shapes to the camera (triangles, squares, circles, etc.)")
         print("Press 'q' to quit")
+        emit("ready", game="shape")
         
         try:
-            while True:
-                ret, frame = self.cap.read()
-                if not ret:
-                    print("Error: Failed to capture frame. Exiting loop.")
-                    break
-
-                processed_frame = self._process_frame(frame)
-                cv2.imshow(WINDOW_NAME, processed_frame)
-
-                if cv2.waitKey(1) & 0xFF == ord(QUIT_KEY):
-                    break
+            # No mirroring here; frames from a read-only capture get a writable copy to draw on
+            run_game_pipeline(
+                self.cap, WINDOW_NAME, self._track, self._annotate,
+                preprocess=writable, quit_key=QUIT_KEY, report=self._report,
+            )
         finally:
             self.cleanup()
 
@@ -166,7 +171,8 @@ class ShapeDetectorApp:
         
         print("Releasing resources and closing windows...")
         self.cap.release()
-        cv2.destroyAllWindows()
+        emit("camera_released")
+        destroy_windows()
 
 
 def main():
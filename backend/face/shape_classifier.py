@@ -0,0 +1,116 @@
+"""
+Contour-based shape classification without any drawing.
+
+``ShapeClassifier`` finds external contours once per frame, computes every
+contour feature exactly once (moments, which also give the area and centre;
+perimeter; polygon approximation; bounding boxes) and then applies the
+vertex-count, aspect-ratio and circularity rules to all contours at once
+with numpy. Results are plain dicts, so the same classification can feed the
+game UI, the detector API or a tracker.
+"""
+import cv2
+import numpy as np
+
+UNKNOWN = "Unknown"
+
+
+class ShapeClassifier:
+    """Finds and classifies geometric shapes in BGR frames."""
+
+    def __init__(self, min_area=500, epsilon_ratio=0.02, square_tolerance=0.05,
+                 min_circularity=0.7, canny_thresholds=(50, 150), blur_size=5):
+        self.min_area = min_area
+        self.epsilon_ratio = epsilon_ratio
+        self.square_tolerance = square_tolerance
+        self.min_circularity = min_circularity
+        self.canny_thresholds = canny_thresholds
+        self.blur_size = blur_size
+
+    def find_contours(self, frame):
+        """Edge map → external contours."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        blurred = cv2.GaussianBlur(gray, (self.blur_size, self.blur_size), 0)
+        edges = cv2.Canny(blurred, *self.canny_thresholds)
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return contours
+
+    def features(self, contours):
+        """
+        Compute the features of every contour of at least ``min_area``, each
+        exactly once. Returns ``(kept_contours, features)`` where ``features``
+        holds numpy arrays aligned with ``kept_contours`` plus the list of
+        polygon approximations.
+        """
+        # Most contours are small noise: the cheap area test runs first, moments only for the rest
+        kept = [c for c in contours if cv2.contourArea(c) >= self.min_area]
+        moments = [cv2.moments(c) for c in kept]
+        perimeters = np.array([cv2.arcLength(c, True) for c in kept], dtype=np.float64)
+        approx = [cv2.approxPolyDP(c, self.epsilon_ratio * p, True) for c, p in zip(kept, perimeters)]
+
+        return kept, {
+            # For contours m00 is the (unsigned) area
+            "area": np.array([m["m00"] for m in moments], dtype=np.float64),
+            "perimeter": perimeters,
+            "m10": np.array([m["m10"] for m in moments], dtype=np.float64),
+            "m01": np.array([m["m01"] for m in moments], dtype=np.float64),
+            "vertices": np.array([len(a) for a in approx], dtype=np.int32),
+            "bbox": np.array([cv2.boundingRect(c) for c in kept], dtype=np.int32).reshape(-1, 4),
+            "approx_bbox": np.array([cv2.boundingRect(a) for a in approx], dtype=np.int32).reshape(-1, 4),
+            "approx": approx,
+        }
+
+    def rules(self, features):
+        """Apply the classification rules to all contours at once; returns (labels, circularity, aspect_ratio)."""
+        vertices = features["vertices"]
+        area, perimeter = features["area"], features["perimeter"]
+        width = features["approx_bbox"][:, 2].astype(np.float64)
+        height = features["approx_bbox"][:, 3].astype(np.float64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            aspect_ratio = np.where(height > 0, width / height, 0.0)
+            circularity = np.where(perimeter > 0, 4 * np.pi * area / (perimeter * perimeter), 0.0)
+
+        is_square = np.abs(aspect_ratio - 1.0) <= self.square_tolerance
+        conditions = [
+            vertices == 3,
+            (vertices == 4) & is_square,
+            vertices == 4,
+            vertices == 5,
+            vertices == 6,
+            (vertices > 6) & (perimeter > 0) & (circularity > self.min_circularity),
+            (vertices > 6) & (perimeter > 0),
+        ]
+        choices = ["Triangle", "Square", "Rectangle", "Pentagon", "Hexagon", "Circle", "Polygon"]
+        labels = np.select(conditions, choices, default=UNKNOWN)
+        return labels, circularity, aspect_ratio
+
+    def classify(self, contours):
+        """Classify contours; one dict per contour of at least ``min_area``."""
+        kept, features = self.features(contours)
+        if not kept:
+            return []
+        labels, circularity, aspect_ratio = self.rules(features)
+
+        area = features["area"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cx = np.where(area > 0, features["m10"] / area, 0.0)
+            cy = np.where(area > 0, features["m01"] / area, 0.0)
+
+        shapes = []
+        for i, contour in enumerate(kept):
+            shapes.append({
+                "label": str(labels[i]),
+                "contour": contour,
+                "approx": features["approx"][i],
+                "vertices": int(features["vertices"][i]),
+                "area": float(area[i]),
+                "perimeter": float(features["perimeter"][i]),
+                "circularity": float(circularity[i]),
+                "aspect_ratio": float(aspect_ratio[i]),
+                "bbox": features["bbox"][i].tolist(),
+                "center": (int(cx[i]), int(cy[i])) if area[i] > 0 else None,
+            })
+        return shapes
+
+    def detect(self, frame):
+        return self.classify(self.find_contours(frame))
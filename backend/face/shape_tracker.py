@@ -0,0 +1,176 @@
+"""
+Frame-to-frame shape tracking.
+
+``ShapeTracker`` matches this frame's contours to the shapes it is already
+following by bounding-box IoU (falling back to centroid distance for small,
+fast-moving boxes). A contour that matches a track whose size and box barely
+changed reuses the track's classification, so polygon approximation only runs
+for new or changed contours. Every shape gets a stable ``track_id`` and the
+tracker reports an "appeared" event once per shape instead of the same label
+every frame.
+"""
+import itertools
+
+import cv2
+import numpy as np
+
+from shape_classifier import ShapeClassifier
+
+
+class Track:
+    """One shape followed across frames."""
+
+    def __init__(self, track_id, shape, frame_index):
+        self.track_id = track_id
+        self.shape = shape
+        self.first_seen = frame_index
+        self.last_seen = frame_index
+        self.hits = 1
+        self.misses = 0
+        self.reported = False
+
+    @property
+    def label(self):
+        return self.shape["label"]
+
+
+def _iou_matrix(a, b):
+    """Pairwise IoU of (M, 4) and (N, 4) ``(x, y, w, h)`` box arrays."""
+    a = a[:, None, :].astype(np.float64)
+    b = b[None, :, :].astype(np.float64)
+    w = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    h = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    inter = np.clip(w, 0, None) * np.clip(h, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - inter
+    return inter / np.maximum(union, 1.0)
+
+
+class ShapeTracker:
+    """
+    Tracks classified shapes between frames.
+
+    ``update(frame)`` returns ``(shapes, events)``: the shape dicts of the
+    classifier plus ``track_id``, and one ``{"event": "appeared", ...}`` per
+    track once it has been seen for ``min_hits`` frames.
+    """
+
+    def __init__(self, classifier=None, match_iou=0.3, stable_iou=0.85, area_tolerance=0.1,
+                 max_center_distance=40, min_hits=3, max_misses=5):
+        self.classifier = classifier or ShapeClassifier()
+        self.match_iou = match_iou
+        self.stable_iou = stable_iou
+        self.area_tolerance = area_tolerance
+        self.max_center_distance = max_center_distance
+        self.min_hits = min_hits
+        self.max_misses = max_misses
+        self.tracks = []
+        self.frame_index = 0
+        self.reclassified = 0
+        self.reused = 0
+        self._ids = itertools.count(1)
+
+    def _match(self, boxes, centers):
+        """
+        Greedy one-to-one matching, best IoU first and then nearest centre for
+        boxes that do not overlap enough. Returns ``({contour index: track}, iou)``.
+        """
+        if not self.tracks or not len(boxes):
+            return {}, None
+        track_boxes = np.array([t.shape["bbox"] for t in self.tracks], dtype=np.float64)
+        track_centers = track_boxes[:, :2] + track_boxes[:, 2:] / 2.0
+        iou = _iou_matrix(track_boxes, boxes)
+        distance = np.hypot(track_centers[:, None, 0] - centers[None, :, 0], track_centers[:, None, 1] - centers[None, :, 1])
+
+        # IoU matches rank before every centroid-only match
+        score = np.where(iou >= self.match_iou, iou + 1.0,
+                         np.where(distance <= self.max_center_distance, 1.0 / (1.0 + distance), 0.0))
+        matches, used = {}, set()
+        for flat in np.argsort(-score, axis=None):
+            t, i = divmod(int(flat), score.shape[1])
+            if score[t, i] <= 0:
+                break
+            if i in matches or t in used:
+                continue
+            matches[i] = self.tracks[t]
+            used.add(t)
+        return matches, iou
+
+    def _is_stable(self, track, iou, area):
+        previous_area = track.shape["area"]
+        return iou >= self.stable_iou and abs(area - previous_area) <= self.area_tolerance * max(previous_area, 1.0)
+
+    def update(self, frame):
+        """Track the shapes in ``frame``; returns ``(shapes, events)``."""
+        return self.update_contours(self.classifier.find_contours(frame))
+
+    def update_contours(self, contours):
+        self.frame_index += 1
+        min_area = self.classifier.min_area
+        kept = [c for c in contours if cv2.contourArea(c) >= min_area]
+        boxes = np.array([cv2.boundingRect(c) for c in kept], dtype=np.float64).reshape(-1, 4)
+        centers = boxes[:, :2] + boxes[:, 2:] / 2.0
+        matches, iou = self._match(boxes, centers)
+        track_row = {id(track): t for t, track in enumerate(self.tracks)}
+
+        shapes = [None] * len(kept)
+        changed = []
+        for i, contour in enumerate(kept):
+            track = matches.get(i)
+            if track is None:
+                changed.append(i)
+                continue
+            moments = cv2.moments(contour)
+            area = moments["m00"]
+            if not self._is_stable(track, iou[track_row[id(track)], i], area):
+                changed.append(i)
+                continue
+            # Same shape, barely moved: keep its label and approximation
+            shape = dict(track.shape, contour=contour, area=area, bbox=[int(v) for v in boxes[i]],
+                         center=(int(moments["m10"] / area), int(moments["m01"] / area)) if area > 0 else None)
+            shapes[i] = shape
+            self.reused += 1
+
+        if changed:
+            for i, shape in zip(changed, self.classifier.classify([kept[i] for i in changed])):
+                shapes[i] = shape
+            self.reclassified += len(changed)
+
+        events = []
+        seen = set()
+        for i, shape in enumerate(shapes):
+            track = matches.get(i)
+            if track is None:
+                track = Track(next(self._ids), shape, self.frame_index)
+                self.tracks.append(track)
+            else:
+                track.shape = shape
+                track.hits += 1
+                track.misses = 0
+                track.last_seen = self.frame_index
+            seen.add(id(track))
+            shape["track_id"] = track.track_id
+            if not track.reported and track.hits >= self.min_hits:
+                track.reported = True
+                events.append({
+                    "event": "appeared",
+                    "track_id": track.track_id,
+                    "label": shape["label"],
+                    "bbox": shape["bbox"],
+                    "center": list(shape["center"]) if shape["center"] is not None else None,
+                })
+
+        for track in self.tracks:
+            if id(track) not in seen:
+                track.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        return shapes, events
+
+    def stats(self):
+        return {
+            "tracks": len(self.tracks),
+            "reclassified": self.reclassified,
+            "reused": self.reused,
+        }
+
+    def reset(self):
+        self.tracks = []
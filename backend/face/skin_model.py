@@ -0,0 +1,91 @@
+"""
+Per-user skin model for the gesture fallback.
+
+A fixed HSV range misses many skin tones and lighting setups. During a short
+calibration the player holds a palm inside a box; a 2-D hue/saturation
+histogram of those pixels becomes the model. Frames are then segmented with
+``cv2.calcBackProject`` through a precomputed binary lookup (255 for bins at
+or above ``threshold`` of the peak, 0 elsewhere), so back-projection yields
+the mask directly without a separate threshold pass.
+
+Models are saved per user profile (``GAME_USER_PROFILE``, default "default")
+next to the color calibration tables.
+"""
+import os
+import time
+
+import cv2
+import numpy as np
+
+from color_lut import calibration_dir, safe_name
+
+USER_PROFILE_ENV = "GAME_USER_PROFILE"
+SKIN_MODEL_VERSION = 1
+H_BINS, S_BINS = 30, 32
+HIST_RANGES = [0, 180, 0, 256]
+DEFAULT_THRESHOLD = 0.05
+# Below this value hue is unreliable (dark pixels); they never count as skin
+MIN_VALUE = 40
+
+
+class SkinModel:
+    """Hue/saturation histogram of a user's skin, compiled into a back-projection lookup."""
+
+    def __init__(self, hist, threshold=DEFAULT_THRESHOLD):
+        hist = np.asarray(hist, dtype=np.float32)
+        if hist.shape != (H_BINS, S_BINS):
+            raise ValueError(f"Skin histogram must be {H_BINS}x{S_BINS}, got {hist.shape}")
+        peak = float(hist.max())
+        self.hist = hist / peak if peak > 0 else hist
+        self.threshold = threshold
+        self.lut = np.where(self.hist >= threshold, 255.0, 0.0).astype(np.float32)
+
+    @classmethod
+    def from_samples(cls, hsv_pixels, threshold=DEFAULT_THRESHOLD):
+        """Learn the model from sampled HSV pixels, (N, 3) uint8."""
+        pixels = np.asarray(hsv_pixels, dtype=np.uint8).reshape(-1, 1, 3)
+        pixels = pixels[pixels[:, 0, 2] >= MIN_VALUE]
+        if len(pixels) == 0:
+            raise ValueError("No usable skin samples")
+        hist = cv2.calcHist([pixels], [0, 1], None, [H_BINS, S_BINS], HIST_RANGES)
+        # Spread each sampled bin a little so nearby shades under the same light still match
+        hist = cv2.GaussianBlur(hist, (3, 3), 0)
+        return cls(hist, threshold)
+
+    def mask(self, hsv):
+        """255 where ``hsv`` pixels look like this user's skin."""
+        mask = cv2.calcBackProject([hsv], [0, 1], self.lut, HIST_RANGES, 1)
+        return cv2.bitwise_and(mask, cv2.inRange(hsv, (0, 0, MIN_VALUE), (255, 255, 255)))
+
+    def coverage(self):
+        """Fraction of hue/saturation bins counted as skin."""
+        return float(np.count_nonzero(self.lut)) / self.lut.size
+
+
+def skin_model_path(profile=None):
+    profile = profile or os.environ.get(USER_PROFILE_ENV) or "default"
+    return os.path.join(calibration_dir(), f"skin_{safe_name(profile)}.npz")
+
+
+def save_skin_model(path, model, **meta):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, hist=model.hist, threshold=model.threshold, version=SKIN_MODEL_VERSION,
+                 created_at=meta.get("created_at", time.time()))
+    os.replace(tmp_path, path)
+
+
+def load_skin_model(path):
+    """The saved model at ``path``, or None if there is none or it is unusable."""
+    try:
+        with np.load(path) as data:
+            if int(data["version"]) != SKIN_MODEL_VERSION:
+                print(f"[Skin] {path} has version {int(data['version'])}, expected {SKIN_MODEL_VERSION}; recalibrate")
+                return None
+            return SkinModel(data["hist"], float(data["threshold"]))
+    except FileNotFoundError:
+        return None
+    except (OSError, KeyError, ValueError) as e:
+        print(f"[Skin] Cannot load {path}: {e}")
+        return None
@@ -0,0 +1,59 @@
+"""
+Game side of browser streaming.
+
+While someone watches a session in the browser, the backend sends a
+``stream`` command with ``enabled``, ``quality`` and ``scale``. The
+``StreamEncoder`` pipeline stage then JPEG-encodes each annotated frame once
+and sends it to the backend as a ``frame`` message; the backend fans the same
+bytes out to every viewer and lowers quality/scale when viewers fall behind.
+Nothing is encoded while nobody watches.
+
+A ``stream`` command that arrives before the encoder exists finds no handler,
+so the encoder announces itself with ``stream_ready`` and the backend sends
+the current configuration again.
+"""
+import cv2
+
+from control import get_channel
+
+DEFAULT_QUALITY = 70
+MIN_QUALITY, MAX_QUALITY = 20, 95
+
+
+class StreamEncoder:
+    """Pipeline stage: encode the annotated frame for the backend's viewers."""
+
+    def __init__(self, channel=None):
+        self.channel = channel or get_channel()
+        self.enabled = False
+        self.quality = DEFAULT_QUALITY
+        self.scale = 1.0
+        self.encoded = 0
+        self.channel.on_command("stream", self.configure)
+        self.channel.send("stream_ready")
+
+    @property
+    def active(self):
+        return self.enabled and self.channel.connected
+
+    def configure(self, message):
+        """Apply a ``stream`` command from the backend."""
+        self.enabled = bool(message.get("enabled", self.enabled))
+        self.quality = min(MAX_QUALITY, max(MIN_QUALITY, int(message.get("quality", self.quality))))
+        self.scale = min(1.0, max(0.1, float(message.get("scale", self.scale))))
+
+    def encode(self, frame):
+        """JPEG bytes of ``frame`` at the current scale and quality."""
+        if self.scale < 1.0:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return jpeg.tobytes() if ok else None, frame.shape[1], frame.shape[0]
+
+    def __call__(self, packet):
+        if self.active:
+            jpeg, width, height = self.encode(packet.frame)
+            if jpeg is not None:
+                self.encoded += 1
+                self.channel.send("frame", seq=packet.seq, timestamp=packet.timestamp, jpeg=jpeg,
+                                  width=width, height=height, quality=self.quality)
+        return packet
@@ -0,0 +1,81 @@
+"""
+Pre-warmed game worker.
+
+Started by the backend's worker pool. The worker imports a game module (which
+pulls in OpenCV, NumPy and, for gestures, MediaPipe), runs the module's
+``preload()`` hook so cascades and models are resident, reports ``warm`` over
+the control channel and then waits for the backend to hand it a session.
+A worker serves exactly one session and exits with the game.
+"""
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
+import importlib
+import os
+import sys
+import traceback
+
+from control import get_channel
+
+
+def _ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000.0, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warmed game worker")
+    parser.add_argument("--script", required=True, help="Game script to preload, e.g. emotion_game.py")
+    args = parser.parse_args()
+
+    channel = get_channel()
+    if not channel.connected:
+        print("❌ Worker started without a control channel. Exiting.")
+        sys.exit(2)
+
+    module_name = os.path.splitext(os.path.basename(args.script))[0]
+    try:
+        t_import = time.perf_counter()
+        module = importlib.import_module(module_name)
+        import_ms = _ms(t_import)
+
+        t_preload = time.perf_counter()
+        preload = getattr(module, "preload", None)
+        if preload is not None:
+            preload()
+        preload_ms = _ms(t_preload)
+    except Exception as e:
+        traceback.print_exc()
+        channel.send("failed", error=f"{type(e).__name__}: {e}")
+        sys.exit(3)
+
+    warmup_ms = _ms(_STARTED)
+    channel.send("warm", script=args.script, import_ms=import_ms, preload_ms=preload_ms, warmup_ms=warmup_ms)
+    print(f"[Worker] {module_name} warm in {warmup_ms} ms (import {import_ms} ms, preload {preload_ms} ms)")
+    sys.stdout.flush()
+
+    while True:
+        message = channel.recv()
+        if message is None:
+            print("[Worker] Control channel closed before a session was assigned. Exiting.")
+            return
+        if message.get("cmd") == "quit":
+            return
+        if message.get("cmd") == "start":
+            break
+
+    from pipeline import HEADLESS_ENV
+    from skin_model import USER_PROFILE_ENV
+
+    # Pooled workers are spawned before the session exists, so its display mode and user arrive with it
+    os.environ[HEADLESS_ENV] = "1" if message.get("headless") else "0"
+    if message.get("profile"):
+        os.environ[USER_PROFILE_ENV] = message["profile"]
+    print(f"[Worker] Session {message.get('session')} assigned, starting {module_name}")
+    sys.stdout.flush()
+    module.main()
+
+
+if __name__ == "__main__":
+    main()
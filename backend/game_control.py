@@ -0,0 +1,213 @@
+"""Backend side of the control channel shared with the game processes.
+
+A single ``multiprocessing.connection.Listener`` (Unix socket on POSIX, named
+pipe on Windows) accepts connections from every child started by the backend.
+Children identify themselves with the worker id they were given through the
+environment (see ``face/control.py``) and from then on send event dicts and
+receive command dicts over that connection.
+"""
+import collections
+import secrets
+import threading
+import time
+from multiprocessing.connection import Listener
+
+from stream_hub import FrameHub
+
+# Keep these in sync with face/control.py
+CONTROL_ADDRESS_ENV = "GAME_CONTROL_ADDRESS"
+CONTROL_AUTHKEY_ENV = "GAME_CONTROL_AUTHKEY"
+WORKER_ID_ENV = "GAME_WORKER_ID"
+
+MAX_EVENTS = 1000  # per child; older events drop out of the replay window
+
+# Events after which a child may have missed commands sent before it was listening
+RESYNC_EVENTS = ("hello", "ready", "stream_ready")
+
+
+class WorkerLink:
+    """Events received from (and commands sent to) one child process."""
+
+    def __init__(self, worker_id, max_events=MAX_EVENTS):
+        self.worker_id = worker_id
+        # Most recent events, each numbered with ``seq`` (1, 2, ...) as a replay cursor
+        self.events = collections.deque(maxlen=max_events)
+        self.seq = 0
+        self._latest = {}
+        self._conn = None
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        # Encoded frames skip the event list: only the newest one is kept, for viewers
+        self.frames = FrameHub(self.send)
+
+    @property
+    def connected(self):
+        return self._conn is not None
+
+    def _attach(self, conn):
+        with self._cond:
+            self._conn = conn
+            self._cond.notify_all()
+
+    def _detach(self):
+        with self._cond:
+            self._conn = None
+            self._cond.notify_all()
+        self.frames.close()
+
+    def _deliver(self, message):
+        if message.get("event") == "frame":
+            self.frames.publish(message)
+            return
+        with self._cond:
+            self.seq += 1
+            # Replaces any "seq" of the child's own; games send theirs under another name (frame_seq, frames)
+            message["seq"] = self.seq
+            self.events.append(message)
+            self._latest[message.get("event")] = message
+            self._cond.notify_all()
+        if message.get("event") in RESYNC_EVENTS:
+            self.frames.resync()
+
+    def last(self, event):
+        """Return the most recent message of the given event type, or None."""
+        with self._cond:
+            return self._latest.get(event)
+
+    def events_since(self, seq, timeout=0):
+        """
+        Events numbered after ``seq`` that are still retained, waiting up to
+        ``timeout`` seconds for one to arrive. Empty on timeout, or at once
+        when the child is disconnected and nothing newer is left.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self.seq > seq:
+                    return [m for m in self.events if m["seq"] > seq]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (self._conn is None and self._latest):
+                    return []
+                self._cond.wait(remaining)
+
+    def wait_for(self, events, timeout, is_alive=None):
+        """
+        Block until one of ``events`` has been received.
+        Returns the message, or None on timeout or when ``is_alive()`` turns False.
+        """
+        if isinstance(events, str):
+            events = (events,)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            seen = 0
+            while True:
+                for message in self.events:
+                    if message["seq"] > seen and message.get("event") in events:
+                        return message
+                seen = self.seq
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if is_alive is not None and not is_alive():
+                    return None
+                # Wake up periodically so a dead child is noticed promptly
+                self._cond.wait(min(remaining, 0.25))
+
+    def send(self, cmd, **fields):
+        """Send a command to the child. Returns False if it is not connected."""
+        conn = self._conn
+        if conn is None:
+            return False
+        try:
+            with self._send_lock:
+                conn.send({"cmd": cmd, **fields})
+            return True
+        except (OSError, EOFError, ValueError):
+            self._detach()
+            return False
+
+
+class ControlServer:
+    """Accepts control connections from game processes and routes their messages."""
+
+    def __init__(self):
+        self._authkey = secrets.token_hex(16)
+        self._listener = None
+        self._links = {}
+        self._lock = threading.Lock()
+
+    @property
+    def address(self):
+        self._ensure_started()
+        return self._listener.address
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = Listener(authkey=self._authkey.encode())
+            threading.Thread(target=self._accept_loop, name="control-accept", daemon=True).start()
+            print(f"[Control] Listening for game processes on {self._listener.address}")
+
+    def env(self, worker_id):
+        """Environment variables a child needs to connect back as ``worker_id``."""
+        return {
+            CONTROL_ADDRESS_ENV: str(self.address),
+            CONTROL_AUTHKEY_ENV: self._authkey,
+            WORKER_ID_ENV: worker_id,
+        }
+
+    def link(self, worker_id):
+        """Return the link for ``worker_id``, creating it if needed."""
+        with self._lock:
+            link = self._links.get(worker_id)
+            if link is None:
+                link = self._links[worker_id] = WorkerLink(worker_id)
+            return link
+
+    def forget(self, worker_id):
+        with self._lock:
+            self._links.pop(worker_id, None)
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return  # listener closed
+            except Exception as e:
+                # Typically an AuthenticationError from a stray client
+                print(f"[Control] Rejected connection: {e}")
+                continue
+            threading.Thread(target=self._reader, args=(conn,), daemon=True).start()
+
+    def _reader(self, conn):
+        link = None
+        try:
+            while True:
+                message = conn.recv()
+                if not isinstance(message, dict):
+                    continue
+                if link is None:
+                    worker_id = message.get("worker_id")
+                    if not worker_id:
+                        print("[Control] Dropping connection without a worker id")
+                        return
+                    link = self.link(worker_id)
+                    link._attach(conn)
+                link._deliver(message)
+        except (EOFError, OSError):
+            pass
+        finally:
+            if link is not None:
+                link._detach()
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._listener is not None:
+                self._listener.close()
+                self._listener = None
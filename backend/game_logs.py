@@ -0,0 +1,233 @@
+"""
+Bounded, rotated logs of the game processes, readable incrementally.
+
+Children no longer write straight into ``logs/<name>.out.log``: their stdout
+and stderr are pipes that a backend thread copies into a ``RotatingLog``. A
+log rotates (``.log`` → ``.log.1`` → ...) when it passes ``max_bytes`` or
+``max_age`` seconds, keeps ``backups`` old files, and the whole directory is
+trimmed (oldest rotated files first) to ``total_bytes``.
+
+Readers address a log by logical byte offset: bytes ever written to it since
+the backend started, unaffected by rotation. ``read_since(offset)`` returns
+only newer bytes and the next offset, so a poller that is up to date causes
+no file access at all.
+
+Limits come from the environment:
+
+    GAME_LOG_MAX_BYTES     rotate above this size (default 5 MB)
+    GAME_LOG_MAX_AGE       rotate files older than this many seconds (default 1 day, 0 = never)
+    GAME_LOG_BACKUPS       rotated files kept per log (default 3)
+    GAME_LOG_TOTAL_BYTES   cap on all logs together (default 50 MB)
+"""
+import glob
+import os
+import threading
+import time
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_MAX_AGE = 24 * 3600
+DEFAULT_BACKUPS = 3
+DEFAULT_TOTAL_BYTES = 50 * 1024 * 1024
+READ_CHUNK = 64 * 1024    # most bytes one incremental read returns
+PUMP_CHUNK = 8192
+
+
+def log_limits_from_env(environ=None):
+    """Return the rotation settings from GAME_LOG_* (invalid values fall back to the defaults)."""
+    environ = os.environ if environ is None else environ
+    limits = {}
+    for key, env, default in (
+        ("max_bytes", "GAME_LOG_MAX_BYTES", DEFAULT_MAX_BYTES),
+        ("max_age", "GAME_LOG_MAX_AGE", DEFAULT_MAX_AGE),
+        ("backups", "GAME_LOG_BACKUPS", DEFAULT_BACKUPS),
+        ("total_bytes", "GAME_LOG_TOTAL_BYTES", DEFAULT_TOTAL_BYTES),
+    ):
+        try:
+            limits[key] = max(0, int(environ.get(env, default)))
+        except ValueError:
+            print(f"[Logs] Ignoring invalid {env}={environ.get(env)!r}")
+            limits[key] = default
+    return limits
+
+
+class RotatingLog:
+    """One append-only log file with size/age rotation and logical offsets."""
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE, backups=DEFAULT_BACKUPS,
+                 on_rotate=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backups = backups
+        self._on_rotate = on_rotate
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+        # Logical offset of the first byte of the current file, and of ``<path>.1`` (None if there is none)
+        self.base = 0
+        self._previous_base = None
+        self._opened_at = time.time()
+        self.rotations = 0
+        self._line_open = False
+
+    @property
+    def end(self):
+        """Logical offset just past the last byte written."""
+        return self.base + self._size
+
+    def write(self, data):
+        with self._lock:
+            if self._should_rotate():
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+            if data:
+                self._line_open = not data.endswith(b"\n")
+
+    def end_line(self):
+        """Terminate a last line left without a newline (its writer is gone), so readers get it."""
+        if self._line_open:
+            self.write(b"\n")
+
+    def _should_rotate(self):
+        if self.max_bytes and self._size >= self.max_bytes:
+            return True
+        return bool(self.max_age) and self._size > 0 and time.time() - self._opened_at >= self.max_age
+
+    def _rotate(self):
+        # Caller holds self._lock
+        self._file.close()
+        if self.backups:
+            for index in range(self.backups - 1, 0, -1):
+                older = f"{self.path}.{index}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+            self._previous_base = self.base
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "ab")
+        self.base += self._size
+        self._size = 0
+        self._opened_at = time.time()
+        self.rotations += 1
+        if self._on_rotate is not None:
+            self._on_rotate()
+
+    def read_since(self, offset, limit=READ_CHUNK):
+        """
+        ``(data, next_offset, truncated)`` for the bytes after logical ``offset``.
+        Bytes rotated into ``<path>.1`` are still read from there. ``truncated``
+        is True when part of what followed ``offset`` is gone (older backups,
+        or an offset from before a backend restart); reading then restarts at
+        the oldest byte still readable. Only whole lines are
+        returned unless a single line exceeds ``limit``: a line still being
+        written stays unread, with ``next_offset`` left at its start. The
+        one exception is a line cut by rotation, whose head in ``<path>.1``
+        is returned as-is since nothing more will be appended there.
+        """
+        with self._lock:
+            base, end = self.base, self.end
+            start, path, stop = base, self.path, end
+            if self._previous_base is not None and os.path.exists(f"{self.path}.1"):
+                if offset < base:
+                    start, path, stop = self._previous_base, f"{self.path}.1", base
+            backup = path != self.path
+            truncated = offset < start or offset > end
+            if truncated:
+                offset = start
+            if offset >= end:
+                return b"", offset, truncated
+            # Under the lock so a rotation cannot swap the file mid-read
+            try:
+                data = self._read(path, offset - start, min(limit, stop - offset))
+            except FileNotFoundError:
+                # The backup was trimmed by another log's rotation just now
+                offset, truncated, backup = base, True, False
+                data = self._read(self.path, 0, min(limit, end - base))
+        if backup and offset + len(data) == stop:
+            # A backup never grows, so its unterminated tail is final
+            return data, stop, truncated
+        cut = data.rfind(b"\n") + 1
+        if cut == 0 and len(data) < limit:
+            return b"", offset, truncated
+        if 0 < cut < len(data):
+            data = data[:cut]
+        return data, offset + len(data), truncated
+
+    @staticmethod
+    def _read(path, position, size):
+        with open(path, "rb") as f:
+            f.seek(position)
+            return f.read(size)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class LogManager:
+    """The rotating logs of a directory, shared by every process that writes to them."""
+
+    def __init__(self, directory, **limits):
+        limits = {**log_limits_from_env(), **limits}
+        self.directory = directory
+        self.total_bytes = limits.pop("total_bytes")
+        self.limits = limits
+        self._logs = {}
+        self._lock = threading.Lock()
+        self.enforce_total()
+
+    def get(self, path):
+        with self._lock:
+            log = self._logs.get(path)
+            if log is None:
+                log = self._logs[path] = RotatingLog(path, on_rotate=self.enforce_total, **self.limits)
+            return log
+
+    def attach(self, process, stdout_path, stderr_path):
+        """Copy ``process``'s stdout/stderr pipes into the logs on background threads."""
+        for stream, path in ((process.stdout, stdout_path), (process.stderr, stderr_path)):
+            if stream is not None:
+                threading.Thread(
+                    target=self._pump, args=(stream, self.get(path)),
+                    name=f"log-{os.path.basename(path)}", daemon=True,
+                ).start()
+
+    @staticmethod
+    def _pump(stream, log):
+        try:
+            while True:
+                data = stream.read1(PUMP_CHUNK) if hasattr(stream, "read1") else stream.read(PUMP_CHUNK)
+                if not data:
+                    break
+                log.write(data)
+        except (OSError, ValueError) as e:
+            print(f"[Logs] Stopped copying into {log.path}: {e}")
+        finally:
+            stream.close()
+            log.end_line()
+
+    def enforce_total(self):
+        """Delete the oldest rotated files until all logs fit in ``total_bytes``."""
+        if not self.total_bytes:
+            return
+        files = []
+        for path in glob.glob(os.path.join(self.directory, "*.log*")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path, stat.st_size))
+        total = sum(size for _, _, size in files)
+        # Live files are never deleted; rotated ones go oldest first
+        for _, path, size in sorted(f for f in files if not f[1].endswith(".log")):
+            if total <= self.total_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
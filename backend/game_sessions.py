@@ -0,0 +1,444 @@
+"""
+Game session lifecycle driven by readiness events from the game processes.
+
+Games report ``ready``, ``camera_released`` and ``exited`` over the control
+channel (see ``face/control.py``). The supervisor waits for those events on
+background threads with timeouts, so start/stop requests return immediately
+with a status URL instead of sleeping until the camera settles.
+"""
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+STARTUP_TIMEOUT = 30.0   # camera open retries on 3 indices + warm-up frames + model loading
+QUIT_TIMEOUT = 5.0       # graceful quit before we terminate the process
+KILL_TIMEOUT = 5.0       # terminate before we kill the process
+EXIT_GRACE = 2.0         # camera released, let the process finish its own exit
+MAX_SERVICE_RESTARTS = 3
+
+# Keep in sync with face/pipeline.py and face/skin_model.py
+HEADLESS_ENV = "GAME_HEADLESS"
+USER_PROFILE_ENV = "GAME_USER_PROFILE"
+
+
+def read_tail(path, max_bytes=2000, max_lines=20):
+    """Return the last lines of a log file (best effort)."""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, "rb") as rf:
+        rf.seek(0, os.SEEK_END)
+        size = rf.tell()
+        if size == 0:
+            return []
+        rf.seek(max(0, size - max_bytes))
+        data = rf.read().decode(errors="ignore")
+    return data.splitlines()[-max_lines:] if data.strip() else []
+
+
+class GameSession:
+    """State of one start → stop cycle of a game."""
+
+    def __init__(self, game, script, headless=False, profile=None):
+        self.game = game
+        self.script = script
+        self.headless = headless
+        # User profile for per-user calibration (None: the backend's GAME_USER_PROFILE)
+        self.profile = profile
+        self.id = uuid.uuid4().hex[:12]
+        self.state = "starting"
+        self.process = None
+        self.link = None
+        self.pooled = False
+        self.error = None
+        self.diagnostics = {}
+        self.stdout_log = None
+        self.stderr_log = None
+        self.created_at = time.time()
+        self.ready_at = None
+        self.stopped_at = None
+        self.stop_requested = False
+        # Set once this session no longer holds the camera
+        self.released = threading.Event()
+        self.attached = threading.Event()
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    @property
+    def active(self):
+        return self.state in ("starting", "running")
+
+    def as_dict(self):
+        data = {
+            "game": self.game,
+            "session": self.id,
+            "state": self.state,
+            "script": self.script,
+            "process_id": self.process.pid if self.process is not None else None,
+            "pooled": self.pooled,
+            "headless": self.headless,
+            "profile": self.profile,
+            "created_at": self.created_at,
+            "ready_at": self.ready_at,
+            "startup_ms": round((self.ready_at - self.created_at) * 1000.0, 1) if self.ready_at else None,
+            "stopped_at": self.stopped_at,
+            "camera_released": self.released.is_set(),
+            "error": self.error,
+        }
+        if self.process is not None and self.process.poll() is not None:
+            data["exit_code"] = self.process.returncode
+        stats = self.link.last("stats") if self.link is not None else None
+        if stats is not None and "pipeline" in stats:
+            data["pipeline"] = stats["pipeline"]
+        if self.link is not None:
+            data["stream"] = self.link.frames.stats()
+        data.update(self.diagnostics)
+        return data
+
+
+class GameSupervisor:
+    """
+    Starts and stops game sessions without blocking the caller.
+
+    ``launch(game, script, extra_env)`` starts a game script and returns
+    ``(process, stdout_log, stderr_log)``; ``prepare(game)`` makes sure the
+    game's dependencies are present and may raise; ``log_paths(game)``
+    returns the ``(stdout_log, stderr_log)`` pooled workers write to.
+    """
+
+    def __init__(self, control, pool, launch, prepare, log_paths):
+        self.control = control
+        self.pool = pool
+        self._launch = launch
+        self._prepare = prepare
+        self._log_paths = log_paths
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, game):
+        session = self.sessions.get(game)
+        if session is not None:
+            self._reconcile(session)
+        return session
+
+    def running_games(self):
+        with self._lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            self._reconcile(session)
+        return [s.game for s in sessions if s.active]
+
+    def is_running(self, game):
+        session = self.get(game)
+        return session is not None and session.active and session.alive
+
+    def _reconcile(self, session):
+        """Notice games that exited on their own (user pressed 'q', crash, camera lost)."""
+        if not session.active or not session.attached.is_set() or session.process is None:
+            return
+        if session.process.poll() is None:
+            return
+        if session.state == "running" and session.process.returncode == 0:
+            session.state = "stopped"
+            session.stopped_at = time.time()
+            session.released.set()
+            return
+        failed = session.link.last("failed") if session.link is not None else None
+        self._mark_failed(session, (failed or {}).get("error"))
+
+    def start(self, game, script, headless=False, profile=None):
+        """
+        Begin starting ``game`` (without a window when ``headless``, calibrated
+        for user ``profile`` when given). Returns
+        ``(session, created)``; ``created`` is False when the game was already
+        starting or running.
+        """
+        with self._lock:
+            previous = self.sessions.get(game)
+            if previous is not None:
+                self._reconcile(previous)
+            if previous is not None and previous.active:
+                return previous, False
+            session = GameSession(game, script, headless, profile)
+            self.sessions[game] = session
+        threading.Thread(
+            target=self._run_start, args=(session, previous), name=f"start-{game}", daemon=True
+        ).start()
+        return session, True
+
+    def _run_start(self, session, previous):
+        try:
+            if previous is not None:
+                # A previous session of this game may still hold the camera
+                if previous.active:
+                    self._run_stop(previous)
+                previous.released.wait(QUIT_TIMEOUT + KILL_TIMEOUT)
+
+            self._prepare(session.game)
+
+            worker = (
+                self.pool.acquire(
+                    session.game, session.script, session.id, headless=session.headless, profile=session.profile
+                )
+                if self.pool is not None else None
+            )
+            if worker is not None:
+                session.process = worker.process
+                session.link = worker.link
+                session.pooled = True
+                session.stdout_log, session.stderr_log = self._log_paths(session.game)
+            else:
+                worker_id = f"{session.game}-{session.id}"
+                session.link = self.control.link(worker_id)
+                env = {**self.control.env(worker_id), HEADLESS_ENV: "1" if session.headless else "0"}
+                if session.profile:
+                    env[USER_PROFILE_ENV] = session.profile
+                session.process, session.stdout_log, session.stderr_log = self._launch(
+                    session.game, session.script, env
+                )
+            session.attached.set()
+            print(f"[Session] {session.game} {session.id} launched (pid {session.process.pid}, pooled={session.pooled})")
+
+            message = session.link.wait_for(("ready", "failed"), STARTUP_TIMEOUT, is_alive=lambda: session.alive)
+            if session.stop_requested:
+                return
+            if message is not None and message.get("event") == "ready":
+                session.state = "running"
+                session.ready_at = time.time()
+                print(f"[Session] {session.game} ready in {session.as_dict()['startup_ms']} ms")
+            elif session.alive:
+                # Still alive but silent: keep it, but say we never heard back
+                session.state = "running"
+                session.error = "Game did not report ready within the startup timeout"
+            else:
+                self._mark_failed(session, (message or session.link.last("failed") or {}).get("error"))
+        except Exception as e:
+            self._mark_failed(session, f"Failed to start {session.game} game: {e}")
+        finally:
+            session.attached.set()
+
+    def _mark_failed(self, session, error=None):
+        session.state = "failed"
+        session.stopped_at = time.time()
+        session.error = error or (
+            f"Failed to start {session.game} game (process exited immediately). "
+            "Ensure required dependencies are installed and your webcam is accessible. "
+            "Required: opencv-python, numpy (plus mediapipe for gestures)."
+        )
+        try:
+            session.diagnostics = {
+                "stderr_tail": read_tail(session.stderr_log),
+                "stdout_tail": read_tail(session.stdout_log),
+                "stderr_log": session.stderr_log,
+                "stdout_log": session.stdout_log,
+            }
+        except Exception as e:
+            session.diagnostics = {"stderr_tail": [f"Error reading logs: {e}"]}
+        print(f"❌ {session.game} session {session.id} failed: {session.error}")
+        session.released.set()
+
+    def stop(self, game):
+        """Begin stopping ``game``. Returns the session, or None if it was not running."""
+        with self._lock:
+            session = self.sessions.get(game)
+            if session is not None:
+                self._reconcile(session)
+            if session is None or not session.active:
+                return None
+            session.state = "stopping"
+            session.stop_requested = True
+        threading.Thread(target=self._run_stop, args=(session,), name=f"stop-{game}", daemon=True).start()
+        return session
+
+    def _run_stop(self, session):
+        session.state = "stopping"
+        session.stop_requested = True
+        # The process may still be launching; give the start thread a chance to attach it
+        session.attached.wait(STARTUP_TIMEOUT)
+        process = session.process
+        if process is not None and process.poll() is None:
+            if session.link is not None and session.link.send("quit"):
+                message = session.link.wait_for(("camera_released", "exited"), QUIT_TIMEOUT, is_alive=lambda: session.alive)
+                if message is not None:
+                    # The camera is free; a queued start may proceed while we wait for exit
+                    session.released.set()
+                    try:
+                        process.wait(timeout=EXIT_GRACE)
+                    except subprocess.TimeoutExpired:
+                        pass
+            if process.poll() is None:
+                terminate_process(process)
+                try:
+                    process.wait(timeout=KILL_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+        if session.link is not None and not session.pooled:
+            self.control.forget(session.link.worker_id)
+        session.state = "stopped"
+        session.stopped_at = time.time()
+        session.released.set()
+        print(f"[Session] {session.game} {session.id} stopped")
+
+    def stop_all(self, wait=False):
+        """Stop every active game; with ``wait`` block until all have exited."""
+        with self._lock:
+            sessions = [s for s in self.sessions.values() if s.active]
+        for session in sessions:
+            self.stop(session.game)
+        if wait:
+            for session in sessions:
+                session.released.wait(STARTUP_TIMEOUT + QUIT_TIMEOUT + KILL_TIMEOUT)
+        return [s.game for s in sessions]
+
+
+class ServiceProcess:
+    """
+    A helper process the backend keeps running beside the games (capture
+    service, inference worker): started once, watched for ``ready`` over the
+    control channel, restarted up to ``MAX_SERVICE_RESTARTS`` times, stopped
+    with the backend.
+
+    Subclasses set ``name`` (control worker id), ``script`` (in face/),
+    ``label`` and ``ready_fields`` (copied from the ready event into
+    ``status()``) and provide ``_args()``; ``_env()``, ``_status()`` and
+    ``_stats()`` add their own launch environment and status fields.
+    ``spawn(name, script, args, env)`` starts the script from the face directory.
+    """
+
+    name = None
+    script = None
+    label = None
+    ready_fields = ()
+
+    def __init__(self, control, spawn, enabled):
+        self.control = control
+        self._spawn = spawn
+        self.enabled = enabled
+        self.process = None
+        self.link = None
+        self.state = "disabled" if not self.enabled else "stopped"
+        self.error = None
+        self.info = {}
+        self.restarts = 0
+        self.started_at = None
+        self.ready_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    @property
+    def _tag(self):
+        return f"[{self.name.capitalize()}]"
+
+    def _args(self):
+        return []
+
+    def _env(self):
+        return {}
+
+    def _status(self):
+        return {}
+
+    def _stats(self, stats):
+        return {k: v for k, v in stats.items() if k not in ("event", "worker_id", "ts")}
+
+    def ensure_running(self):
+        """Start the service if it is enabled and not running. Returns immediately."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.alive:
+                return
+            if self.process is not None:
+                if self.restarts >= MAX_SERVICE_RESTARTS:
+                    return
+                self.restarts += 1
+                print(f"{self._tag} {self.label} exited with {self.process.returncode}; "
+                      f"restarting ({self.restarts}/{MAX_SERVICE_RESTARTS})")
+            self.control.forget(self.name)
+            self.link = self.control.link(self.name)
+            self.state = "starting"
+            self.error = None
+            self.started_at = time.time()
+            self.ready_at = None
+            self.process = self._spawn(
+                self.name, self.script, self._args(), {**self.control.env(self.name), **self._env()}
+            )
+        threading.Thread(target=self._await_ready, name=f"{self.name}-ready", daemon=True).start()
+
+    def start(self):
+        self.ensure_running()
+
+    def _await_ready(self):
+        link, process = self.link, self.process
+        message = link.wait_for(("ready", "failed"), STARTUP_TIMEOUT, is_alive=lambda: process.poll() is None)
+        if process is not self.process:
+            return
+        if message is not None and message.get("event") == "ready":
+            self.state = "running"
+            self.ready_at = time.time()
+            self.info = {k: message.get(k) for k in self.ready_fields}
+            print(f"{self._tag} {self.label} ready in {int((self.ready_at - self.started_at) * 1000)} ms: {self.info}")
+        else:
+            failed = message or link.last("failed") or {}
+            self.state = "failed"
+            self.error = failed.get("error") or f"{self.label} did not report ready"
+            print(f"❌ {self.label} failed: {self.error}")
+
+    def status(self):
+        data = {
+            "enabled": self.enabled,
+            "state": self.state,
+            **self._status(),
+            "pid": self.process.pid if self.process is not None else None,
+            "restarts": self.restarts,
+            "error": self.error,
+            **self.info,
+        }
+        if self.state == "running" and not self.alive:
+            data["state"] = "failed"
+            data["error"] = self.error or f"{self.label} exited with {self.process.returncode}"
+        stats = self.link.last("stats") if self.link is not None else None
+        if stats is not None:
+            data.update(self._stats(stats))
+        return data
+
+    def stop(self):
+        """Stop the service, letting it release what it holds (camera, model) first."""
+        with self._lock:
+            process, link = self.process, self.link
+            if process is None:
+                return
+            if process.poll() is None:
+                if link is not None and link.send("quit"):
+                    link.wait_for(("camera_released", "exited"), QUIT_TIMEOUT, is_alive=lambda: process.poll() is None)
+                try:
+                    process.wait(timeout=QUIT_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    terminate_process(process)
+                    try:
+                        process.wait(timeout=KILL_TIMEOUT)
+                    except subprocess.TimeoutExpired:
+                        process.kill()
+                        process.wait()
+            self.control.forget(self.name)
+            self.state = "stopped"
+
+
+def terminate_process(process):
+    if sys.platform == "win32":
+        # For Windows, send CTRL_BREAK_EVENT
+        try:
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+            return
+        except Exception:
+            pass
+    process.terminate()
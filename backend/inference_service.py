@@ -0,0 +1,62 @@
+"""
+Backend side of the shared emotion inference worker.
+
+With ``GAME_EMOTION_BACKEND=model`` the backend runs ``face/inference_worker.py``
+once and points every game process at it, so the model is loaded once and
+faces from concurrent sessions are classified in the same batches.
+
+The listener address is chosen here, before the worker starts, so pre-warmed
+pool workers get it in their environment like the frame ring name.
+
+Environment:
+    GAME_EMOTION_BACKEND        model to run the worker (default heuristic)
+    GAME_EMOTION_MODEL          fer (default) or stub
+    GAME_INFERENCE_MAX_BATCH    faces per model call (default 32)
+    GAME_INFERENCE_LATENCY_MS   longest a face waits for its batch to fill (default 10)
+"""
+import os
+import secrets
+from multiprocessing.connection import arbitrary_address, default_family
+
+from game_sessions import ServiceProcess
+
+# Keep in sync with face/inference_worker.py and face/emotion_backends.py
+INFERENCE_ADDRESS_ENV = "GAME_INFERENCE_ADDRESS"
+INFERENCE_AUTHKEY_ENV = "GAME_INFERENCE_AUTHKEY"
+EMOTION_BACKEND_ENV = "GAME_EMOTION_BACKEND"
+
+
+def inference_service_enabled(environ=None):
+    environ = os.environ if environ is None else environ
+    return environ.get(EMOTION_BACKEND_ENV, "").strip().lower() == "model"
+
+
+class InferenceService(ServiceProcess):
+    """Starts, watches and stops the inference worker process."""
+
+    name = "inference"
+    script = "inference_worker.py"
+    label = "Inference worker"
+    ready_fields = ("model", "input_size")
+
+    def __init__(self, control, spawn, enabled=None):
+        super().__init__(control, spawn, inference_service_enabled() if enabled is None else enabled)
+        self.address = arbitrary_address(default_family)
+        self._authkey = secrets.token_hex(16)
+        self.max_batch = os.environ.get("GAME_INFERENCE_MAX_BATCH", "32")
+        self.max_latency_ms = os.environ.get("GAME_INFERENCE_LATENCY_MS", "10")
+
+    def env(self):
+        """Environment variables that point game processes at the worker."""
+        if not self.enabled:
+            return {}
+        return {INFERENCE_ADDRESS_ENV: self.address, INFERENCE_AUTHKEY_ENV: self._authkey}
+
+    def _args(self):
+        return ["--address", self.address, "--max-batch", self.max_batch, "--max-latency-ms", self.max_latency_ms]
+
+    def _env(self):
+        return {INFERENCE_AUTHKEY_ENV: self._authkey}
+
+    def _status(self):
+        return {"address": self.address if self.enabled else None}
@@ -0,0 +1,168 @@
+"""
+Fan-out of a game's annotated frames to browser viewers (MJPEG).
+
+A game encodes each annotated frame to JPEG once and sends it over the
+control channel as a ``frame`` message (see ``face/stream_encoder.py``). The
+session's ``FrameHub`` keeps only the newest frame; every viewer waits for a
+frame newer than the one it last sent and skips whatever it missed, so a slow
+browser never holds up the game or the other viewers.
+
+The game only encodes after a ``stream`` command, and that command is lost
+when it arrives before the game is connected or before its encoder listens
+for it. The hub therefore keeps the wanted configuration and sends it again
+when the game says hello, reports ready or announces its encoder
+(``stream_ready``), and every ``FRAME_TIMEOUT`` while viewers wait without a
+frame.
+
+Skipped frames are the backpressure signal: when viewers miss a large share
+of frames the hub steps down a quality/resolution ladder and tells the game,
+and steps back up once they keep up again. With no viewers left the game is
+told to stop encoding altogether.
+"""
+import threading
+import time
+
+BOUNDARY = "frame"
+MIMETYPE = f"multipart/x-mixed-replace; boundary={BOUNDARY}"
+
+# (JPEG quality, scale), best first
+QUALITY_LADDER = ((80, 1.0), (70, 1.0), (60, 0.75), (50, 0.5), (40, 0.5))
+START_LEVEL = 1
+ADAPT_WINDOW = 30        # delivered frames between quality decisions
+DEGRADE_SKIP_RATIO = 0.3
+UPGRADE_SKIP_RATIO = 0.05
+FRAME_TIMEOUT = 1.0      # seconds a viewer waits before checking whether the game is gone
+
+
+class FrameHub:
+    """Newest encoded frame of one game session, shared by all its viewers."""
+
+    def __init__(self, send):
+        self._send = send  # WorkerLink.send(cmd, **fields)
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._closed = False
+        # Frame count when the last "stream" command went out, or None if it was not delivered
+        self._configured_seq = None
+        self.viewers = 0
+        self.level = START_LEVEL
+        self.published = 0
+        self.delivered = 0
+        self.skipped = 0
+        self._window_delivered = 0
+        self._window_skipped = 0
+
+    # -- game side -----------------------------------------------------------
+
+    def publish(self, message):
+        """Store a ``frame`` message from the game and wake the viewers."""
+        with self._cond:
+            self._seq += 1
+            self.published += 1
+            self._frame = message
+            self._cond.notify_all()
+
+    def close(self):
+        """The game is gone: end every viewer's stream."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def resync(self):
+        """Send the current configuration again (the game may have missed it). True if delivered."""
+        if self.viewers <= 0 or self._closed:
+            return False
+        return self._configure(True)
+
+    def _configure(self, enabled):
+        quality, scale = QUALITY_LADDER[self.level]
+        sent = self._send("stream", enabled=enabled, quality=quality, scale=scale)
+        self._configured_seq = self._seq if sent else None
+        return sent
+
+    # -- viewer side ---------------------------------------------------------
+
+    def frames(self, is_alive=None):
+        """
+        Yield the JPEG bytes of each new frame for one viewer until the game
+        ends (its connection closes or ``is_alive()`` turns False).
+        """
+        with self._cond:
+            self.viewers += 1
+            first = self.viewers == 1
+        if first:
+            self._configure(True)
+        last = self._seq
+        try:
+            while True:
+                retry = changed = False
+                with self._cond:
+                    deadline = time.monotonic() + FRAME_TIMEOUT
+                    while self._seq == last and not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    if self._closed:
+                        return
+                    if self._seq == last:
+                        if is_alive is not None and not is_alive():
+                            return
+                        # Nothing since the last command (or it was never delivered): say it again
+                        retry = self._configured_seq is None or self._configured_seq == self._seq
+                    else:
+                        missed = self._seq - last - 1 if last else 0
+                        last, jpeg = self._seq, self._frame["jpeg"]
+                        changed = self._account(missed)
+                if retry or changed:
+                    self._configure(True)
+                if not retry:
+                    yield jpeg
+        finally:
+            with self._cond:
+                self.viewers -= 1
+                last_viewer = self.viewers == 0
+            if last_viewer and not self._closed:
+                self._configure(False)
+
+    def mjpeg(self, is_alive=None):
+        """``frames()`` as a multipart/x-mixed-replace body."""
+        for jpeg in self.frames(is_alive):
+            yield (
+                f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode()
+                + jpeg + b"\r\n"
+            )
+
+    def _account(self, missed):
+        """Count a delivery; True when the quality level changed. Caller holds ``_cond``."""
+        self.delivered += 1
+        self.skipped += missed
+        self._window_delivered += 1
+        self._window_skipped += missed
+        if self._window_delivered < ADAPT_WINDOW:
+            return False
+        ratio = self._window_skipped / float(self._window_delivered + self._window_skipped)
+        self._window_delivered = self._window_skipped = 0
+        if ratio > DEGRADE_SKIP_RATIO and self.level < len(QUALITY_LADDER) - 1:
+            self.level += 1
+        elif ratio < UPGRADE_SKIP_RATIO and self.level > 0:
+            self.level -= 1
+        else:
+            return False
+        return True
+
+    def stats(self):
+        quality, scale = QUALITY_LADDER[self.level]
+        frame = self._frame or {}
+        return {
+            "viewers": self.viewers,
+            "quality": quality,
+            "scale": scale,
+            "width": frame.get("width"),
+            "height": frame.get("height"),
+            "frame_bytes": len(frame["jpeg"]) if frame else None,
+            "published": self.published,
+            "delivered": self.delivered,
+            "skipped": self.skipped,
+        }
@@ -49,6 +49,178 @@ def test_basic_detection():
         print("❌ Color detection logic failed")
         return False
 
+def test_emotion_micro_batching():
+    """Test that concurrent sessions share model batches (stub model, no downloads)"""
+    print("Testing emotion micro-batching...")
+    import os
+    import threading
+    import numpy as np
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "face"))
+    from inference_worker import MicroBatcher, StubEmotionModel
+
+    model = StubEmotionModel(batch_ms=5.0, item_ms=0.0)
+    batcher = MicroBatcher(model, max_batch=8, max_latency_ms=20.0)
+    faces = [np.full((60, 60), value, dtype=np.uint8) for value in (10, 140, 250)]
+    results = []
+
+    def session():
+        for _ in range(5):
+            results.append(batcher.classify(faces))
+
+    threads = [threading.Thread(target=session) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    stats = batcher.stats()
+    assert stats["faces"] == 4 * 5 * len(faces)
+    assert stats["batches"] < stats["faces"]
+    assert all(labels == ["angry", "happy", "neutral"] for labels in results)
+    print(f"✅ {stats['faces']} faces in {stats['batches']} model calls, mean latency {stats['latency_ms']} ms")
+    return True
+
+def test_headless_pipeline():
+    """Test that a headless game loop never draws or opens a window and still reports the last frame"""
+    print("Testing headless game loop...")
+    import os
+    import numpy as np
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "face"))
+    from pipeline import run_game_pipeline
+
+    class Frames:
+        remaining = 20
+
+        def read(self):
+            self.remaining -= 1
+            return self.remaining >= 0, np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def stamp(packet):
+        # Tag each frame with its capture seq so the reported result says which frame it came from.
+        return packet.update(frame=np.full((48, 64, 3), packet.seq, dtype=np.uint8))
+
+    def detect(frame):
+        return {"label": "Blue", "detections": [], "frame": int(frame[0, 0, 0])}
+
+    gui_calls, observed, reported = [], [], []
+    imshow, wait_key = cv2.imshow, cv2.waitKey
+    cv2.imshow = lambda *args: gui_calls.append("imshow")
+    cv2.waitKey = lambda *args: gui_calls.append("waitKey") or -1
+    try:
+        run_game_pipeline(
+            Frames(), "headless-test", detect, lambda frame, result: gui_calls.append("annotate"),
+            preprocess=stamp, observe=observed.append,
+            report=lambda result: reported.append(result) or result, headless=True,
+        )
+    finally:
+        cv2.imshow, cv2.waitKey = imshow, wait_key
+
+    # Intermediate frames may be dropped under load, but the final one must always come through.
+    assert observed and len(observed) == len(reported)
+    assert reported[-1]["frame"] == 20, reported[-1]
+    assert not gui_calls, gui_calls
+    print(f"✅ {len(reported)} of 20 frames analysed without a window, last frame reported")
+    return True
+
+def test_hand_landmarks():
+    """Test that handedness comes from MediaPipe and the thumb test holds on both sides of a hand"""
+    print("Testing hand landmarks...")
+    import os
+    from types import SimpleNamespace
+    import numpy as np
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "face"))
+    from hand_landmarks import finger_states, hand_labels, thumb_sides
+
+    # A right hand in the mirrored preview, palm to the camera: thumb out to the left of the
+    # index knuckle, index and middle fingers up, ring and pinky curled
+    right = np.zeros((21, 3), dtype=np.float32)
+    right[0] = (0.50, 0.90, 0)                                   # wrist
+    right[1:5] = [(0.44, 0.85, 0), (0.40, 0.80, 0), (0.36, 0.76, 0), (0.31, 0.74, 0)]  # thumb
+    for finger, x in enumerate((0.45, 0.50, 0.55, 0.60)):
+        mcp, pip, dip, tip = 5 + 4 * finger, 6 + 4 * finger, 7 + 4 * finger, 8 + 4 * finger
+        up = finger < 2
+        right[mcp] = (x, 0.70, 0)
+        right[pip] = (x, 0.60, 0)
+        right[dip] = (x, 0.52 if up else 0.66, 0)
+        right[tip] = (x, 0.45 if up else 0.68, 0)
+    # The same hand turned over (back to the camera) mirrors its x coordinates
+    back = right.copy()
+    back[:, 0] = 1.0 - back[:, 0]
+    hands = np.stack([right, back])
+
+    classified = SimpleNamespace(classification=[SimpleNamespace(label="Right", score=0.98)])
+    assert hand_labels([classified, classified], 2) == ["Right", "Right"]
+    assert hand_labels(None, 1) == [None]
+    assert thumb_sides(hands).tolist() == [-1, 1]
+    expected = [True, True, True, False, False]
+    assert finger_states(hands).tolist() == [expected, expected]
+    print("✅ Right hand labelled from MediaPipe; thumb and fingers read on both sides")
+    return True
+
+def test_rotating_log_cursor():
+    """Test that log cursors survive rotation and only ever return whole lines"""
+    print("Testing rotating game logs...")
+    import os
+    import tempfile
+    from game_logs import READ_CHUNK, RotatingLog
+
+    with tempfile.TemporaryDirectory() as directory:
+        log = RotatingLog(os.path.join(directory, "game.out.log"), max_bytes=100, max_age=0, backups=1)
+        log.write(b"first line\n")
+        data, cursor, truncated = log.read_since(0)
+        assert (data, truncated) == (b"first line\n", False)
+
+        # A line still being written stays unread until its newline arrives
+        log.write(b"partial")
+        assert log.read_since(cursor) == (b"", cursor, False)
+        log.write(b" line\n")
+        data, cursor, _ = log.read_since(cursor)
+        assert data == b"partial line\n"
+
+        # The cursor is a logical offset: reading continues across a rotation
+        log.write(b"x" * 99 + b"\n")
+        log.write(b"after rotation\n")
+        assert log.rotations == 1 and os.path.exists(log.path + ".1")
+        data, cursor, truncated = log.read_since(cursor)
+        assert (data, truncated) == (b"x" * 99 + b"\n", False)
+        data, cursor, truncated = log.read_since(cursor)
+        assert (data, cursor, truncated) == (b"after rotation\n", log.end, False)
+
+        # Output rotated out of the backups is reported; reading restarts at the oldest kept byte
+        log.write(b"y" * 120 + b"\n")
+        log.write(b"z\n")
+        data, cursor, truncated = log.read_since(0)
+        assert (data, truncated) == (b"after rotation\n" + b"y" * 120 + b"\n", True)
+        assert log.read_since(cursor) == (b"z\n", log.end, False)
+        log.close()
+
+        # A line cut by rotation is read up to the end of the backup instead of stalling there
+        cut = RotatingLog(os.path.join(directory, "cut.out.log"), max_bytes=10, max_age=0, backups=1)
+        for chunk in (b"aaaa\nbbbbbbb", b"bb\n", b"cc\n"):
+            cut.write(chunk)
+        seen, cursor = b"", 0
+        for _ in range(10):
+            data, cursor, truncated = cut.read_since(cursor)
+            assert not truncated
+            seen += data
+        assert (seen, cursor) == (b"aaaa\nbbbbbbbbb\ncc\n", cut.end), (seen, cursor)
+        cut.close()
+
+        # Reads stop at READ_CHUNK on a line boundary and the next read picks up the rest
+        big = RotatingLog(os.path.join(directory, "big.out.log"), max_bytes=0, max_age=0)
+        line = b"x" * 99 + b"\n"
+        for _ in range(1000):
+            big.write(line)
+        data, cursor, _ = big.read_since(0)
+        assert len(data) <= READ_CHUNK and data.endswith(b"\n") and cursor == len(data)
+        rest, cursor, _ = big.read_since(cursor)
+        assert len(data) + len(rest) == big.end == cursor
+        big.close()
+
+    print("✅ Rotation, cursors and line boundaries behave")
+    return True
+
 if __name__ == "__main__":
     print("🧪 Testing ASD Backend Components")
     print("=" * 40)
@@ -58,13 +230,29 @@ if __name__ == "__main__":
     
     # Test detection logic
     detection_ok = test_basic_detection()
+
+    # Test emotion inference batching
+    batching_ok = test_emotion_micro_batching()
+
+    # Test headless game loop
+    headless_ok = test_headless_pipeline()
+
+    # Test hand landmark geometry
+    hands_ok = test_hand_landmarks()
+
+    # Test game log rotation and cursors
+    logs_ok = test_rotating_log_cursor()
     
     print("\n" + "=" * 40)
     print("🧪 Test Results:")
     print(f"Camera: {'✅ PASS' if camera_ok else '❌ FAIL'}")
     print(f"Detection: {'✅ PASS' if detection_ok else '❌ FAIL'}")
+    print(f"Batching: {'✅ PASS' if batching_ok else '❌ FAIL'}")
+    print(f"Headless: {'✅ PASS' if headless_ok else '❌ FAIL'}")
+    print(f"Hands: {'✅ PASS' if hands_ok else '❌ FAIL'}")
+    print(f"Logs: {'✅ PASS' if logs_ok else '❌ FAIL'}")
     
-    if camera_ok and detection_ok:
+    if camera_ok and detection_ok and batching_ok and headless_ok and hands_ok and logs_ok:
         print("\n🎉 All tests passed! Backend should work correctly.")
     else:
         print("\n⚠️ Some tests failed. Check the issues above.")
@@ -0,0 +1,223 @@
+"""
+Pool of pre-warmed game worker processes.
+
+Every worker is ``face/worker.py`` in its own interpreter. By the time it is
+idle it has imported OpenCV/NumPy (plus MediaPipe for gestures) and loaded the
+game's models, so starting a game only means handing it a session over the
+control channel. A worker serves one session; the pool spawns a replacement
+as soon as one is handed out.
+
+Pool sizes come from the environment:
+    GAME_POOL_SIZE   warm workers per game (default 1, 0 disables the pool)
+    GAME_POOL_SIZES  per-game overrides, e.g. "gesture=2,emotion=0"
+"""
+import os
+import threading
+import time
+import uuid
+
+DEFAULT_POOL_SIZE = 1
+WARMUP_TIMEOUT = 120.0
+MAX_WARMUP_FAILURES = 3
+
+
+def pool_sizes_from_env(games, environ=None):
+    """Return {game: size} from GAME_POOL_SIZE / GAME_POOL_SIZES."""
+    environ = os.environ if environ is None else environ
+    try:
+        default = max(0, int(environ.get("GAME_POOL_SIZE", DEFAULT_POOL_SIZE)))
+    except ValueError:
+        default = DEFAULT_POOL_SIZE
+    sizes = {game: default for game in games}
+    for item in environ.get("GAME_POOL_SIZES", "").split(","):
+        name, sep, value = item.partition("=")
+        name = name.strip()
+        if not sep or name not in sizes:
+            continue
+        try:
+            sizes[name] = max(0, int(value))
+        except ValueError:
+            print(f"[Pool] Ignoring invalid pool size {item!r}")
+    return sizes
+
+
+class PooledWorker:
+    """One worker process and what we know about its warm-up."""
+
+    def __init__(self, game, script, process, link):
+        self.game = game
+        self.script = script
+        self.process = process
+        self.link = link
+        self.worker_id = link.worker_id
+        self.state = "warming"
+        self.session = None
+        self.spawned_at = time.time()
+        self._spawn_clock = time.monotonic()
+        self.spawn_to_warm_ms = None
+        self.warmup = {}
+        self.error = None
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def as_dict(self):
+        return {
+            "worker_id": self.worker_id,
+            "pid": self.process.pid,
+            "script": self.script,
+            "state": self.state,
+            "session": self.session,
+            "spawned_at": self.spawned_at,
+            "spawn_to_warm_ms": self.spawn_to_warm_ms,
+            "import_ms": self.warmup.get("import_ms"),
+            "preload_ms": self.warmup.get("preload_ms"),
+            "warmup_ms": self.warmup.get("warmup_ms"),
+            "error": self.error,
+        }
+
+
+class WorkerPool:
+    """
+    Keeps ``sizes[game]`` warm workers per game.
+
+    ``spawn(game, script, args, env)`` must start ``script`` from the face
+    directory and return the Popen; ``resolve_script(game)`` returns the game
+    script to preload (or None when the game cannot run here).
+    """
+
+    def __init__(self, control, spawn, resolve_script, sizes):
+        self.control = control
+        self.sizes = dict(sizes)
+        self._spawn_process = spawn
+        self._resolve_script = resolve_script
+        self._workers = []
+        self._failures = {}
+        self._lock = threading.Lock()
+        self._fill_lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        """Fill the pool in the background."""
+        threading.Thread(target=self.fill, name="pool-fill", daemon=True).start()
+
+    def fill(self):
+        with self._fill_lock:
+            for game, size in self.sizes.items():
+                while not self._closed and self._count(game) < size:
+                    if self._failures.get(game, 0) >= MAX_WARMUP_FAILURES:
+                        break
+                    if not self._spawn(game):
+                        break
+
+    def _count(self, game):
+        with self._lock:
+            self._reap()
+            return sum(1 for w in self._workers if w.game == game and w.state in ("warming", "idle"))
+
+    def _reap(self):
+        # Caller holds self._lock
+        for worker in self._workers:
+            if worker.state in ("warming", "idle") and not worker.alive:
+                worker.state = "dead"
+        dead = [w for w in self._workers if w.state == "dead" or (w.state == "busy" and not w.alive)]
+        for worker in dead:
+            self._workers.remove(worker)
+            self.control.forget(worker.worker_id)
+
+    def _spawn(self, game):
+        try:
+            script = self._resolve_script(game)
+        except Exception as e:
+            print(f"[Pool] Cannot resolve script for {game}: {e}")
+            script = None
+        if not script:
+            return False
+
+        worker_id = f"{game}-{uuid.uuid4().hex[:8]}"
+        link = self.control.link(worker_id)
+        try:
+            process = self._spawn_process(game, "worker.py", ["--script", script], self.control.env(worker_id))
+        except Exception as e:
+            print(f"[Pool] Failed to spawn {game} worker: {e}")
+            self.control.forget(worker_id)
+            self._failures[game] = self._failures.get(game, 0) + 1
+            return False
+
+        worker = PooledWorker(game, script, process, link)
+        with self._lock:
+            self._workers.append(worker)
+        threading.Thread(target=self._await_warm, args=(worker,), daemon=True).start()
+        return True
+
+    def _await_warm(self, worker):
+        message = worker.link.wait_for(("warm", "failed"), WARMUP_TIMEOUT, is_alive=lambda: worker.alive)
+        with self._lock:
+            if message is not None and message.get("event") == "warm":
+                worker.state = "idle"
+                worker.spawn_to_warm_ms = round((time.monotonic() - worker._spawn_clock) * 1000.0, 1)
+                worker.warmup = {k: message.get(k) for k in ("import_ms", "preload_ms", "warmup_ms")}
+                self._failures[worker.game] = 0
+                print(f"[Pool] {worker.worker_id} warm in {worker.spawn_to_warm_ms} ms")
+                return
+            worker.state = "dead"
+            worker.error = (message or {}).get("error") or "worker did not warm up"
+            self._failures[worker.game] = self._failures.get(worker.game, 0) + 1
+        print(f"[Pool] {worker.worker_id} failed to warm up: {worker.error}")
+        if worker.alive:
+            worker.process.kill()
+
+    def acquire(self, game, script, session_id, headless=False, profile=None):
+        """
+        Hand an idle worker for ``game`` the session ``session_id`` (run without a
+        window when ``headless``, for user ``profile`` when given).
+        Returns the PooledWorker now running the game, or None if none was ready.
+        """
+        while True:
+            with self._lock:
+                self._reap()
+                worker = next(
+                    (w for w in self._workers if w.game == game and w.script == script and w.state == "idle"),
+                    None,
+                )
+                if worker is None:
+                    break
+                worker.state = "busy"
+                worker.session = session_id
+            if worker.link.send("start", session=worker.session, headless=headless, profile=profile):
+                break
+            # Lost the connection between warm-up and now; drop it and try the next one
+            worker.state = "dead"
+            if worker.alive:
+                worker.process.kill()
+        if not self._closed:
+            self.start()  # replenish
+        return worker
+
+    def status(self):
+        with self._lock:
+            self._reap()
+            games = {}
+            for game, size in self.sizes.items():
+                workers = [w for w in self._workers if w.game == game]
+                games[game] = {
+                    "size": size,
+                    "idle": [w.as_dict() for w in workers if w.state == "idle"],
+                    "busy": [w.as_dict() for w in workers if w.state == "busy"],
+                    "warming": [w.as_dict() for w in workers if w.state == "warming"],
+                    "consecutive_failures": self._failures.get(game, 0),
+                }
+            return games
+
+    def shutdown(self):
+        """Stop idle and warming workers. Busy workers belong to running games."""
+        self._closed = True
+        with self._lock:
+            spare = [w for w in self._workers if w.state in ("warming", "idle")]
+        for worker in spare:
+            worker.link.send("quit")
+            try:
+                worker.process.wait(timeout=2)
+            except Exception:
+                worker.process.kill()
@@ -0,0 +1,48 @@
+import React, { useEffect, useState } from 'react';
+import { API_BASE } from '../utils/gameStatus';
+
+const MAX_ATTEMPTS = 5;
+const RETRY_MS = 1000;
+
+interface GameStreamProps {
+  game: string;
+  title: string;
+}
+
+// Live annotated camera view of a running game (MJPEG from the backend).
+// The backend encodes each frame once for all viewers and lowers quality when the browser falls behind.
+export function GameStream({ game, title }: GameStreamProps) {
+  const [attempt, setAttempt] = useState(0);
+  const [failed, setFailed] = useState(false);
+
+  useEffect(() => {
+    setAttempt(0);
+    setFailed(false);
+  }, [game]);
+
+  // The session may still be starting: retry a few times before giving up
+  const handleError = () => {
+    if (attempt + 1 >= MAX_ATTEMPTS) {
+      setFailed(true);
+      return;
+    }
+    setTimeout(() => setAttempt((prev) => prev + 1), RETRY_MS);
+  };
+
+  if (failed) {
+    return (
+      <p className="text-sm text-gray-600">
+        The live view is not available. The game is still running in the background.
+      </p>
+    );
+  }
+
+  return (
+    <img
+      src={`${API_BASE}/game/${game}/stream?attempt=${attempt}`}
+      alt={title}
+      onError={handleError}
+      className="mx-auto mt-2 w-full max-w-2xl rounded-lg shadow-lg bg-black"
+    />
+  );
+}
@@ -0,0 +1,33 @@
+import React from 'react';
+import { GameEvent, useGameEvents } from '../utils/gameEvents';
+
+interface LiveDetectionsProps {
+  game: string;
+  enabled: boolean;
+}
+
+const describe = (event: GameEvent) => {
+  if (event.event === "gesture") {
+    return event.gesture ?? "Hand lowered";
+  }
+  return event.label ?? "Nothing detected";
+};
+
+// Live results of a running game, pushed by the backend as they happen.
+export function LiveDetections({ game, enabled }: LiveDetectionsProps) {
+  const events = useGameEvents(game, enabled);
+
+  if (!enabled || events.length === 0) {
+    return null;
+  }
+
+  return (
+    <ul className="mt-4 inline-flex flex-wrap justify-center gap-2">
+      {events.map((event) => (
+        <li key={`${event.session}-${event.seq}`} className="bg-white shadow px-3 py-1 rounded-full text-sm text-gray-700">
+          {describe(event)}
+        </li>
+      ))}
+    </ul>
+  );
+}
@@ -0,0 +1,74 @@
+import React, { useEffect, useState } from 'react';
+import { API_BASE } from '../utils/gameStatus';
+import { subscribeToGameEvents } from '../utils/gameEvents';
+
+type CalibrationState = "idle" | "waiting" | "capturing";
+
+interface SkinCalibrationProps {
+  game: string;
+  enabled: boolean;
+}
+
+// Browser stand-in for the fallback gesture game's 'c'/'s' keys: learns the player's skin colour
+// while the palm is held in the box shown on the live view. Only the fallback game accepts it.
+export function SkinCalibration({ game, enabled }: SkinCalibrationProps) {
+  const [state, setState] = useState<CalibrationState>("idle");
+  const [message, setMessage] = useState<string | null>(null);
+  const [available, setAvailable] = useState(true);
+
+  useEffect(() => {
+    if (!enabled) {
+      return;
+    }
+    return subscribeToGameEvents(game, (event) => {
+      setState("idle");
+      setMessage(event.event === "calibrated" ? "Skin colour learned." : `Calibration failed: ${event.error}`);
+    }, ["calibrated", "calibration_failed"]);
+  }, [game, enabled]);
+
+  const send = async (action: "start" | "capture" | "skip") => {
+    const response = await fetch(`${API_BASE}/game/${game}/calibrate`, {
+      method: "POST",
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ action }),
+    });
+    if (response.status === 409) {
+      // Full gesture recognition (MediaPipe) needs no skin model
+      setAvailable(false);
+      return;
+    }
+    if (!response.ok) {
+      const data = await response.json();
+      setMessage(data.error || "Calibration request failed");
+      return;
+    }
+    setMessage(null);
+    setState(action === "start" ? "waiting" : action === "capture" ? "capturing" : "idle");
+  };
+
+  if (!enabled || !available) {
+    return null;
+  }
+
+  return (
+    <div className="mt-4 flex flex-col items-center gap-2">
+      {state === "idle" && (
+        <button onClick={() => send("start")} className="px-4 py-2 bg-orange-500 text-white rounded-lg hover:bg-orange-600 transition-all">
+          🖐️ Calibrate skin colour
+        </button>
+      )}
+      {state === "waiting" && (
+        <div className="flex gap-2">
+          <button onClick={() => send("capture")} className="px-4 py-2 bg-orange-500 text-white rounded-lg hover:bg-orange-600 transition-all">
+            Palm is in the box
+          </button>
+          <button onClick={() => send("skip")} className="px-4 py-2 bg-gray-500 text-white rounded-lg hover:bg-gray-600 transition-all">
+            Cancel
+          </button>
+        </div>
+      )}
+      {state === "capturing" && <p className="text-sm text-gray-600">Hold still...</p>}
+      {message && <p className="text-sm text-gray-600">{message}</p>}
+    </div>
+  );
+}
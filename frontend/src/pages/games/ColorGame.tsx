@@ -1,5 +1,8 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate, useLocation } from "react-router-dom";
+import { waitUntilRunning } from "../../utils/gameStatus";
+import { GameStream } from "../../components/GameStream";
+import { LiveDetections } from "../../components/LiveDetections";
 
 const ColorGame: React.FC = () => {
   const [isRunning, setIsRunning] = useState(false);
@@ -34,7 +37,7 @@ const ColorGame: React.FC = () => {
       setError(null);
       setShowInstructions(false);
       
-      const response = await fetch("http://127.0.0.1:5003/start-color", {
+      const response = await fetch("http://127.0.0.1:5003/start-color?headless=1", {
         method: "POST",
         headers: {
           'Content-Type': 'application/json',
@@ -46,12 +49,12 @@ const ColorGame: React.FC = () => {
         throw new Error(data.error || "Failed to start color detection.");
       }
 
+      // The backend answers 202 right away; wait until the game reports it is ready
+      await waitUntilRunning(data, "Failed to start color detection.");
+
       setIsRunning(true);
       setTimeLeft(120);
 
-      // Show helpful message to user
-      setError("🎥 Camera window should now be open! If you don't see it, check your taskbar or allow camera permissions. The game runs in a separate window.");
-
       console.log(data.message);
     } catch (err) {
       setError(err instanceof Error ? err.message : "Error starting color detection. Make sure the backend server is running.");
@@ -173,16 +176,15 @@ const ColorGame: React.FC = () => {
             <div className="inline-block bg-green-100 text-green-800 px-4 py-2 rounded-full">
               🎮 Game is running... Show colors to your camera!
             </div>
-            <p className="text-sm text-gray-600 mt-2">
-              Look for the camera window that opened. Point colored objects at it!
-            </p>
+            <GameStream game="color" title="Color game live view" />
+            <LiveDetections game="color" enabled={isRunning} />
           </div>
         )}
 
         {!isRunning && timeLeft === 0 && (
           <div className="text-center bg-gradient-to-r from-green-100 to-blue-100 rounded-lg p-6">
             <h3 className="text-2xl font-bold text-green-800 mb-2">🎉 Game Complete!</h3>
-            <p className="text-lg">Great job exploring colors! Check the camera window to see what was detected.</p>
+            <p className="text-lg">Great job exploring colors!</p>
           </div>
         )}
 
@@ -191,8 +193,8 @@ const ColorGame: React.FC = () => {
           <ul className="text-blue-700 text-sm space-y-1">
             <li>• Try different colored toys, clothes, or books</li>
             <li>• Move objects closer or farther from the camera</li>
-            <li>• Look for the camera window that opens separately</li>
-            <li>• Press 'q' in the camera window to close it manually</li>
+            <li>• Watch the live camera view on this page</li>
+            <li>• Press Stop Game to end the game early</li>
           </ul>
         </div>
       </div>
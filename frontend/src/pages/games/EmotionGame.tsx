@@ -1,5 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
+import { waitUntilRunning } from '../../utils/gameStatus';
+import { GameStream } from '../../components/GameStream';
+import { LiveDetections } from '../../components/LiveDetections';
 
 const EmotionGame: React.FC = () => {
   const [isRunning, setIsRunning] = useState(false);
@@ -36,7 +39,7 @@ const EmotionGame: React.FC = () => {
       setError(null);
       setShowInstructions(false);
 
-      const response = await fetch("http://127.0.0.1:5003/start-emotion", {
+      const response = await fetch("http://127.0.0.1:5003/start-emotion?headless=1", {
         method: "POST",
         headers: {
           'Content-Type': 'application/json',
@@ -48,6 +51,9 @@ const EmotionGame: React.FC = () => {
         throw new Error(data.error || "Failed to start emotion detection.");
       }
 
+      // The backend answers 202 right away; wait until the game reports it is ready
+      await waitUntilRunning(data, "Failed to start emotion detection.");
+
       setIsRunning(true);
       setTimeLeft(120);
       console.log(data.message);
@@ -186,9 +192,8 @@ const EmotionGame: React.FC = () => {
             <div className="inline-block bg-pink-100 text-pink-800 px-4 py-2 rounded-full mb-4">
               🎮 Game is running... Express emotions to your camera!
             </div>
-            <p className="text-sm text-gray-600">
-              Look for the camera window. Try making different facial expressions!
-            </p>
+            <GameStream game="emotion" title="Emotion game live view" />
+            <LiveDetections game="emotion" enabled={isRunning} />
           </div>
         )}
 
@@ -206,7 +211,7 @@ const EmotionGame: React.FC = () => {
             <li>• Exaggerate your expressions to help the AI recognize them</li>
             <li>• Try holding each expression for a few seconds</li>
             <li>• Practice in front of a mirror first if needed</li>
-            <li>• Press 'q' in the camera window to close it manually</li>
+            <li>• Press Stop Game to end the game early</li>
           </ul>
         </div>
       </div>
@@ -1,5 +1,10 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate, useLocation } from "react-router-dom";
+import { waitUntilRunning } from "../../utils/gameStatus";
+import { GameStream } from "../../components/GameStream";
+import { LiveDetections } from "../../components/LiveDetections";
+import { SkinCalibration } from "../../components/SkinCalibration";
+import { useAuth } from "../../components/auth/AuthProvider";
 
 const GestureGame: React.FC = () => {
   const [isRunning, setIsRunning] = useState(false);
@@ -9,6 +14,7 @@ const GestureGame: React.FC = () => {
   
   const navigate = useNavigate();
   const location = useLocation();
+  const { user } = useAuth();
 
   const gestures = [
     { name: 'Thumbs Up', emoji: '👍', description: 'Show approval or success' },
@@ -43,11 +49,13 @@ const GestureGame: React.FC = () => {
       setError(null);
       setShowInstructions(false);
       
-      const response = await fetch("http://127.0.0.1:5003/start-gesture", {
+      // The profile keeps each player's learned skin colour apart
+      const response = await fetch("http://127.0.0.1:5003/start-gesture?headless=1", {
         method: "POST",
         headers: {
           'Content-Type': 'application/json',
         },
+        body: JSON.stringify({ profile: user?.uid }),
       });
 
       const data = await response.json();
@@ -55,6 +63,9 @@ const GestureGame: React.FC = () => {
         throw new Error(data.error || "Failed to start gesture recognition.");
       }
 
+      // The backend answers 202 right away; wait until the game reports it is ready
+      await waitUntilRunning(data, "Failed to start gesture recognition.");
+
       setIsRunning(true);
       setTimeLeft(120);
 
@@ -196,9 +207,9 @@ const GestureGame: React.FC = () => {
             <div className="inline-block bg-orange-100 text-orange-800 px-4 py-2 rounded-full mb-4">
               🎮 Game is running... Show gestures to your camera!
             </div>
-            <p className="text-sm text-gray-600">
-              Look for the camera window. Make clear hand gestures!
-            </p>
+            <GameStream game="gesture" title="Gesture game live view" />
+            <LiveDetections game="gesture" enabled={isRunning} />
+            <SkinCalibration game="gesture" enabled={isRunning} />
           </div>
         )}
 
@@ -216,7 +227,7 @@ const GestureGame: React.FC = () => {
             <li>• Hold gestures steady for a few seconds</li>
             <li>• Use good lighting for better recognition</li>
             <li>• Keep your hand within the camera frame</li>
-            <li>• Press 'q' in the camera window to close it manually</li>
+            <li>• Press Stop Game to end the game early</li>
           </ul>
         </div>
       </div>
@@ -1,5 +1,8 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate, useLocation } from "react-router-dom";
+import { waitUntilRunning } from "../../utils/gameStatus";
+import { GameStream } from "../../components/GameStream";
+import { LiveDetections } from "../../components/LiveDetections";
 
 export function ShapeGame() {
   const location = useLocation();
@@ -43,7 +46,7 @@ export function ShapeGame() {
       setShowInstructions(false);
       setIsRunning(true);
 
-      const response = await fetch("http://127.0.0.1:5003/start-shape", {
+      const response = await fetch("http://127.0.0.1:5003/start-shape?headless=1", {
         method: "POST",
         headers: {
           'Content-Type': 'application/json',
@@ -56,6 +59,9 @@ export function ShapeGame() {
         throw new Error(data.error || "Failed to start the shape game.");
       }
 
+      // The backend answers 202 right away; wait until the game reports it is ready
+      await waitUntilRunning(data, "Failed to start the shape game.");
+
       setTimeLeft(120);
       console.log(data.message);
     } catch (err) {
@@ -194,9 +200,8 @@ export function ShapeGame() {
             <div className="inline-block bg-green-100 text-green-800 px-4 py-2 rounded-full mb-4">
               🎮 Game is running... Show shapes to your camera!
             </div>
-            <p className="text-sm text-gray-600">
-              Look for the camera window. Hold up objects with different shapes!
-            </p>
+            <GameStream game="shape" title="Shape game live view" />
+            <LiveDetections game="shape" enabled={isRunning} />
           </div>
         )}
 
@@ -214,7 +219,7 @@ export function ShapeGame() {
             <li>• Try books (rectangles), plates (circles), triangular rulers</li>
             <li>• Hold objects flat and centered in front of the camera</li>
             <li>• Make sure the object edges are clearly visible</li>
-            <li>• Press 'q' in the camera window to close it manually</li>
+            <li>• Press Stop Game to end the game early</li>
           </ul>
         </div>
       </div>
@@ -0,0 +1,75 @@
+import { useEffect, useState } from "react";
+import { API_BASE } from "./gameStatus";
+
+export interface GameEvent {
+  event: string;
+  game: string;
+  session: string;
+  seq: number;
+  ts: number;
+  label?: string | null;
+  gesture?: string | null;
+  error?: string;
+  detections?: { label: string; bbox?: number[]; confidence?: number }[];
+}
+
+// Events the game pages show as results
+export const RESULT_EVENTS = ["detection", "gesture", "shape_appeared"];
+
+const RETRY_MS = 2000;
+
+// Subscribe to a running game's event feed (SSE). EventSource resumes after the
+// last event it saw on reconnect, so nothing is missed or repeated; if the session
+// is not up yet (404), retry with the same cursor.
+export const subscribeToGameEvents = (
+  game: string,
+  onEvent: (event: GameEvent) => void,
+  names: string[] = RESULT_EVENTS
+) => {
+  let source: EventSource | null = null;
+  let retry: ReturnType<typeof setTimeout> | undefined;
+  let lastId = "";
+  let closed = false;
+
+  const close = () => {
+    closed = true;
+    clearTimeout(retry);
+    source?.close();
+  };
+
+  const connect = () => {
+    const since = lastId ? `?since=${encodeURIComponent(lastId)}` : "";
+    source = new EventSource(`${API_BASE}/game/${game}/events${since}`);
+    const handler = (message: MessageEvent) => {
+      lastId = message.lastEventId || lastId;
+      onEvent(JSON.parse(message.data));
+    };
+    names.forEach((name) => source?.addEventListener(name, handler));
+    source.addEventListener("exited", close);
+    source.onerror = () => {
+      if (!closed && source?.readyState === EventSource.CLOSED) {
+        retry = setTimeout(connect, RETRY_MS);
+      }
+    };
+  };
+
+  connect();
+  return close;
+};
+
+// The most recent result events of a game while ``enabled`` (newest last).
+export const useGameEvents = (game: string, enabled: boolean, limit = 5) => {
+  const [events, setEvents] = useState<GameEvent[]>([]);
+
+  useEffect(() => {
+    if (!enabled) {
+      return;
+    }
+    setEvents([]);
+    return subscribeToGameEvents(game, (event) => {
+      setEvents((prev) => [...prev, event].slice(-limit));
+    });
+  }, [game, enabled, limit]);
+
+  return events;
+};
@@ -0,0 +1,43 @@
+export const API_BASE = "http://127.0.0.1:5003";
+
+export type GameState = "idle" | "starting" | "running" | "stopping" | "stopped" | "failed";
+
+export interface GameStatus {
+  game: string;
+  state: GameState;
+  error?: string | null;
+  stderr_tail?: string[];
+}
+
+// Poll a status URL returned by a 202 start/stop response until the game
+// reaches one of the wanted states (or a terminal one).
+export const waitForGameState = async (
+  statusUrl: string,
+  wanted: GameState[],
+  timeoutMs = 35000,
+  intervalMs = 300
+): Promise<GameStatus> => {
+  const deadline = Date.now() + timeoutMs;
+  let status: GameStatus = { game: "", state: "starting" };
+
+  while (Date.now() < deadline) {
+    const response = await fetch(`${API_BASE}${statusUrl}`);
+    status = await response.json();
+    if (wanted.includes(status.state) || status.state === "failed" || status.state === "idle") {
+      return status;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+  return status;
+};
+
+// Resolve once a freshly started game is running; throws with the backend's error otherwise.
+export const waitUntilRunning = async (data: { status_url?: string }, fallbackMessage: string) => {
+  if (!data.status_url) {
+    return;
+  }
+  const status = await waitForGameState(data.status_url, ["running"]);
+  if (status.state !== "running") {
+    throw new Error(status.error || fallbackMessage);
+  }
+};